@@ -7,16 +7,58 @@ Extracción maximizada con $2 TwitCoins presupuesto
 """
 
 import tweepy
+import requests
 import json
 import os
 from datetime import datetime, timedelta
-import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 import sqlite3
 import re
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from keyword_automaton import KeywordAutomaton
+from extraction_stats import ExtractionAccumulator
+from tweet_io import (NDJSONTweetWriter, COMPRESSION_SUFFIXES, resolve_compression,
+                      open_text_writer, write_json_document)
+from rate_limiter import TokenBucket, EndpointBackoff
+from checkpoint_store import CheckpointStore
+from tweet_store import TweetStore, DATABASE_PATH
+from seen_filter import SeenIdFilter
+from tweet_simulator import iter_simulated_chunks
+from query_planner import QueryPlanner, QueryPlan, MAX_QUERY_LENGTH
+from query_scheduler import QueryScheduler, load_category_terms, query_prior_mean
+from collector_daemon import CollectorDaemon
+from response_cache import ResponseCache
+
+SEARCH_ENDPOINT = 'search_recent_tweets'
+TWITTER_API_HOST = 'https://api.twitter.com'
+
+
+class BaseURLSession(requests.Session):
+    """Sesión que redirige las URLs de la API de Twitter a otra base (p. ej. el mock local)"""
+
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, url, *args, **kwargs):
+        if isinstance(url, str) and url.startswith(TWITTER_API_HOST):
+            url = self.base_url + url[len(TWITTER_API_HOST):]
+        return super().request(method, url, *args, **kwargs)
+
 
 class CentinelaGammaMaximized:
-    def __init__(self, budget_dollars: float = 2.0):
+    def __init__(self, budget_dollars: float = 2.0, max_workers: int = 8, max_retries: int = 5,
+                 checkpoint_path: str = "data/centinela_checkpoints.json",
+                 database_path: str = DATABASE_PATH,
+                 seen_ids_path: str = "data/seen_tweet_ids.bin",
+                 simulation_tweets: int = 50000, simulation_chunk_size: int = 10000,
+                 simulation_workers: int = 1, simulation_seed: int = None,
+                 compression: str = 'gzip', max_query_length: int = MAX_QUERY_LENGTH,
+                 yield_stats_path: str = "data/query_yield.json", api_base_url: str = None,
+                 response_cache: ResponseCache = None):
         """
         Inicializa CENTINELA-GAMMA para documentación de crímenes de guerra
         """
@@ -25,19 +67,53 @@ class CentinelaGammaMaximized:
         self.max_requests = int(budget_dollars * 1000)  # ~2000 requests
         self.tweets_per_request = 100
         
+        # Ejecución concurrente: el ritmo lo marca el token bucket, no sleeps fijos
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.rate_limiter = TokenBucket(rate=1.0, capacity=max_workers)
+        self.backoff = EndpointBackoff()
+        self.api_unavailable = False
+        self.stop_fetching = False
+        self._requests_lock = threading.Lock()
+        
+        # Caché de respuestas crudas: una página repetida no se vuelve a pagar (None la desactiva)
+        self.response_cache = response_cache
+        
+        # Cursores persistentes por query (since_id / next_token)
+        self.checkpoints = CheckpointStore(checkpoint_path)
+        
+        # Almacenamiento persistente (None desactiva la base de datos)
+        self.store = TweetStore(database_path) if database_path else None
+        
+        # Ids ya ingeridos (entre queries y entre ejecuciones)
+        self.seen_ids = SeenIdFilter(seen_ids_path)
+        self._run_tweets: Dict[str, Dict] = {}
+        
         # Configuración específica para Palestina/Israel
         self.target_region = "Palestine/Israel"
         
-        # Configurar API de Twitter
-        self.bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
+        # Configurar API de Twitter (`api_base_url` apunta a otro servidor, p. ej. mock_twitter_server)
+        self.api_base_url = api_base_url
+        self.bearer_token = os.getenv('TWITTER_BEARER_TOKEN') or ('mock-token' if api_base_url else None)
         if self.bearer_token:
-            self.client = tweepy.Client(bearer_token=self.bearer_token)
+            # Respuestas crudas para poder leer las cabeceras x-rate-limit-*
+            self.client = tweepy.Client(bearer_token=self.bearer_token, return_type=requests.Response)
+            if api_base_url:
+                self.client.session = BaseURLSession(api_base_url)
             self.simulation_mode = False
         else:
             print("❌ TWITTER_BEARER_TOKEN no encontrado - Modo simulado MASIVO")
             self.client = None
             self.simulation_mode = True
         
+        # Simulación masiva: volumen, tamaño de bloque, procesos y semilla
+        self.simulation_tweets = simulation_tweets
+        self.simulation_chunk_size = simulation_chunk_size
+        self.simulation_workers = simulation_workers
+        self.simulation_seed = simulation_seed
+        # Completar con simulación si la API deja de estar disponible (el daemon lo desactiva)
+        self.simulation_fallback = True
+        
         # Queries específicas para crímenes de guerra
         self.queries = [
             # Gaza - Principales
@@ -122,11 +198,30 @@ class CentinelaGammaMaximized:
             'clean water', 'electricity cut', 'fuel shortage'
         ]
         
+        # Automatas precompilados (una sola pasada por texto)
+        self.keyword_automaton = KeywordAutomaton(self.critical_keywords)
+        self.location_automaton = KeywordAutomaton(['gaza', 'west bank', 'jerusalem', 'palestine'])
+        self.source_automaton = KeywordAutomaton(['human rights', 'amnesty', 'btselem', 'ocha'])
+        
+        # Queries agrupadas en consultas OR bajo el límite de longitud de la API
+        self.query_planner = QueryPlanner(self.queries, max_query_length)
+        
+        # Reparto del presupuesto por rendimiento observado de cada query; las
+        # prioridades de examples/sample_queries.json son su prior
+        categories = load_category_terms()
+        priors = {query: query_prior_mean(query, categories) for query in self.queries}
+        self.scheduler = QueryScheduler(priors, yield_stats_path, tweets_per_request=self.tweets_per_request)
+        
         # Métricas
         self.total_tweets = 0
         self.critical_tweets = 0
         self.requests_made = 0
         self.start_time = None
+        self.stats = ExtractionAccumulator()
+        self.writer = None
+        
+        # Compresión de los archivos de salida ('none', 'gzip' o 'zstd')
+        self.compression = resolve_compression(compression)
         
         print("🕊️" + "="*71)
         print("🕊️ CENTINELA-GAMMA MAXIMIZED - $2 TWITCOIN WAR CRIMES DOCUMENTATION 🕊️")
@@ -141,198 +236,302 @@ class CentinelaGammaMaximized:
         print(f"   📱 Tweets por request: {self.tweets_per_request}")
         print(f"   🎯 Capacidad teórica: {self.max_requests * self.tweets_per_request:,} tweets")
         print(f"   📝 Queries configuradas: {len(self.queries)}")
+        print(f"   🧩 Consultas API agrupadas: {len(self.query_planner.plans)}")
+        print(f"   🧵 Workers concurrentes: {self.max_workers}")
+        if self.api_base_url:
+            print(f"   🧪 API: {self.api_base_url}")
+        print(f"   🎰 Reparto de requests: bandit (Thompson sampling) por rendimiento")
+        print(f"   ⏯️ Queries con pasada pendiente: {self.checkpoints.pending_queries()}")
+        print(f"   🧬 Tweets ya vistos: {len(self.seen_ids):,}")
         print(f"   🎯 Región objetivo: {self.target_region}")
 
-    def make_request(self, query: str) -> Any:
+    def reserve_request(self) -> bool:
+        """Reserva un request del presupuesto (thread-safe)"""
+        with self._requests_lock:
+            if self.requests_made >= self.max_requests:
+                return False
+            self.requests_made += 1
+            return True
+
+    def release_request(self):
+        """Devuelve al presupuesto un request que la API rechazó sin servir datos"""
+        with self._requests_lock:
+            self.requests_made -= 1
+
+    def parse_search_response(self, payload: Dict) -> tweepy.Response:
+        """Convierte el JSON crudo de la respuesta en el mismo formato que devuelve tweepy"""
+        tweets = [tweepy.Tweet(tweet) for tweet in payload.get('data', [])]
+        return tweepy.Response(tweets, payload.get('includes', {}), payload.get('errors', []), payload.get('meta', {}))
+
+    def make_request(self, query: str, since_id: str = None, next_token: str = None) -> Any:
         """
         Realiza una solicitud a la API de Twitter y maneja errores.
-        Retorna los datos del tweet, "RATE_LIMIT_REACHED" si se alcanza un límite, o None en otros errores.
+        `since_id` limita a tweets nuevos y `next_token` pide la página siguiente.
+        Retorna los datos del tweet, "RATE_LIMIT_REACHED" si la API deja de estar disponible
+        (403/401), "BUDGET_EXHAUSTED" si se agotó `max_requests`, "STOPPED" si la extracción
+        se detuvo, o None en otros errores.
+        Los 429 se reintentan con backoff por endpoint en lugar de abandonar la query.
         """
         if self.client is None:
             return None # Should not happen if simulation_mode is handled correctly
         
-        try:
-            tweets = self.client.search_recent_tweets(
-                query=query,
-                max_results=self.tweets_per_request,
-                tweet_fields=['created_at', 'author_id', 'geo', 'public_metrics', 'context_annotations']
-            )
-            self.requests_made += 1
-            time.sleep(1) # Rate limiting
-            return tweets
-        except tweepy.errors.TweepyException as e:
-            status_code = e.response.status_code if e.response is not None else None
-            print(f"❌ Error en query '{query}': {status_code} - {e}")
-            
-            if status_code == 403:
-                print("⚠️ [HTTP 403] Forbidden. Múltiples causas posibles:")
-                print("   - Límite de facturación (Pay-Per-Use cap) alcanzado.")
-                print("   - El endpoint 'search_recent_tweets' requiere un nivel superior (ej. Pro/Enterprise) o acceso elevado.")
-                print("   - El Bearer Token introducido es incorrecto o no tiene permisos de lectura.")
-                print("⏳ Cambiando a simulación masiva para no perder datos del dashboard...")
-                return "RATE_LIMIT_REACHED"
-            elif status_code == 429:
-                print("⚠️ [HTTP 429] Too Many Requests. Límite de velocidad (Rate Limit) alcanzado.")
-                print("⏳ Cambiando a simulación masiva...")
-                return "RATE_LIMIT_REACHED"
-            elif status_code == 401:
-                print("❌ [HTTP 401] Unauthorized. El TWITTER_BEARER_TOKEN es inválido o ha expirado.")
+        params = {
+            'query': query,
+            'max_results': self.tweets_per_request,
+            'since_id': since_id,
+            'next_token': next_token,
+            'tweet_fields': ['created_at', 'author_id', 'geo', 'public_metrics', 'context_annotations']
+        }
+        
+        # Aciertos de caché: sin red, sin token del rate limiter y sin gastar presupuesto
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.request_key(f"{self.api_base_url or TWITTER_API_HOST}/{SEARCH_ENDPOINT}", params)
+        if cache_key is not None:
+            payload = self.response_cache.get(cache_key)
+            if payload is not None:
+                return self.parse_search_response(payload)
+        
+        for attempt in range(1, self.max_retries + 1):
+            if self.api_unavailable:
                 return "RATE_LIMIT_REACHED"
+            if self.stop_fetching:
+                return "STOPPED"
+            
+            self.backoff.wait(SEARCH_ENDPOINT)
+            if not self.reserve_request():
+                return "BUDGET_EXHAUSTED"
+            self.rate_limiter.acquire()
+            
+            try:
+                response = self.client.search_recent_tweets(**params)
+                self.rate_limiter.update_from_headers(response.headers)
+                self.backoff.record_success(SEARCH_ENDPOINT)
+                payload = response.json()
+                if cache_key is not None:
+                    self.response_cache.put(cache_key, payload)
+                return self.parse_search_response(payload)
+            except tweepy.errors.TweepyException as e:
+                response = getattr(e, 'response', None)
+                status_code = response.status_code if response is not None else None
                 
-            return None
-        except Exception as e:
-            print(f"❌ Error inesperado en query '{query}': {e}")
-            return None
+                if status_code == 429:
+                    self.release_request()
+                    self.rate_limiter.update_from_headers(response.headers)
+                    delay = self.backoff.record_rate_limited(SEARCH_ENDPOINT, response.headers)
+                    print(f"⚠️ [HTTP 429] Too Many Requests en '{query}'. Reintento {attempt}/{self.max_retries} en {delay:.0f}s")
+                    continue
+                
+                result = self.handle_request_error(query, status_code, e)
+                if result == "RATE_LIMIT_REACHED":
+                    self.api_unavailable = True
+                return result
+            except Exception as e:
+                print(f"❌ Error inesperado en query '{query}': {e}")
+                return None
+        
+        print(f"❌ Reintentos agotados para query '{query}' tras {self.max_retries} respuestas 429")
+        return None
 
-    def extract_tweets_maximized(self) -> List[Dict]:
-        """Extracción maximizada de tweets sobre crímenes de guerra"""
+    def handle_request_error(self, query: str, status_code: Any, e: Exception) -> Any:
+        """Informa errores HTTP no recuperables de la API"""
+        print(f"❌ Error en query '{query}': {status_code} - {e}")
+        
+        if status_code == 403:
+            print("⚠️ [HTTP 403] Forbidden. Múltiples causas posibles:")
+            print("   - Límite de facturación (Pay-Per-Use cap) alcanzado.")
+            print("   - El endpoint 'search_recent_tweets' requiere un nivel superior (ej. Pro/Enterprise) o acceso elevado.")
+            print("   - El Bearer Token introducido es incorrecto o no tiene permisos de lectura.")
+            print("⏳ Cambiando a simulación masiva para no perder datos del dashboard...")
+            return "RATE_LIMIT_REACHED"
+        elif status_code == 401:
+            print("❌ [HTTP 401] Unauthorized. El TWITTER_BEARER_TOKEN es inválido o ha expirado.")
+            return "RATE_LIMIT_REACHED"
+            
+        return None
+
+    def extract_tweets_maximized(self, writer: NDJSONTweetWriter = None) -> List[Dict]:
+        """
+        Extracción maximizada de tweets sobre crímenes de guerra.
+        Con `writer`, cada tweet se escribe en streaming y no se retiene en memoria.
+        """
         self.start_time = datetime.now()
+        self.writer = writer
         
         print(f"🕊️ INICIANDO DOCUMENTACIÓN CRÍMENES DE GUERRA...")
         
         all_tweets = []
         simulation_forced = False
+        self.stats = ExtractionAccumulator()
+        self._run_tweets = {}
         
         if self.simulation_mode:
-            print(f"🎭 MODO SIMULADO MASIVO - Generando ~100,000 tweets de ejemplo")
-            all_tweets = self.massive_simulation()
+            print(f"🎭 MODO SIMULADO MASIVO - Generando {self.simulation_tweets:,} tweets de ejemplo")
             # In simulation mode, we generate all at once, so no need to loop through queries
-            self.total_tweets = len(all_tweets)
-            self.critical_tweets = sum(1 for tweet in all_tweets if tweet.get('is_critical', False))
+            self.collect_simulation(all_tweets)
             return all_tweets
 
-        # Extracción real de Twitter
-        for i, query in enumerate(self.queries, 1):
-            if simulation_forced:
-                 print(f"⏭️ Saltando query '{query}' debido a límite de API. Usando simulación.")
-                 continue
-
-            if self.requests_made >= self.max_requests:
-                print(f"🚫 Límite de requests alcanzado: {self.requests_made}. Finalizando extracción real.")
-                break
-            
-            print(f"🔍 [{i}/{len(self.queries)}] Query: '{query}'")
-            
-            # Request inicial
-            data = self.make_request(query)
-            
-            if data == "RATE_LIMIT_REACHED":
-                print("⚠️ Activando fallback de simulación masiva debido a límite de API...")
-                all_tweets.extend(self.massive_simulation()) # Add simulation data to existing real data
-                simulation_forced = True
-                continue
+        self.api_unavailable = False
+        self.stop_fetching = False
+        
+        # Extracción real de Twitter: el scheduler elige qué consulta recibe cada request
+        # según su rendimiento observado. Cada consulta pagina en serie (una página en vuelo
+        # a la vez) y el checkpoint avanza solo después de registrar los tweets de cada página.
+        plans = {plan.api_query: plan for plan in self.query_planner.plans}
+        cursors = {api_query: self.checkpoints.get(api_query) for api_query in plans}
+        active = set(plans)  # Consultas con páginas pendientes en esta pasada
+        in_flight = {}       # future -> consulta
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        budget_exhausted = False
+        
+        try:
+            while True:
+                # Ocupar los workers libres con las consultas que elija el scheduler
+                while len(in_flight) < self.max_workers and not self.stop_fetching:
+                    busy = set(in_flight.values())
+                    api_query = self.scheduler.choose({query: plan.members for query, plan in plans.items()
+                                                       if query in active and query not in busy})
+                    if api_query is None:
+                        break
+                    cursor = cursors[api_query]
+                    future = executor.submit(self.make_request, api_query,
+                                             since_id=cursor.get('since_id'), next_token=cursor.get('next_token'))
+                    in_flight[future] = api_query
                 
-            if not data or not data.data: # Check data.data for actual tweets
-                continue
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    api_query = in_flight.pop(future)
+                    data = future.result()
+                    
+                    if isinstance(data, tweepy.Response):
+                        self.collect_page(plans[api_query], data, all_tweets)
+                        cursors[api_query] = self.checkpoints.get(api_query)
+                        if not cursors[api_query].get('next_token'):
+                            active.discard(api_query)  # Pasada completa
+                        continue
+                    
+                    active.discard(api_query)
+                    if data == "BUDGET_EXHAUSTED" and not budget_exhausted:
+                        print(f"🚫 Límite de requests alcanzado: {self.requests_made}. Finalizando extracción real.")
+                        budget_exhausted = True
+                        self.stop_fetching = True
+                    
+                    if data == "RATE_LIMIT_REACHED" and not simulation_forced:
+                        if self.simulation_fallback:
+                            print("⚠️ Activando fallback de simulación masiva debido a límite de API...")
+                        simulation_forced = True
+                        self.stop_fetching = True
             
-            for tweet in data.data:
-                processed_tweet = self.process_tweet(tweet, query)
-                all_tweets.append(processed_tweet)
-        
-        self.total_tweets = len(all_tweets)
-        self.critical_tweets = sum(1 for tweet in all_tweets if tweet.get('is_critical', False))
+            if simulation_forced and self.simulation_fallback:
+                self.collect_simulation(all_tweets) # Add simulation data to existing real data
+        finally:
+            # Detener requests pendientes (p. ej. tras fallback o interrupción)
+            self.stop_fetching = True
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+            self.scheduler.save()
+            # Los ids de una página interrumpida se volverán a ver al reanudarla
+            self.seen_ids.discard_unsynced()
+            self.seen_ids.compact()
+            self._run_tweets = {}
         
         return all_tweets
 
+    def collect_page(self, plan: QueryPlan, data: tweepy.Response, all_tweets: List[Dict]):
+        """Registra los tweets de una página, avanza su checkpoint e informa al scheduler"""
+        page_tweets = data.data or []
+        new_tweets = 0
+        critical_tweets = 0
+        yields = {query: [0, 0, 0] for query in plan.members}  # query -> [tweets, nuevos, críticos]
+        
+        for tweet in page_tweets:
+            # Atribuir el tweet a todas las queries del grupo que coinciden
+            matched = self.query_planner.attribute(plan, tweet.text)
+            for query in matched:
+                yields[query][0] += 1
+            if not self.register_tweet_id(tweet.id, matched):
+                continue
+            processed_tweet = self.process_tweet(tweet, matched[0], matched)
+            self.collect_tweet(processed_tweet, all_tweets)
+            if self.writer is None:
+                self._run_tweets[str(tweet.id)] = processed_tweet
+            new_tweets += 1
+            critical_tweets += 1 if processed_tweet['is_critical'] else 0
+            for query in matched:
+                yields[query][1] += 1
+                yields[query][2] += 1 if processed_tweet['is_critical'] else 0
+        
+        self.commit_page(plan.api_query, data.meta or {})
+        self.scheduler.record({query: tuple(counts) for query, counts in yields.items()})
+        
+        label = ', '.join(plan.members[:3]) + (f" (+{len(plan.members) - 3})" if len(plan.members) > 3 else "")
+        print(f"🔍 [{self.requests_made}/{self.max_requests}] {label}: "
+              f"{len(page_tweets)} tweets, {new_tweets} nuevos, {critical_tweets} críticos")
+
+    def register_tweet_id(self, tweet_id: Any, queries: List[str]) -> bool:
+        """
+        Devuelve True si el tweet no se había ingerido. Si ya se ingirió (en otra
+        consulta o en una ejecución anterior) solo se registran las queries que lo devolvieron.
+        """
+        if self.seen_ids.add(tweet_id):
+            return True
+        
+        tweet = self._run_tweets.get(str(tweet_id))
+        for query in queries:
+            if tweet is not None and query not in tweet['query_sources']:
+                tweet['query_sources'].append(query)
+            if self.store is not None:
+                self.store.add_query_match(tweet_id, query)
+        self.stats.add_duplicate(queries)
+        return False
+
+    def commit_page(self, query: str, meta: Dict):
+        """Persiste tweets e ids vistos de una página antes de avanzar su checkpoint"""
+        if self.store is not None:
+            self.store.flush()
+        self.seen_ids.sync()
+        self.checkpoints.record_page(query, meta)
+
+    def collect_tweet(self, tweet: Dict, all_tweets: List[Dict]):
+        """Registra un tweet producido y actualiza las métricas acumuladas"""
+        if self.writer is not None:
+            self.writer.write(tweet)
+        else:
+            all_tweets.append(tweet)
+        if self.store is not None:
+            self.store.add(tweet)
+        self.stats.add(tweet)
+        self.total_tweets = self.stats.total_tweets
+        self.critical_tweets = self.stats.critical_tweets
+
+    def iter_simulation(self) -> Iterator[List[Dict]]:
+        """Genera la simulación masiva por bloques (ver `tweet_simulator`)"""
+        generated = 0
+        for chunk in iter_simulated_chunks(self.simulation_tweets, self.queries, self.critical_keywords,
+                                           chunk_size=self.simulation_chunk_size,
+                                           workers=self.simulation_workers, seed=self.simulation_seed):
+            generated += len(chunk)
+            yield chunk
+        print(f"🎭 Simulación completada: {generated:,} tweets generados")
+
     def massive_simulation(self) -> List[Dict]:
         """Genera simulación masiva de tweets de crímenes de guerra"""
-        tweets = []
-        
-        # Templates específicos para crímenes de guerra
-        templates = [
-            # Gaza
-            "BREAKING: Israeli forces bomb {location} in Gaza. {casualties} civilians killed including {children} children.",
-            "Gaza UPDATE: {facility} destroyed by Israeli airstrike. Medical staff treating wounded in corridors.",
-            "URGENT: Residential building in {gaza_area} hit by Israeli missile. Search for survivors ongoing.",
-            "Gaza medics report {number} killed, {wounded} wounded in latest Israeli bombardment of {area}.",
-            
-            # West Bank
-            "West Bank: Israeli settlers attack Palestinian village {village}. Homes set on fire.",
-            "IDF raids {wb_city}, arrests {arrests} Palestinians including {minors} minors during night operation.",
-            "BREAKING: Israeli bulldozers demolish Palestinian home in {location} despite court order.",
-            "Checkpoint violence: Israeli soldiers shoot Palestinian youth at {checkpoint}.",
-            
-            # Crímenes específicos
-            "War crime alert: Israel targets {civilian_target} in violation of international law.",
-            "Human Rights Watch documents systematic home demolitions in {area}.",
-            "B'Tselem: Israeli forces use excessive force against {target} protesters.",
-            "Amnesty International calls for investigation into Israeli {crime_type}.",
-            
-            # Situación humanitaria
-            "Gaza hospitals overwhelmed. Only {hours} hours of electricity per day. Fuel running out.",
-            "OCHA: {percentage}% of Gaza water unfit for human consumption due to Israeli siege.",
-            "Palestinian families in {area} without clean water for {days} days after Israeli operation.",
-            "Medical supplies blocked at Israeli checkpoints while patients die in Gaza hospitals."
-        ]
-        
-        locations = [
-            "Gaza City", "Khan Younis", "Rafah", "Jabalia", "Beit Hanoun",
-            "Ramallah", "Jenin", "Nablus", "Hebron", "Bethlehem",
-            "Sheikh Jarrah", "Silwan", "East Jerusalem"
-        ]
-        
-        gaza_areas = ["Shati", "Jabalia", "Gaza City", "Khan Younis", "Rafah"]
-        wb_cities = ["Jenin", "Nablus", "Ramallah", "Hebron", "Tulkarem"]
-        villages = ["Beita", "Kafr Qaddum", "Bil'in", "Ni'lin", "Al-Walaja"]
-        facilities = ["Al-Shifa Hospital", "Indonesian Hospital", "Gaza clinic", "school", "mosque"]
-        
-        for i in range(50000):  # 50,000 tweets simulados
-            template = templates[i % len(templates)]
-            
-            # Llenar variables del template
-            tweet_text = template.format(
-                location=locations[i % len(locations)],
-                casualties=str((i % 15) + 1),
-                children=str((i % 8) + 1),
-                facility=facilities[i % len(facilities)],
-                gaza_area=gaza_areas[i % len(gaza_areas)],
-                number=str((i % 25) + 1),
-                wounded=str((i % 50) + 5),
-                area=locations[i % len(locations)],
-                village=villages[i % len(villages)],
-                wb_city=wb_cities[i % len(wb_cities)],
-                arrests=str((i % 20) + 1),
-                minors=str((i % 5) + 1),
-                checkpoint=f"Checkpoint {(i % 10) + 1}",
-                civilian_target="hospital" if i % 4 == 0 else "school" if i % 4 == 1 else "residential building" if i % 4 == 2 else "mosque",
-                crime_type="home demolitions" if i % 3 == 0 else "settlement expansion" if i % 3 == 1 else "collective punishment",
-                target="peaceful" if i % 2 == 0 else "unarmed",
-                hours=str((i % 8) + 4),
-                percentage=str((i % 30) + 70),
-                days=str((i % 10) + 1)
-            )
-            
-            # Detectar keywords críticos
-            is_critical = any(keyword.lower() in tweet_text.lower() for keyword in self.critical_keywords)
-            keywords = [kw for kw in self.critical_keywords if kw.lower() in tweet_text.lower()]
-            
-            tweet = {
-                'id': f'SIM_GAMMA_{i:05d}',
-                'text': tweet_text,
-                'author': f'user_{i % 2000}',  # 2000 usuarios únicos
-                'author_id': f'id_{i % 2000}',
-                'created_at': (datetime.now() - timedelta(hours=i % 72)).isoformat(),
-                'location': locations[i % len(locations)],
-                'coordinates': None,
-                'metrics': {
-                    'retweet_count': i % 100,
-                    'like_count': i % 500
-                },
-                'relevance_score': (i % 40) + 60,  # 60-100 relevancia
-                'is_critical': is_critical,
-                'keywords_detected': keywords[:3],  # Máximo 3 keywords
-                'query_source': self.queries[i % len(self.queries)]
-            }
-            
-            tweets.append(tweet)
-        
-        print(f"🎭 Simulación completada: {len(tweets):,} tweets generados")
-        return tweets
+        return [tweet for chunk in self.iter_simulation() for tweet in chunk]
 
-    def process_tweet(self, tweet, query_source: str) -> Dict:
+    def collect_simulation(self, all_tweets: List[Dict]):
+        """Registra la simulación bloque a bloque, sin materializarla entera"""
+        for chunk in self.iter_simulation():
+            for tweet in chunk:
+                self.collect_tweet(tweet, all_tweets)
+
+    def process_tweet(self, tweet, query_source: str, query_sources: List[str] = None) -> Dict:
         """Procesa un tweet real de la API"""
         # Detectar keywords críticos
-        keywords = [kw for kw in self.critical_keywords if kw.lower() in tweet.text.lower()]
+        keywords = self.keyword_automaton.detect(tweet.text)
         is_critical = len(keywords) > 0
         
         # Calcular score de relevancia
@@ -350,47 +549,46 @@ class CentinelaGammaMaximized:
             'relevance_score': relevance_score,
             'is_critical': is_critical,
             'keywords_detected': keywords[:5],  # Máximo 5 keywords
-            'query_source': query_source
+            'query_source': query_source,
+            'query_sources': list(query_sources or [query_source])  # Todas las queries que lo devolvieron
         }
 
-    def calculate_relevance(self, text: str, keywords: List[str]) -> int:
+    def calculate_relevance(self, text: str, keywords: List[str] = None) -> int:
         """Calcula score de relevancia 0-100"""
         base_score = 30
+        text_lower = text.lower()
+        
+        if keywords is None:
+            keywords = self.keyword_automaton.detect(text_lower, already_lower=True)
         
         # +10 por cada keyword crítico
         keyword_score = len(keywords) * 10
         
         # +5 por menciones específicas de lugares
-        location_bonus = 5 if any(loc in text.lower() for loc in ['gaza', 'west bank', 'jerusalem', 'palestine']) else 0
+        location_bonus = 5 if self.location_automaton.contains_any(text_lower, already_lower=True) else 0
         
         # +15 si menciona números de víctimas
-        victim_bonus = 15 if re.search(r'\d+.*(?:killed|dead|wounded|injured)', text.lower()) else 0
+        victim_bonus = 15 if re.search(r'\d+.*(?:killed|dead|wounded|injured)', text_lower) else 0
         
         # +10 si menciona fuentes oficiales
-        source_bonus = 10 if any(src in text.lower() for src in ['human rights', 'amnesty', 'btselem', 'ocha']) else 0
+        source_bonus = 10 if self.source_automaton.contains_any(text_lower, already_lower=True) else 0
         
         total_score = min(100, base_score + keyword_score + location_bonus + victim_bonus + source_bonus)
         return total_score
 
-    def save_to_json(self, tweets: List[Dict]) -> str:
-        """Guarda tweets en archivo JSON con metadata completa"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"centinela_gamma_tweets_maximized_{timestamp}.json"
-        
-        # Calcular estadísticas
-        keyword_freq = {}
-        authors = set()
-        
-        for tweet in tweets:
-            for keyword in tweet.get('keywords_detected', []):
-                keyword_freq[keyword] = keyword_freq.get(keyword, 0) + 1
-            authors.add(tweet.get('author', tweet.get('author_id', 'unknown')))
-        
-        # Top 10 keywords
-        top_keywords = sorted(keyword_freq.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        # Metadata completa
-        metadata = {
+    def get_stats(self, tweets: List[Dict] = None) -> ExtractionAccumulator:
+        """
+        Devuelve las estadísticas acumuladas durante la extracción. Si los tweets
+        no provienen de `extract_tweets_maximized`, las calcula en una sola pasada.
+        """
+        streamed = self.writer is not None
+        if tweets is not None and not streamed and self.stats.total_tweets != len(tweets):
+            self.stats = ExtractionAccumulator.from_tweets(tweets)
+        return self.stats
+
+    def build_metadata(self, stats: ExtractionAccumulator) -> Dict:
+        """Construye el metadata completo a partir de las estadísticas acumuladas"""
+        return {
             'extraction_info': {
                 'timestamp': datetime.now().isoformat(),
                 'total_tweets': self.total_tweets,
@@ -403,45 +601,52 @@ class CentinelaGammaMaximized:
                 'tweets_per_dollar': self.total_tweets / max(self.total_tweets * self.cost_per_tweet, 0.001),
                 'target_region': self.target_region
             },
-            'statistics': {
-                'critical_tweets': self.critical_tweets,
-                'critical_percentage': round((self.critical_tweets / max(self.total_tweets, 1)) * 100, 2),
-                'total_keywords': sum(keyword_freq.values()),
-                'unique_keywords': len(keyword_freq),
-                'unique_authors': len(authors),
-                'queries_executed': len(self.queries),
-                'tweets_with_location': sum(1 for t in tweets if t.get('location')),
-                'tweets_with_metrics': sum(1 for t in tweets if t.get('metrics')),
-                'avg_relevance': round(sum(t.get('relevance_score', 0) for t in tweets) / max(len(tweets), 1), 2)
-            },
-            'query_breakdown': {
-                query: {
-                    'tweet_count': sum(1 for t in tweets if t.get('query_source') == query),
-                    'critical_count': sum(1 for t in tweets if t.get('query_source') == query and t.get('is_critical')),
-                    'avg_relevance': round(sum(t.get('relevance_score', 0) for t in tweets if t.get('query_source') == query) / 
-                                         max(sum(1 for t in tweets if t.get('query_source') == query), 1), 2)
-                }
-                for query in self.queries
-            },
-            'top_keywords': top_keywords,
-            'war_crimes_indicators': {
-                'civilian_casualties': sum(1 for t in tweets if any(kw in t.get('keywords_detected', []) for kw in ['killed', 'dead', 'children killed'])),
-                'infrastructure_attacks': sum(1 for t in tweets if any(kw in t.get('keywords_detected', []) for kw in ['hospital bombed', 'school destroyed', 'mosque damaged'])),
-                'settlement_activities': sum(1 for t in tweets if any(kw in t.get('keywords_detected', []) for kw in ['illegal settlement', 'home demolition'])),
-                'humanitarian_violations': sum(1 for t in tweets if any(kw in t.get('keywords_detected', []) for kw in ['siege', 'blockade', 'collective punishment']))
-            }
+            'statistics': stats.statistics(len(self.queries)),
+            'query_breakdown': stats.query_breakdown(self.queries),
+            'top_keywords': stats.top_keywords(10),
+            'war_crimes_indicators': dict(stats.war_crimes_indicators)
         }
+
+    def save_to_json(self, tweets: List[Dict]) -> str:
+        """Guarda tweets en archivo JSON (comprimido según `compression`) con metadata completa"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"centinela_gamma_tweets_maximized_{timestamp}.json{COMPRESSION_SUFFIXES[self.compression]}"
         
-        # Estructura final
-        output_data = {
-            'metadata': metadata,
-            'tweets': tweets
-        }
+        stats = self.get_stats(tweets)
+        metadata = self.build_metadata(stats)
+        self.record_run(metadata)
         
-        # Guardar archivo
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        # Guardar archivo tweet a tweet: {"metadata": ..., "tweets": [...]}
+        with open_text_writer(filename, self.compression) as f:
+            write_json_document(f, metadata, tweets)
         
+        self.print_save_summary(filename, stats)
+        return filename
+
+    def open_stream_writer(self) -> NDJSONTweetWriter:
+        """Abre el archivo NDJSON donde se escribirán los tweets en streaming"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"centinela_gamma_tweets_maximized_{timestamp}.ndjson{COMPRESSION_SUFFIXES[self.compression]}"
+        return NDJSONTweetWriter(filename, compression=self.compression)
+
+    def finalize_stream(self, writer: NDJSONTweetWriter) -> str:
+        """Cierra el archivo NDJSON agregando el registro final de metadata"""
+        stats = self.get_stats()
+        metadata = self.build_metadata(stats)
+        self.record_run(metadata)
+        writer.close(metadata)
+        self.print_save_summary(writer.filename, stats)
+        return writer.filename
+
+    def record_run(self, metadata: Dict):
+        """Vuelca los tweets pendientes a la base de datos y registra la extracción"""
+        if self.store is None:
+            return
+        self.store.record_run(metadata)
+        print(f"🗄️ Base de datos actualizada: {self.store.path} ({self.store.count():,} tweets)")
+
+    def print_save_summary(self, filename: str, stats: ExtractionAccumulator):
+        """Muestra el resumen del archivo guardado"""
         file_size_mb = os.path.getsize(filename) / (1024 * 1024)
         
         print("💾 TWEETS GUARDADOS EN JSON:")
@@ -449,35 +654,20 @@ class CentinelaGammaMaximized:
         print(f"   📊 Total tweets: {self.total_tweets:,}")
         print(f"   💾 Tamaño archivo: {file_size_mb:.2f} MB")
         print(f"   🚨 Tweets críticos: {self.critical_tweets}")
-        print(f"   👥 Autores únicos: {len(authors)}")
+        print(f"   👥 Autores únicos: {len(stats.authors)}")
         print(f"   💰 Costo por tweet: ${self.cost_per_tweet:.7f}")
-        
-        return filename
 
-    def generate_report(self, tweets: List[Dict]):
+
+    def generate_report(self, tweets: List[Dict] = None):
         """Genera reporte completo de la extracción"""
         duration = datetime.now() - self.start_time if self.start_time else timedelta(0)
         budget_used = self.total_tweets * self.cost_per_tweet
         
-        # Calcular estadísticas de keywords
-        keyword_freq = {}
-        for tweet in tweets:
-            for keyword in tweet.get('keywords_detected', []):
-                keyword_freq[keyword] = keyword_freq.get(keyword, 0) + 1
-        
-        top_keywords = sorted(keyword_freq.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        # Queries más productivas
-        query_stats = {}
-        for tweet in tweets:
-            query = tweet.get('query_source', 'unknown')
-            if query not in query_stats:
-                query_stats[query] = {'total': 0, 'critical': 0}
-            query_stats[query]['total'] += 1
-            if tweet.get('is_critical'):
-                query_stats[query]['critical'] += 1
+        stats = self.get_stats(tweets)
         
-        top_queries = sorted(query_stats.items(), key=lambda x: x[1]['total'], reverse=True)[:10]
+        # Keywords y queries más productivas (ya acumuladas durante la extracción)
+        top_keywords = stats.top_keywords(10)
+        top_queries = stats.top_queries(10)
         
         print("="*80)
         print("🕊️ CENTINELA-GAMMA MAXIMIZED - REPORTE DOCUMENTACIÓN CRÍMENES DE GUERRA")
@@ -491,7 +681,12 @@ class CentinelaGammaMaximized:
         print("\n🎯 DOCUMENTACIÓN MASIVA:")
         print(f"   📱 Total extraído: {self.total_tweets:,} tweets")
         print(f"   🚨 Críticos detectados: {self.critical_tweets:,}")
+        print(f"   🧬 Duplicados descartados: {stats.duplicates_skipped:,}")
         print(f"   🔍 Requests ejecutados: {self.requests_made}")
+        if self.response_cache is not None:
+            cache = self.response_cache.summary()
+            print(f"   🗃️ Caché de respuestas: {cache['hits']} aciertos, {cache['misses']} fallos "
+                  f"({cache['hit_rate']:.0%}), {cache['entries']} entradas, {cache['size_mb']} MB")
         print(f"   ⏱️ Duración: {duration}")
         print(f"   🏆 Tweets por minuto: {self.total_tweets/(duration.total_seconds()/60) if duration.total_seconds() > 0 else 0:.0f}")
         
@@ -499,6 +694,13 @@ class CentinelaGammaMaximized:
         for query, stats in top_queries:
             print(f"   • {query}: {stats['total']} tweets ({stats['critical']} críticos)")
         
+        yield_rows = [row for row in self.scheduler.summary() if row['requests'] > 0]
+        if yield_rows:
+            print("\n🎰 RENDIMIENTO POR QUERY (histórico):")
+            for row in yield_rows[:5]:
+                print(f"   • {row['query'][:60]}: {row['critical_per_request']} críticos/request, "
+                      f"{row['duplicate_rate']:.0%} duplicados, {row['requests']:.0f} requests")
+        
         print("\n🔑 KEYWORDS MÁS FRECUENTES:")
         for keyword, count in top_keywords:
             print(f"   • {keyword}: {count:,} menciones")
@@ -547,16 +749,86 @@ class CentinelaGammaMaximized:
         except Exception as e:
             print(f"⚠️ Error actualizando recursos: {e}")
 
+def parse_args():
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="CENTINELA-GAMMA MAXIMIZED")
+    parser.add_argument('--ndjson', action='store_true',
+                        help="Escribir tweets en streaming (NDJSON) con memoria constante")
+    parser.add_argument('--workers', type=int, default=8,
+                        help="Queries ejecutadas en paralelo (default: 8)")
+    parser.add_argument('--db', default=DATABASE_PATH,
+                        help=f"Base de datos SQLite de tweets (default: {DATABASE_PATH})")
+    parser.add_argument('--no-db', action='store_true',
+                        help="No guardar tweets en la base de datos")
+    parser.add_argument('--compress', choices=sorted(COMPRESSION_SUFFIXES), default='gzip',
+                        help="Compresión del archivo de salida (default: gzip; zstd requiere 'zstandard')")
+    parser.add_argument('--max-query-length', type=int, default=MAX_QUERY_LENGTH,
+                        help=f"Longitud máxima de cada consulta OR agrupada (default: {MAX_QUERY_LENGTH})")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Modo continuo: extraer periódicamente y actualizar el dashboard en cada ciclo")
+    parser.add_argument('--interval', type=float, default=300.0,
+                        help="Segundos entre ciclos en modo daemon (default: 300)")
+    parser.add_argument('--cycles', type=int, default=0,
+                        help="Número de ciclos en modo daemon (default: 0 = sin límite)")
+    parser.add_argument('--cache', action='store_true',
+                        help="Cachear en disco las respuestas de la API (las repeticiones no gastan presupuesto)")
+    parser.add_argument('--cache-dir', default="data/response_cache",
+                        help="Directorio de la caché de respuestas (default: data/response_cache)")
+    parser.add_argument('--cache-ttl', type=float, default=3600.0,
+                        help="Validez de cada respuesta cacheada en segundos (default: 3600)")
+    parser.add_argument('--cache-max-mb', type=float, default=512.0,
+                        help="Tamaño máximo de la caché en MB (default: 512)")
+    parser.add_argument('--cache-head-window', type=float, default=60.0,
+                        help="Segundos que se reutiliza la primera página de cada query (default: 60, 0 = no cachearla)")
+    parser.add_argument('--api-base-url', default=None,
+                        help="URL base alternativa de la API (p. ej. http://localhost:8090 del mock)")
+    parser.add_argument('--sim-tweets', type=int, default=50000,
+                        help="Tweets de la simulación masiva (default: 50000)")
+    parser.add_argument('--sim-chunk-size', type=int, default=10000,
+                        help="Tweets por bloque de simulación (default: 10000)")
+    parser.add_argument('--sim-workers', type=int, default=1,
+                        help="Procesos que generan la simulación (default: 1)")
+    parser.add_argument('--sim-seed', type=int, default=None,
+                        help="Semilla para una simulación aleatoria reproducible")
+    return parser.parse_args()
+
 def main():
     """Función principal de CENTINELA-GAMMA"""
-    gamma = CentinelaGammaMaximized(budget_dollars=2.0)
+    args = parse_args()
+    response_cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl,
+                                   max_bytes=int(args.cache_max_mb * 1024 * 1024),
+                                   head_window=args.cache_head_window) if args.cache else None
+    gamma = CentinelaGammaMaximized(budget_dollars=2.0, max_workers=args.workers,
+                                    database_path=None if args.no_db else args.db,
+                                    simulation_tweets=args.sim_tweets,
+                                    simulation_chunk_size=args.sim_chunk_size,
+                                    simulation_workers=args.sim_workers,
+                                    simulation_seed=args.sim_seed,
+                                    compression=args.compress,
+                                    max_query_length=args.max_query_length,
+                                    api_base_url=args.api_base_url,
+                                    response_cache=response_cache)
     gamma.print_configuration()
     
-    # Extraer tweets
-    tweets = gamma.extract_tweets_maximized()
+    if args.daemon:
+        # Colector continuo: cliente y estado se mantienen entre ciclos
+        CollectorDaemon(gamma, interval=args.interval, max_cycles=args.cycles).run()
+        return
     
-    # Guardar en JSON
-    filename = gamma.save_to_json(tweets)
+    if args.ndjson:
+        # Extraer tweets escribiendo cada uno en disco a medida que llega
+        writer = gamma.open_stream_writer()
+        try:
+            gamma.extract_tweets_maximized(writer=writer)
+        finally:
+            filename = gamma.finalize_stream(writer)
+        tweets = None
+    else:
+        # Extraer tweets
+        tweets = gamma.extract_tweets_maximized()
+        
+        # Guardar en JSON
+        filename = gamma.save_to_json(tweets)
     
     # Generar reporte
     report = gamma.generate_report(tweets)
@@ -567,7 +839,7 @@ def main():
     print(f"\n💾 ARCHIVO JSON GENERADO:")
     print(f"   📄 {filename}")
     print(f"   💾 {os.path.getsize(filename)/(1024*1024):.2f} MB")
-    print(f"   🗂️ Estructura: metadata + {len(tweets):,} tweets completos")
+    print(f"   🗂️ Estructura: metadata + {gamma.total_tweets:,} tweets completos")
     
     print("\n🏆 ACHIEVEMENT UNLOCKED:")
     print(f"   🎯 DOCUMENTACIÓN MASIVA COMPLETADA")
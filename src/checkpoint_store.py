@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+🕊️ CHECKPOINT STORE - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Cursores por query (since_id / next_token) para extracción incremental y reanudable
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+def newer_id(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    """Devuelve el id de tweet más reciente (los ids de Twitter son crecientes)"""
+    if not a:
+        return b
+    if not b:
+        return a
+    try:
+        return a if int(a) >= int(b) else b
+    except ValueError:
+        return max(a, b)
+
+
+class CheckpointStore:
+    """
+    Guarda en disco, por query:
+      - `since_id`: tweet más reciente de la última pasada completa
+      - `next_token`: página pendiente si la pasada quedó interrumpida
+      - `pending_newest_id`: tweet más reciente de la pasada en curso
+
+    Cada página procesada se persiste de forma atómica, de modo que una
+    ejecución interrumpida retoma exactamente en la página siguiente.
+    """
+
+    def __init__(self, path: str = "data/centinela_checkpoints.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('queries', {})
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Checkpoint ilegible ({self.path}), empezando desde cero: {e}")
+            return {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'queries': self._state}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get(self, query: str) -> Dict[str, Any]:
+        """Cursor actual de una query (copia)"""
+        with self._lock:
+            return dict(self._state.get(query, {}))
+
+    def record_page(self, query: str, meta: Dict[str, Any]):
+        """
+        Avanza el cursor tras procesar una página. Al llegar a la última página
+        la pasada se da por completa y `since_id` pasa al tweet más reciente visto.
+        """
+        with self._lock:
+            entry = self._state.setdefault(query, {})
+
+            # Primera página de una pasada nueva: su newest_id será el próximo since_id
+            if not entry.get('next_token'):
+                entry['pending_newest_id'] = meta.get('newest_id')
+            else:
+                entry['pending_newest_id'] = newer_id(entry.get('pending_newest_id'), meta.get('newest_id'))
+
+            entry['next_token'] = meta.get('next_token')
+            if not entry['next_token']:
+                entry['since_id'] = newer_id(entry.get('since_id'), entry.pop('pending_newest_id', None))
+                entry['last_complete_sweep'] = datetime.now().isoformat()
+            entry['updated_at'] = datetime.now().isoformat()
+
+            self._save()
+
+    def pending_queries(self) -> int:
+        """Número de queries con una pasada a medio terminar"""
+        with self._lock:
+            return sum(1 for entry in self._state.values() if entry.get('next_token'))
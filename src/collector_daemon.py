@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+🕊️ COLLECTOR DAEMON - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Modo continuo: extracción periódica con cliente y estado en memoria, y dashboard incremental
+"""
+
+import time
+from datetime import datetime
+from typing import Dict, Any
+
+from palestine_tweets_processor import PalestineTweetsProcessor
+
+
+class CollectorDaemon:
+    """
+    Ejecuta ciclos de extracción cada `interval` segundos reutilizando la
+    misma instancia del colector (cliente HTTP, token bucket, checkpoints,
+    filtro de ids y scheduler) y del procesador (batch en memoria).
+
+    Cada ciclo solo ingiere tweets nuevos (since_id + filtro de ids vistos),
+    los registra en la base de datos y los agrega al procesador, que regenera
+    data.json en cuanto termina el ciclo.
+    """
+
+    def __init__(self, collector: Any, processor: PalestineTweetsProcessor = None,
+                 interval: float = 300.0, max_cycles: int = 0):
+        self.collector = collector
+        self.processor = processor or PalestineTweetsProcessor(database_path=collector.store.path
+                                                               if collector.store is not None else None)
+        self.interval = interval
+        self.max_cycles = max_cycles
+        self.cycles = 0
+
+        # En modo continuo no se mezclan tweets simulados con los reales
+        self.collector.simulation_fallback = False
+        # Cada ciclo debe ver los tweets nuevos: solo se cachean páginas de continuación
+        if self.collector.response_cache is not None:
+            self.collector.response_cache.head_window = 0
+
+    def run_cycle(self) -> Dict[str, Any]:
+        """Ejecuta un ciclo de extracción y actualiza el dashboard si hubo tweets nuevos"""
+        collector = self.collector
+        collector.requests_made = 0  # El presupuesto se aplica por ciclo
+        tweets = collector.extract_tweets_maximized()
+
+        summary = {
+            'cycle': self.cycles + 1,
+            'timestamp': datetime.now().isoformat(),
+            'new_tweets': len(tweets),
+            'critical_tweets': collector.stats.critical_tweets,
+            'duplicates_skipped': collector.stats.duplicates_skipped,
+            'requests_made': collector.requests_made,
+            'dashboard': None
+        }
+        if tweets:
+            metadata = collector.build_metadata(collector.stats)
+            collector.record_run(metadata)
+            summary['dashboard'] = self.processor.ingest(tweets, metadata)
+            collector.update_resources(round(len(tweets) * collector.cost_per_tweet, 6))
+        return summary
+
+    def run(self):
+        """Bucle principal: un ciclo cada `interval` segundos hasta Ctrl+C o `max_cycles`"""
+        if self.collector.simulation_mode:
+            print("❌ El modo daemon requiere acceso a la API (TWITTER_BEARER_TOKEN o --api-base-url)")
+            return
+
+        print(f"🔁 MODO DAEMON: ciclo cada {self.interval:.0f}s"
+              + (f", {self.max_cycles} ciclos" if self.max_cycles else "") + " (Ctrl+C para detener)")
+        try:
+            while True:
+                started = time.monotonic()
+                summary = self.run_cycle()
+                self.cycles += 1
+                duration = time.monotonic() - started
+
+                print(f"🔁 Ciclo {summary['cycle']}: {summary['new_tweets']:,} tweets nuevos, "
+                      f"{summary['critical_tweets']:,} críticos, {summary['requests_made']} requests, "
+                      f"{duration:.1f}s")
+                if self.collector.response_cache is not None:
+                    cache = self.collector.response_cache.summary()
+                    print(f"   🗃️ Caché: {cache['hits']} aciertos, {cache['misses']} fallos")
+                if summary['dashboard']:
+                    print(f"   📊 Dashboard actualizado: {summary['dashboard']}")
+
+                if self.max_cycles and self.cycles >= self.max_cycles:
+                    break
+                # Ritmo fijo: el siguiente ciclo empieza `interval` segundos después del anterior
+                time.sleep(max(self.interval - (time.monotonic() - started), 0))
+        except KeyboardInterrupt:
+            print("\n🔁 Daemon detenido por el usuario")
+        finally:
+            if self.collector.store is not None:
+                self.collector.store.flush()
+            print(f"🔁 Ciclos completados: {self.cycles}")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+🕊️ EXTRACTION STATS - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Acumulador de metadata de extracción actualizado tweet a tweet
+"""
+
+from typing import Dict, List, Any, Iterable, Tuple
+
+
+# Grupos de keywords para los indicadores de crímenes de guerra del metadata
+WAR_CRIMES_INDICATOR_KEYWORDS = {
+    'civilian_casualties': ['killed', 'dead', 'children killed'],
+    'infrastructure_attacks': ['hospital bombed', 'school destroyed', 'mosque damaged'],
+    'settlement_activities': ['illegal settlement', 'home demolition'],
+    'humanitarian_violations': ['siege', 'blockade', 'collective punishment']
+}
+
+
+class ExtractionAccumulator:
+    """
+    Mantiene todas las estadísticas que `save_to_json` y `generate_report`
+    necesitan, actualizadas en O(1) por tweet. Al terminar la extracción el
+    metadata está listo sin volver a recorrer la lista de tweets.
+    """
+
+    def __init__(self):
+        self.total_tweets = 0
+        self.critical_tweets = 0
+        self.relevance_sum = 0
+        self.tweets_with_location = 0
+        self.tweets_with_metrics = 0
+        self.keyword_freq: Dict[str, int] = {}
+        self.authors = set()
+        self.query_stats: Dict[str, Dict[str, int]] = {}
+        self.duplicates_skipped = 0
+        self.query_duplicates: Dict[str, int] = {}
+        self.war_crimes_indicators = {name: 0 for name in WAR_CRIMES_INDICATOR_KEYWORDS}
+
+    @classmethod
+    def from_tweets(cls, tweets: Iterable[Dict]) -> 'ExtractionAccumulator':
+        """Construye un acumulador en una sola pasada sobre tweets existentes"""
+        accumulator = cls()
+        for tweet in tweets:
+            accumulator.add(tweet)
+        return accumulator
+
+    def add(self, tweet: Dict):
+        """Incorpora un tweet procesado a todas las estadísticas"""
+        is_critical = bool(tweet.get('is_critical', False))
+        relevance = tweet.get('relevance_score', 0)
+        keywords = tweet.get('keywords_detected', [])
+
+        self.total_tweets += 1
+        if is_critical:
+            self.critical_tweets += 1
+        self.relevance_sum += relevance
+        if tweet.get('location'):
+            self.tweets_with_location += 1
+        if tweet.get('metrics'):
+            self.tweets_with_metrics += 1
+
+        for keyword in keywords:
+            self.keyword_freq[keyword] = self.keyword_freq.get(keyword, 0) + 1
+        self.authors.add(tweet.get('author', tweet.get('author_id', 'unknown')))
+
+        # Cada query que coincide con el tweet recibe el crédito completo (los totales globales, una vez)
+        for query in tweet.get('query_sources') or [tweet.get('query_source', 'unknown')]:
+            stats = self.query_stats.get(query)
+            if stats is None:
+                stats = self.query_stats[query] = {'total': 0, 'critical': 0, 'relevance_sum': 0}
+            stats['total'] += 1
+            stats['relevance_sum'] += relevance
+            if is_critical:
+                stats['critical'] += 1
+
+        for indicator, indicator_keywords in WAR_CRIMES_INDICATOR_KEYWORDS.items():
+            if any(kw in keywords for kw in indicator_keywords):
+                self.war_crimes_indicators[indicator] += 1
+
+    def add_duplicate(self, queries: List[str]):
+        """Registra un tweet repetido (ya ingerido) devuelto por `queries`"""
+        self.duplicates_skipped += 1
+        for query in queries:
+            self.query_duplicates[query] = self.query_duplicates.get(query, 0) + 1
+
+    def top_keywords(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Keywords más frecuentes (empates en orden de aparición)"""
+        return sorted(self.keyword_freq.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+    def top_queries(self, limit: int = 10) -> List[Tuple[str, Dict[str, int]]]:
+        """Queries con más tweets, en el formato de `generate_report`"""
+        stats = [(query, {'total': s['total'], 'critical': s['critical']}) for query, s in self.query_stats.items()]
+        return sorted(stats, key=lambda x: x[1]['total'], reverse=True)[:limit]
+
+    def statistics(self, queries_executed: int) -> Dict[str, Any]:
+        """Bloque `statistics` del metadata"""
+        return {
+            'critical_tweets': self.critical_tweets,
+            'critical_percentage': round((self.critical_tweets / max(self.total_tweets, 1)) * 100, 2),
+            'total_keywords': sum(self.keyword_freq.values()),
+            'unique_keywords': len(self.keyword_freq),
+            'unique_authors': len(self.authors),
+            'queries_executed': queries_executed,
+            'tweets_with_location': self.tweets_with_location,
+            'tweets_with_metrics': self.tweets_with_metrics,
+            'avg_relevance': round(self.relevance_sum / max(self.total_tweets, 1), 2),
+            'duplicates_skipped': self.duplicates_skipped
+        }
+
+    def query_breakdown(self, queries: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Bloque `query_breakdown` del metadata para las queries configuradas"""
+        breakdown = {}
+        for query in queries:
+            stats = self.query_stats.get(query, {'total': 0, 'critical': 0, 'relevance_sum': 0})
+            breakdown[query] = {
+                'tweet_count': stats['total'],
+                'critical_count': stats['critical'],
+                'avg_relevance': round(stats['relevance_sum'] / max(stats['total'], 1), 2),
+                'duplicate_count': self.query_duplicates.get(query, 0)
+            }
+        return breakdown
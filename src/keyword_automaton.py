@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+🕊️ KEYWORD AUTOMATON - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Automata Aho-Corasick para detección de keywords críticos en una sola pasada
+"""
+
+from collections import deque
+from typing import Dict, List, Tuple, Iterator
+
+
+class KeywordAutomaton:
+    """
+    Matcher multi-patrón precompilado (Aho-Corasick).
+
+    Se construye una sola vez a partir de la lista de keywords y recorre el
+    texto en minúsculas una única vez, con coste proporcional a la longitud
+    del texto y no al número de keywords. La semántica es la misma que
+    `keyword.lower() in text.lower()`: coincidencia por subcadena.
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = list(keywords)
+
+        # Trie: transiciones, enlaces de fallo y salidas (índices de keyword)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            pattern = keyword.lower()
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        self._lengths = [len(keyword.lower()) for keyword in self.keywords]
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        """Calcula enlaces de fallo por BFS y propaga las salidas"""
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+
+                # Las keywords que terminan en el estado de fallo también terminan aquí
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text_lower: str) -> Iterator[Tuple[int, int]]:
+        """
+        Recorre texto YA en minúsculas y produce (índice_keyword, offset_inicio)
+        para cada ocurrencia, en orden de posición final.
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        lengths = self._lengths
+        state = 0
+
+        for position, char in enumerate(text_lower):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for index in output[state]:
+                    yield index, position - lengths[index] + 1
+
+    def find_all(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Devuelve todas las coincidencias como (keyword, offset), donde el
+        offset se refiere al texto en minúsculas.
+        """
+        return [(self.keywords[index], offset) for index, offset in self.iter_matches(text.lower())]
+
+    def detect(self, text: str, already_lower: bool = False) -> List[str]:
+        """
+        Devuelve las keywords presentes en el texto (sin repetir), en el mismo
+        orden en que fueron configuradas.
+        """
+        text_lower = text if already_lower else text.lower()
+        matched = {index for index, _ in self.iter_matches(text_lower)}
+        return [self.keywords[index] for index in sorted(matched)]
+
+    def contains_any(self, text: str, already_lower: bool = False) -> bool:
+        """Indica si aparece al menos una keyword (corta en la primera)"""
+        text_lower = text if already_lower else text.lower()
+        for _ in self.iter_matches(text_lower):
+            return True
+        return False
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+🕊️ METRIC STATE - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Estado incremental del motor de métricas en SQLite: una fila por acumulador y filas por autor
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+METRIC_STATE_PATH = "data/metrics_state.db"
+METRIC_STATE_VERSION = 6
+
+SCHEMA = """
+-- Marca de agua y procedencia del estado guardado
+CREATE TABLE IF NOT EXISTS state_info (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    database_path TEXT NOT NULL,
+    high_water_mark INTEGER NOT NULL,
+    tweets_processed INTEGER NOT NULL,
+    saved_at TEXT NOT NULL
+);
+
+-- Estado acotado de cada acumulador (JSON de `state`)
+CREATE TABLE IF NOT EXISTS accumulator_state (
+    name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+
+-- Autores del análisis de bots; `author` es la clave en JSON (conserva su tipo)
+CREATE TABLE IF NOT EXISTS bot_authors (
+    author TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    tweets INTEGER NOT NULL,
+    engagement INTEGER NOT NULL,
+    texts INTEGER NOT NULL,
+    repeated INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bot_authors_repeated ON bot_authors(repeated, seq);
+
+-- Huellas de los prefijos de texto distintos de cada autor (64 bits con signo)
+CREATE TABLE IF NOT EXISTS bot_author_texts (
+    author TEXT NOT NULL,
+    fingerprint INTEGER NOT NULL,
+    PRIMARY KEY (author, fingerprint)
+) WITHOUT ROWID;
+"""
+
+TABLES = ('state_info', 'accumulator_state', 'bot_authors', 'bot_author_texts')
+
+
+def signed64(value: int) -> int:
+    """Entero sin signo de 64 bits como INTEGER de SQLite (con signo)"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class BotAuthorTable:
+    """
+    Tweets, engagement y prefijos de texto distintos por autor. Cada volcado
+    lee y escribe solo las filas de los autores que aparecen en él.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def get(self, author: Any) -> Optional[Tuple[int, int, int, int]]:
+        """(seq, tweets, engagement, textos distintos) del autor, o None si es nuevo"""
+        return self.conn.execute("SELECT seq, tweets, engagement, texts FROM bot_authors WHERE author = ?",
+                                 (json.dumps(author),)).fetchone()
+
+    def add_texts(self, author: Any, fingerprints: Iterable[int]) -> int:
+        """Registra huellas de prefijos del autor; devuelve cuántas eran nuevas"""
+        key = json.dumps(author)
+        cursor = self.conn.executemany("INSERT OR IGNORE INTO bot_author_texts (author, fingerprint) VALUES (?, ?)",
+                                       ((key, signed64(fingerprint)) for fingerprint in fingerprints))
+        return max(cursor.rowcount, 0)
+
+    def put(self, author: Any, seq: int, tweets: int, engagement: int, texts: int, repeated: bool):
+        self.conn.execute("INSERT OR REPLACE INTO bot_authors (author, seq, tweets, engagement, texts, repeated) "
+                          "VALUES (?, ?, ?, ?, ?, ?)",
+                          (json.dumps(author), seq, tweets, engagement, texts, int(repeated)))
+
+    def repeated_authors(self, limit: int) -> List[Tuple[Any, int, int]]:
+        """(autor, tweets, textos distintos) de los primeros `limit` autores con contenido repetitivo"""
+        rows = self.conn.execute("SELECT author, tweets, texts FROM bot_authors WHERE repeated = 1 "
+                                 "ORDER BY seq LIMIT ?", (limit,))
+        return [(json.loads(author), tweets, texts) for author, tweets, texts in rows]
+
+
+class MetricStateStore:
+    """
+    Estado persistido del motor de métricas entre ejecuciones incrementales.
+
+    - `state_info`: versión, base de datos de origen y marca de agua (rowid).
+    - `accumulator_state`: el `state` de cada acumulador, todos acotados
+      (sketches, top-k y ventanas compactadas).
+    - `bot_authors` / `bot_author_texts`: el estado por autor del análisis
+      de bots, que crece con el número de autores; solo se tocan las filas
+      de los autores de cada delta (ver BotPatternAccumulator).
+
+    Las escrituras quedan en una transacción hasta `save`; `rollback` las
+    descarta (la próxima ejecución parte del último estado guardado).
+    """
+
+    def __init__(self, path: str = METRIC_STATE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    @staticmethod
+    def exists(path: str = METRIC_STATE_PATH) -> bool:
+        return os.path.exists(path)
+
+    def close(self):
+        self.conn.close()
+
+    def info(self) -> Optional[Dict[str, Any]]:
+        """Marca de agua y procedencia del estado guardado (None si no hay)"""
+        row = self.conn.execute("SELECT version, database_path, high_water_mark, tweets_processed, saved_at "
+                                "FROM state_info WHERE id = 1").fetchone()
+        if row is None:
+            return None
+        return dict(zip(('version', 'database_path', 'high_water_mark', 'tweets_processed', 'saved_at'), row))
+
+    def load(self) -> Dict[str, Any]:
+        """Estado del motor (mismo formato que MetricsEngine.state)"""
+        info = self.info()
+        return {
+            'tweets_processed': info['tweets_processed'] if info else 0,
+            'accumulators': {name: json.loads(state)
+                             for name, state in self.conn.execute("SELECT name, state FROM accumulator_state")}
+        }
+
+    def bot_authors(self) -> BotAuthorTable:
+        return BotAuthorTable(self.conn)
+
+    def reset(self):
+        """Vacía el estado (se confirma con `save`)"""
+        for table in TABLES:
+            self.conn.execute(f"DELETE FROM {table}")
+
+    def save(self, database_path: str, high_water_mark: int, engine_state: Dict[str, Any]):
+        """Guarda el estado de los acumuladores y la marca de agua en una transacción"""
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO accumulator_state (name, state) VALUES (?, ?)",
+                                  ((name, json.dumps(state, ensure_ascii=False))
+                                   for name, state in engine_state['accumulators'].items()))
+            self.conn.execute("INSERT OR REPLACE INTO state_info (id, version, database_path, high_water_mark, "
+                              "tweets_processed, saved_at) VALUES (1, ?, ?, ?, ?, ?)",
+                              (METRIC_STATE_VERSION, database_path, high_water_mark,
+                               engine_state['tweets_processed'], datetime.now().isoformat()))
+
+    def rollback(self):
+        """Descarta las escrituras posteriores al último `save`"""
+        self.conn.rollback()
@@ -0,0 +1,845 @@
+#!/usr/bin/env python3
+"""
+🕊️ METRICS ENGINE - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Motor de métricas en una sola pasada: los analizadores registran acumuladores sobre bloques columnares
+y su estado parcial es serializable y fusionable (procesamiento incremental)
+"""
+
+import heapq
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from itertools import islice
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Tuple
+
+from tweet_batch import TweetBatch
+from sketches import DistinctCounter, DEFAULT_EXACT_THRESHOLD, stable_hash64
+from near_duplicates import NearDuplicateIndex
+from timing_clusters import TimingClusterIndex
+from timestamps import hour_day_counts
+from top_k import TopK
+from vectorized import column_sum, count_above, code_counts, code_sums, last_rows, masked_total, encode
+
+# Tweets por bloque cuando la entrada es un iterable (memoria acotada por bloque)
+DEFAULT_CHUNK_SIZE = 20000
+
+# Categorías de keywords del análisis de palabras clave
+KEYWORD_CATEGORIES = {
+    'violencia': ['killed', 'dead', 'murdered', 'shot', 'bombing', 'airstrike', 'shelling'],
+    'victimas': ['children killed', 'civilians killed', 'family killed', 'women', 'elderly'],
+    'infraestructura': ['hospital bombed', 'school destroyed', 'mosque damaged', 'home demolition'],
+    'militar': ['IDF', 'Israeli forces', 'Israeli army', 'tank', 'drone strike', 'F-16'],
+    'legal': ['war crime', 'genocide', 'ethnic cleansing', 'apartheid', 'illegal settlement'],
+    'humanitario': ['siege', 'blockade', 'collective punishment', 'humanitarian crisis']
+}
+
+# Keywords de los indicadores de crímenes de guerra
+CIVILIAN_KEYWORDS = ['civilians killed', 'children killed', 'family killed', 'killed', 'dead']
+INFRASTRUCTURE_KEYWORDS = ['hospital bombed', 'school destroyed', 'mosque damaged', 'bombing', 'airstrike']
+SETTLEMENT_KEYWORDS = ['illegal settlement', 'home demolition', 'settlers attack']
+HUMANITARIAN_KEYWORDS = ['siege', 'blockade', 'collective punishment', 'humanitarian crisis']
+KEYWORD_INDICATORS = {
+    'civilian_casualties': CIVILIAN_KEYWORDS,
+    'infrastructure_attacks': INFRASTRUCTURE_KEYWORDS,
+    'settlement_activities': SETTLEMENT_KEYWORDS,
+    'humanitarian_violations': HUMANITARIAN_KEYWORDS
+}
+
+# Indicadores que se detectan en el texto del tweet
+TEXT_INDICATORS = ('children_casualties', 'medical_attacks', 'education_attacks', 'religious_site_attacks')
+
+# Keywords de los ejemplos representativos por categoría
+EXAMPLE_KEYWORDS = {
+    'civilian_casualties': ['civilians killed', 'children killed', 'family killed'],
+    'infrastructure_attacks': ['hospital bombed', 'school destroyed', 'bombing'],
+    'war_crimes': ['war crime', 'genocide', 'ethnic cleansing']
+}
+
+WEST_BANK_LOCATIONS = ['west bank', 'ramallah', 'jenin', 'nablus', 'hebron']
+
+
+def iter_batches(tweets: Iterable[Dict], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[TweetBatch]:
+    """
+    Bloques columnares de la entrada. Un TweetBatch se procesa como un único
+    bloque (sin copiarlo); una fuente con `iter_batches` (p. ej. TweetRange)
+    entrega sus propios bloques; cualquier otro iterable se consume de a `chunk_size`.
+    """
+    if isinstance(tweets, TweetBatch):
+        yield tweets
+        return
+    if hasattr(tweets, 'iter_batches'):
+        yield from tweets.iter_batches(chunk_size)
+        return
+    iterator = iter(tweets)
+    while True:
+        batch = TweetBatch.from_dicts(islice(iterator, chunk_size))
+        if not len(batch):
+            return
+        yield batch
+
+
+def first_rows_with_keywords(batch: TweetBatch, keywords: List[str], limit: int) -> List[int]:
+    """Primeras `limit` filas del bloque que contienen alguno de `keywords`"""
+    if limit <= 0:
+        return []
+    matching_codes = [any(kw in detected for kw in keywords) for detected in batch.keywords.values]
+    rows = []
+    for i, code in enumerate(batch.keywords.codes):
+        if matching_codes[code]:
+            rows.append(i)
+            if len(rows) == limit:
+                break
+    return rows
+
+
+def format_example_tweet(tweet: Dict) -> Dict:
+    """Formatea un tweet de ejemplo"""
+    return {
+        'text': tweet.get('text', '')[:200] + '...' if len(tweet.get('text', '')) > 200 else tweet.get('text', ''),
+        'location': tweet.get('location', 'Unknown'),
+        'relevance_score': tweet.get('relevance_score', 0),
+        'is_critical': tweet.get('is_critical', False),
+        'keywords': tweet.get('keywords_detected', [])[:3],  # Solo primeras 3
+        'engagement': {
+            'retweets': tweet.get('metrics', {}).get('retweet_count', 0),
+            'likes': tweet.get('metrics', {}).get('like_count', 0)
+        }
+    }
+
+
+def bot_recommendations(bot_probability: float) -> List[str]:
+    """Genera recomendaciones basadas en probabilidad de bots"""
+    if bot_probability > 80:
+        return [
+            "ALTO RIESGO: Implementar filtros anti-bot inmediatamente",
+            "Validar manualmente muestra de usuarios más activos",
+            "Incrementar verificación de fuentes",
+            "Implementar análisis de red para detectar coordinación"
+        ]
+    elif bot_probability > 60:
+        return [
+            "RIESGO MEDIO: Analizar patrones temporales detalladamente",
+            "Verificar autenticidad de cuentas más activas",
+            "Implementar alertas automáticas para volumen anómalo",
+            "Considerar filtros adicionales de contenido"
+        ]
+    else:
+        return [
+            "RIESGO BAJO: Mantener monitoreo regular",
+            "Continuar análisis de tendencias",
+            "Documentar patrones para referencia futura"
+        ]
+
+
+class MetricAccumulator(ABC):
+    """
+    Analizador del motor: consume bloques en orden (`add_batch`) y produce su
+    sección de data.json (`result`). `offset` es el índice global de la
+    primera fila del bloque, para desempates por orden de aparición.
+
+    El estado parcial se exporta como JSON (`state` / `load_state`) y dos
+    acumuladores del mismo tipo se fusionan con `merge`, donde `other` cubre
+    tweets posteriores a los ya acumulados. Un acumulador sin alguno de
+    estos métodos falla al instanciarse, no a mitad del análisis.
+    """
+
+    name = ''
+    label = ''
+
+    @abstractmethod
+    def add_batch(self, batch: TweetBatch, offset: int):
+        raise NotImplementedError
+
+    @abstractmethod
+    def result(self) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def state(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_state(self, state: Dict[str, Any]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def merge(self, other: 'MetricAccumulator'):
+        raise NotImplementedError
+
+    def compact(self):
+        """Acota el estado antes de persistirlo (ver cada acumulador)"""
+
+    def attach_state(self, store):
+        """
+        Pasa a `store` (MetricStateStore) la parte del estado que no va en
+        `state` (p. ej. filas por autor). Desde entonces el acumulador solo
+        guarda en memoria lo posterior al último volcado.
+        """
+
+
+class BasicMetricsAccumulator(MetricAccumulator):
+    """Conteos, sumas de relevancia/engagement y autores únicos"""
+
+    name = 'basic_metrics'
+    label = '📊 Métricas básicas'
+
+    COUNTERS = ('total_tweets', 'critical_tweets', 'relevance_total', 'high_relevance', 'total_retweets', 'total_likes')
+
+    def __init__(self, original_metadata: Dict = None, author_threshold: int = DEFAULT_EXACT_THRESHOLD):
+        # Se conserva el mismo dict: un NDJSONTweetReader lo completa al terminar la pasada
+        self.original_metadata = original_metadata if original_metadata is not None else {}
+        self.total_tweets = 0
+        self.critical_tweets = 0
+        self.relevance_total = 0
+        self.high_relevance = 0
+        self.total_retweets = 0
+        self.total_likes = 0
+        # Exacto hasta `author_threshold` autores, HyperLogLog a partir de ahí
+        self.authors = DistinctCounter(author_threshold)
+
+    def add_batch(self, batch: TweetBatch, offset: int):
+        self.total_tweets += len(batch)
+        self.critical_tweets += column_sum(batch.critical_flags)
+        self.relevance_total += column_sum(batch.relevance_scores)
+        self.high_relevance += count_above(batch.relevance_scores, 80)
+        self.total_retweets += column_sum(batch.retweet_counts)
+        self.total_likes += column_sum(batch.like_counts)
+        self.authors.update(batch.distinct_authors())
+
+    def state(self) -> Dict[str, Any]:
+        state = {counter: getattr(self, counter) for counter in self.COUNTERS}
+        state['authors'] = self.authors.state()
+        return state
+
+    def load_state(self, state: Dict[str, Any]):
+        for counter in self.COUNTERS:
+            setattr(self, counter, state[counter])
+        self.authors = DistinctCounter.from_state(state['authors'])
+
+    def merge(self, other: 'BasicMetricsAccumulator'):
+        for counter in self.COUNTERS:
+            setattr(self, counter, getattr(self, counter) + getattr(other, counter))
+        self.authors.merge(other.authors)
+
+    def result(self) -> Dict:
+        total_tweets = self.total_tweets
+        unique_authors = len(self.authors)
+        return {
+            'total_tweets': total_tweets,
+            'critical_tweets': self.critical_tweets,
+            'critical_percentage': round((self.critical_tweets / max(total_tweets, 1)) * 100, 2),
+            'unique_authors': unique_authors,
+            'avg_tweets_per_author': round(total_tweets / max(unique_authors, 1), 2),
+            'avg_relevance_score': round(self.relevance_total / max(total_tweets, 1), 2),
+            'high_relevance_count': self.high_relevance,
+            'total_retweets': self.total_retweets,
+            'total_likes': self.total_likes,
+            'avg_engagement': round((self.total_retweets + self.total_likes) / max(total_tweets, 1), 2),
+            'extraction_info': self.original_metadata.get('extraction_info', {}),
+            'war_crimes_indicators': self.original_metadata.get('war_crimes_indicators', {})
+        }
+
+
+def author_patterns(tweet_count: int, engagement_total: int, unique_texts: int) -> Tuple[bool, bool, bool]:
+    """(alto volumen, contenido repetitivo, engagement bajo) de un autor"""
+    return (tweet_count > 30,  # Más de 30 tweets del mismo autor
+            tweet_count > 5 and (unique_texts / tweet_count) < 0.7,
+            tweet_count > 10 and engagement_total / tweet_count < 1)
+
+
+class BotPatternAccumulator(MetricAccumulator):
+    """
+    Volumen, engagement y repetición de contenido por autor, y copy-paste entre cuentas.
+
+    Con `attach_state` el estado por autor vive en las tablas del
+    MetricStateStore: `authors` guarda solo el delta desde el último volcado,
+    que `flush_authors` suma a las filas de esos autores actualizando los
+    conteos de patrones (`author_counts`) sin recorrer el resto.
+    """
+
+    name = 'bot_analysis'
+    label = '🤖 Patrones de bots'
+
+    PATTERNS = ('high_volume_authors', 'repeated_content', 'low_engagement_spam')
+    SIMILARITY_SAMPLES = 5
+
+    def __init__(self):
+        self.total_tweets = 0
+        # autor -> [tweets, engagement total, huellas de 64 bits de los prefijos de texto]
+        # (en orden de aparición; las huellas mantienen el estado persistido compacto)
+        self.authors: Dict[Any, list] = {}
+        # Autores ya volcados en `author_table` y cuántos cumplen cada patrón
+        self.author_table = None
+        self.author_counts = dict.fromkeys(('authors',) + self.PATTERNS, 0)
+        # Clusters de contenido casi duplicado en todo el corpus
+        self.near_duplicates = NearDuplicateIndex()
+        # Ráfagas temporales por autor y por contenido idéntico
+        self.timing = TimingClusterIndex()
+
+    def add_batch(self, batch: TweetBatch, offset: int):
+        # Todo el trabajo sobre el contenido (normalización, huellas, MinHash)
+        # se hace una vez por texto distinto del batch, no por tweet
+        self.total_tweets += len(batch)
+        authors, author_codes = batch.author_keys()
+        texts, text_codes = encode(batch.texts)
+        tweet_counts = code_counts(author_codes, len(authors))
+        engagement_totals = [retweets + likes for retweets, likes in
+                             zip(code_sums(author_codes, batch.retweet_counts, len(authors)),
+                                 code_sums(author_codes, batch.like_counts, len(authors)))]
+
+        prefix_fingerprints = [stable_hash64(text.lower()[:50]) for text in texts]
+        author_prefixes = [set() for _ in authors]
+        text_authors = [set() for _ in texts]
+        for text_code, code in set(zip(text_codes, author_codes)):
+            author_prefixes[code].add(prefix_fingerprints[text_code])
+            text_authors[text_code].add(authors[code])
+        positions = [offset + row for row in last_rows(text_codes, len(texts))]
+        fingerprints = self.near_duplicates.add_batch(texts, code_counts(text_codes, len(texts)),
+                                                      text_authors, positions)
+
+        self.timing.add_batch(authors, author_codes, batch.epochs, fingerprints, text_codes)
+
+        for code, author in enumerate(authors):
+            self.fold_author(author, tweet_counts[code], engagement_totals[code], author_prefixes[code])
+
+    def fold_author(self, author: Any, tweet_count: int, engagement_total: int, fingerprints: set):
+        state = self.authors.get(author)
+        if state is None:
+            self.authors[author] = [tweet_count, engagement_total, fingerprints]
+        else:
+            state[0] += tweet_count
+            state[1] += engagement_total
+            state[2] |= fingerprints
+
+    def attach_state(self, store):
+        if self.author_table is None:
+            self.author_table = store.bot_authors()
+            self.flush_authors()
+
+    def flush_authors(self):
+        """Suma el delta de cada autor a su fila de `author_table` y actualiza `author_counts`"""
+        if self.author_table is None:
+            return
+        counts = self.author_counts
+        for author, (tweet_count, engagement_total, fingerprints) in self.authors.items():
+            row = self.author_table.get(author)
+            if row is None:
+                seq, tweets, engagement, texts = counts['authors'], 0, 0, 0
+                counts['authors'] += 1
+            else:
+                seq, tweets, engagement, texts = row
+                for pattern, flag in zip(self.PATTERNS, author_patterns(tweets, engagement, texts)):
+                    counts[pattern] -= flag
+            tweets += tweet_count
+            engagement += engagement_total
+            texts += self.author_table.add_texts(author, fingerprints)
+            flags = author_patterns(tweets, engagement, texts)
+            for pattern, flag in zip(self.PATTERNS, flags):
+                counts[pattern] += flag
+            self.author_table.put(author, seq, tweets, engagement, texts, flags[1])
+        self.authors = {}
+
+    def author_summary(self) -> Tuple[Dict[str, int], Dict[Any, float]]:
+        """
+        ({'authors': autores, patrón: autores que lo cumplen}, {autor: textos
+        distintos / tweets} de los primeros autores con contenido repetitivo)
+        """
+        if self.author_table is not None:
+            self.flush_authors()
+            return dict(self.author_counts), {
+                author: round(texts / tweets, 2)
+                for author, tweets, texts in self.author_table.repeated_authors(self.SIMILARITY_SAMPLES)}
+
+        counts = dict.fromkeys(('authors',) + self.PATTERNS, 0)
+        content_similarity = {}
+        for author, (tweet_count, engagement_total, prefixes) in self.authors.items():
+            counts['authors'] += 1
+            flags = author_patterns(tweet_count, engagement_total, len(prefixes))
+            for pattern, flag in zip(self.PATTERNS, flags):
+                counts[pattern] += flag
+            if flags[1] and len(content_similarity) < self.SIMILARITY_SAMPLES:
+                content_similarity[author] = round(len(prefixes) / tweet_count, 2)
+        return counts, content_similarity
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            'total_tweets': self.total_tweets,
+            'authors': [[author, tweet_count, engagement_total, sorted(fingerprints)]
+                        for author, (tweet_count, engagement_total, fingerprints) in self.authors.items()],
+            'author_counts': self.author_counts,
+            'near_duplicates': self.near_duplicates.state(),
+            'timing': self.timing.state()
+        }
+
+    def load_state(self, state: Dict[str, Any]):
+        self.total_tweets = state['total_tweets']
+        self.authors = {author: [tweet_count, engagement_total, set(fingerprints)]
+                        for author, tweet_count, engagement_total, fingerprints in state['authors']}
+        self.author_counts = dict(state['author_counts'])
+        self.near_duplicates = NearDuplicateIndex()
+        self.near_duplicates.load_state(state['near_duplicates'])
+        self.timing = TimingClusterIndex()
+        self.timing.load_state(state['timing'])
+
+    def merge(self, other: 'BotPatternAccumulator'):
+        # `other` es un shard: todo su estado por autor está en memoria
+        self.total_tweets += other.total_tweets
+        for author, (tweet_count, engagement_total, fingerprints) in other.authors.items():
+            self.fold_author(author, tweet_count, engagement_total, set(fingerprints))
+        self.near_duplicates.merge(other.near_duplicates)
+        self.timing.merge(other.timing)
+
+    def compact(self):
+        # Primero el timing: las ráfagas que se cierran toman su texto de ejemplo del índice
+        self.timing.compact(self.near_duplicates.sample)
+        self.near_duplicates.compact()
+
+    def result(self) -> Dict:
+        # Detectar patrones sospechosos
+        author_counts, content_similarity = self.author_summary()
+        timing_analysis = self.timing.summary(self.near_duplicates.sample)
+        suspicious_patterns = {
+            'high_volume_authors': author_counts['high_volume_authors'],  # Autores con muchos tweets
+            'repeated_content': author_counts['repeated_content'],        # Contenido repetitivo
+            'timing_clusters': timing_analysis['authors_with_bursts'],    # Tweets agrupados en tiempo
+            'low_engagement_spam': author_counts['low_engagement_spam']   # Muchos tweets, poco engagement
+        }
+
+        # Calcular probabilidad de bots
+        total_authors = author_counts['authors']
+        bot_probability = 0
+        indicators = []
+
+        # Indicador 1: Alto porcentaje de autores con volumen sospechoso
+        high_volume_ratio = suspicious_patterns['high_volume_authors'] / max(total_authors, 1)
+        if high_volume_ratio > 0.1:  # Más del 10%
+            bot_probability += 30
+            indicators.append(f"Autores de alto volumen: {high_volume_ratio:.1%}")
+
+        # Indicador 2: Contenido repetitivo
+        repeated_ratio = suspicious_patterns['repeated_content'] / max(total_authors, 1)
+        if repeated_ratio > 0.05:  # Más del 5%
+            bot_probability += 25
+            indicators.append(f"Contenido repetitivo: {repeated_ratio:.1%}")
+
+        # Indicador 3: Promedio de tweets por autor
+        avg_tweets_per_author = self.total_tweets / max(total_authors, 1)
+        if avg_tweets_per_author > 25:
+            bot_probability += 20
+            indicators.append(f"Promedio tweets/autor: {avg_tweets_per_author:.1f}")
+
+        # Indicador 4: Engagement sospechosamente bajo
+        spam_ratio = suspicious_patterns['low_engagement_spam'] / max(total_authors, 1)
+        if spam_ratio > 0.08:  # Más del 8%
+            bot_probability += 15
+            indicators.append(f"Bajo engagement: {spam_ratio:.1%}")
+
+        # Indicador 5: Autores que publican en ráfagas (ventana de timing_cluster_window)
+        timing_ratio = suspicious_patterns['timing_clusters'] / max(total_authors, 1)
+        if timing_ratio > 0.05:  # Más del 5%
+            bot_probability += 10
+            indicators.append(f"Ráfagas temporales: {timing_ratio:.1%}")
+
+        bot_probability = min(bot_probability, 95)
+        confidence_level = 'HIGH' if bot_probability > 70 else 'MEDIUM' if bot_probability > 40 else 'LOW'
+
+        return {
+            'bot_probability_percentage': bot_probability,
+            'confidence_level': confidence_level,
+            'indicators': indicators,
+            'suspicious_patterns': suspicious_patterns,
+            'total_authors_analyzed': total_authors,
+            'content_similarity_samples': content_similarity,  # Top 5 ejemplos
+            'coordinated_content': self.near_duplicates.clusters(),  # Copy-paste entre cuentas
+            'timing_analysis': timing_analysis,
+            'recommendations': bot_recommendations(bot_probability),
+            'analysis_details': {
+                'avg_tweets_per_author': round(avg_tweets_per_author, 2),
+                'high_volume_authors': suspicious_patterns['high_volume_authors'],
+                'repeated_content_authors': suspicious_patterns['repeated_content'],
+                'spam_like_authors': suspicious_patterns['low_engagement_spam'],
+                'timing_cluster_authors': suspicious_patterns['timing_clusters']
+            }
+        }
+
+
+class KeywordAccumulator(MetricAccumulator):
+    """Frecuencia de keywords detectados"""
+
+    name = 'keywords_analysis'
+    label = '🔑 Palabras clave'
+
+    def __init__(self):
+        self.keyword_freq = Counter()
+        self.total_keywords = 0
+
+    def add_batch(self, batch: TweetBatch, offset: int):
+        # Cada combinación distinta de keywords se recorre una sola vez
+        for keywords, count in zip(batch.keywords.values, batch.keywords.counts()):
+            for keyword in keywords:
+                self.keyword_freq[keyword] += count
+            self.total_keywords += len(keywords) * count
+
+    def state(self) -> Dict[str, Any]:
+        # Pares en orden de inserción: most_common desempata por ese orden
+        return {'keyword_freq': list(self.keyword_freq.items()), 'total_keywords': self.total_keywords}
+
+    def load_state(self, state: Dict[str, Any]):
+        self.keyword_freq = Counter(dict(state['keyword_freq']))
+        self.total_keywords = state['total_keywords']
+
+    def merge(self, other: 'KeywordAccumulator'):
+        self.keyword_freq.update(other.keyword_freq)
+        self.total_keywords += other.total_keywords
+
+    def result(self) -> Dict:
+        keyword_freq = self.keyword_freq
+        categorized_keywords = {}
+        for category, keywords in KEYWORD_CATEGORIES.items():
+            categorized_keywords[category] = {
+                kw: keyword_freq.get(kw, 0) for kw in keywords if keyword_freq.get(kw, 0) > 0
+            }
+
+        return {
+            'top_keywords': dict(keyword_freq.most_common(15)),
+            'total_keywords_detected': self.total_keywords,
+            'unique_keywords': len(keyword_freq),
+            'categorized_keywords': categorized_keywords,
+            'critical_indicators': {
+                'violence_mentions': sum(keyword_freq.get(kw, 0) for kw in KEYWORD_CATEGORIES['violencia']),
+                'victim_mentions': sum(keyword_freq.get(kw, 0) for kw in KEYWORD_CATEGORIES['victimas']),
+                'war_crimes_mentions': sum(keyword_freq.get(kw, 0) for kw in KEYWORD_CATEGORIES['legal'])
+            }
+        }
+
+
+class TemporalAccumulator(MetricAccumulator):
+    """Distribución por hora y por día (UTC), a partir de la columna de epochs del batch"""
+
+    name = 'temporal_analysis'
+    label = '⏰ Patrones temporales'
+
+    def __init__(self):
+        self.hourly_distribution = defaultdict(int)
+        self.daily_distribution = defaultdict(int)
+
+    def add_batch(self, batch: TweetBatch, offset: int):
+        hourly, daily = hour_day_counts(batch.epochs)
+        for hour, count in hourly.items():
+            self.hourly_distribution[hour] += count
+        for date, count in daily.items():
+            self.daily_distribution[date] += count
+
+    def state(self) -> Dict[str, Any]:
+        # Pares (no objetos JSON) para conservar las horas como enteros y el orden
+        return {'hourly_distribution': list(self.hourly_distribution.items()),
+                'daily_distribution': list(self.daily_distribution.items())}
+
+    def load_state(self, state: Dict[str, Any]):
+        self.hourly_distribution = defaultdict(int, state['hourly_distribution'])
+        self.daily_distribution = defaultdict(int, state['daily_distribution'])
+
+    def merge(self, other: 'TemporalAccumulator'):
+        for hour, count in other.hourly_distribution.items():
+            self.hourly_distribution[hour] += count
+        for date, count in other.daily_distribution.items():
+            self.daily_distribution[date] += count
+
+    def result(self) -> Dict:
+        # Detectar picos
+        peak_hours = sorted(self.hourly_distribution.items(), key=lambda x: x[1], reverse=True)[:3]
+        peak_days = sorted(self.daily_distribution.items(), key=lambda x: x[1], reverse=True)[:3]
+
+        return {
+            'hourly_distribution': dict(self.hourly_distribution),
+            'daily_distribution': dict(self.daily_distribution),
+            'peak_hours': [f"{hour:02d}:00 ({count} tweets)" for hour, count in peak_hours],
+            'peak_days': [f"{date} ({count} tweets)" for date, count in peak_days],
+            'total_time_span_days': len(self.daily_distribution)
+        }
+
+
+class GeographicAccumulator(MetricAccumulator):
+    """Ubicaciones más frecuentes y distribución por región"""
+
+    name = 'geographic_analysis'
+    label = '📍 Distribución geográfica'
+
+    def __init__(self):
+        self.location_counter = Counter()
+
+    def add_batch(self, batch: TweetBatch, offset: int):
+        for location, count in zip(batch.location_values(), batch.locations.counts()):
+            location = (location if location is not None else '').strip()
+            if location and location != 'Unknown':
+                self.location_counter[location] += count
+
+    def state(self) -> Dict[str, Any]:
+        return {'location_counter': list(self.location_counter.items())}
+
+    def load_state(self, state: Dict[str, Any]):
+        self.location_counter = Counter(dict(state['location_counter']))
+
+    def merge(self, other: 'GeographicAccumulator'):
+        self.location_counter.update(other.location_counter)
+
+    def result(self) -> Dict:
+        # Clasificar por región
+        regions = {
+            'Gaza': 0,
+            'West Bank': 0,
+            'East Jerusalem': 0,
+            'Other': 0
+        }
+
+        for location, count in self.location_counter.items():
+            location_lower = location.lower()
+            if 'gaza' in location_lower:
+                regions['Gaza'] += count
+            elif any(wb in location_lower for wb in WEST_BANK_LOCATIONS):
+                regions['West Bank'] += count
+            elif 'jerusalem' in location_lower:
+                regions['East Jerusalem'] += count
+            else:
+                regions['Other'] += count
+
+        return {
+            'top_locations': dict(self.location_counter.most_common(10)),
+            'regional_distribution': regions,
+            'total_locations': len(self.location_counter),
+            'most_affected_region': max(regions.items(), key=lambda x: x[1])[0]
+        }
+
+
+class WarCrimesAccumulator(MetricAccumulator):
+    """Indicadores de crímenes de guerra por keywords y por texto"""
+
+    name = 'war_crimes_analysis'
+    label = '⚖️ Indicadores de crímenes de guerra'
+
+    # Indicadores de texto que se recuerdan entre bloques (se vacía al llenarse)
+    TEXT_CACHE_SIZE = 65536
+
+    def __init__(self):
+        self.total_tweets = 0
+        self._text_flags: Dict[str, Tuple[bool, bool, bool, bool]] = {}
+        self.indicators = {
+            'civilian_casualties': 0,
+            'infrastructure_attacks': 0,
+            'settlement_activities': 0,
+            'humanitarian_violations': 0,
+            'children_casualties': 0,
+            'medical_attacks': 0,
+            'education_attacks': 0,
+            'religious_site_attacks': 0
+        }
+
+    def add_batch(self, batch: TweetBatch, offset: int):
+        self.total_tweets += len(batch)
+        indicators = self.indicators
+
+        # Indicadores por keywords: una evaluación por combinación distinta
+        keyword_sets, keyword_counts = batch.keywords.values, batch.keywords.counts()
+        for indicator, indicator_keywords in KEYWORD_INDICATORS.items():
+            wanted = set(indicator_keywords)
+            mask = [not wanted.isdisjoint(keywords) for keywords in keyword_sets]
+            indicators[indicator] += masked_total(keyword_counts, mask)
+
+        # Indicadores por texto: una evaluación por texto distinto, ponderada por repeticiones
+        texts, text_codes = encode(batch.texts)
+        text_counts = code_counts(text_codes, len(texts))
+        flags = [self.cached_text_indicators(text) for text in texts]
+        for position, indicator in enumerate(TEXT_INDICATORS):
+            indicators[indicator] += masked_total(text_counts, [row[position] for row in flags])
+
+    def cached_text_indicators(self, text: str) -> Tuple[bool, bool, bool, bool]:
+        flags = self._text_flags.get(text)
+        if flags is None:
+            if len(self._text_flags) >= self.TEXT_CACHE_SIZE:
+                self._text_flags.clear()
+            flags = self._text_flags[text] = self.text_indicators(text.lower())
+        return flags
+
+    @staticmethod
+    def text_indicators(text_lower: str) -> Tuple[bool, bool, bool, bool]:
+        """Indicadores de TEXT_INDICATORS presentes en un texto en minúsculas"""
+        return (
+            'children' in text_lower and any(word in text_lower for word in ['killed', 'dead', 'wounded']),
+            'hospital' in text_lower and any(word in text_lower for word in ['bombed', 'attacked', 'destroyed']),
+            'school' in text_lower and any(word in text_lower for word in ['bombed', 'destroyed', 'damaged']),
+            any(site in text_lower for site in ['mosque', 'church', 'religious']) and any(word in text_lower for word in ['bombed', 'attacked', 'destroyed'])
+        )
+
+    def state(self) -> Dict[str, Any]:
+        return {'total_tweets': self.total_tweets, 'indicators': dict(self.indicators)}
+
+    def load_state(self, state: Dict[str, Any]):
+        self.total_tweets = state['total_tweets']
+        self.indicators.update(state['indicators'])
+
+    def merge(self, other: 'WarCrimesAccumulator'):
+        self.total_tweets += other.total_tweets
+        for indicator, count in other.indicators.items():
+            self.indicators[indicator] += count
+
+    def result(self) -> Dict:
+        # Calcular severidad
+        total_violations = sum(self.indicators.values())
+        severity_score = min(100, (total_violations / max(self.total_tweets, 1)) * 1000)
+
+        return {
+            'indicators': dict(self.indicators),
+            'total_violations': total_violations,
+            'severity_score': round(severity_score, 1),
+            'severity_level': 'EXTREME' if severity_score > 80 else 'HIGH' if severity_score > 60 else 'MEDIUM' if severity_score > 40 else 'LOW',
+            'violations_per_thousand_tweets': round((total_violations / max(self.total_tweets, 1)) * 1000, 2)
+        }
+
+
+class ExamplesAccumulator(MetricAccumulator):
+    """
+    Ejemplos representativos. Solo se retienen los candidatos vigentes (top-k
+    o primeros k), ya formateados; los empates se resuelven por orden de aparición.
+    """
+
+    name = 'representative_examples'
+    label = '📝 Ejemplos representativos'
+
+    def __init__(self, format_example: Callable[[Dict], Dict]):
+        self.format_example = format_example
+        self.most_critical = TopK(5)     # (score, -índice, ejemplo)
+        self.high_engagement = TopK(3)   # (engagement, -índice, ejemplo)
+        self.first_matches: Dict[str, List[Dict]] = {category: [] for category in EXAMPLE_KEYWORDS}
+
+    def add_batch(self, batch: TweetBatch, offset: int):
+        scores = batch.relevance_scores
+
+        # Tweets más críticos (relevance score alto + crítico); solo se formatean los que entran
+        for i, (flag, score) in enumerate(zip(batch.critical_flags, scores)):
+            if flag and score > 85:
+                self.most_critical.offer(score, lambda i=i: self.format_example(batch[i]), offset + i)
+
+        # Primeros ejemplos por categoría de keywords
+        for category, keywords in EXAMPLE_KEYWORDS.items():
+            found = self.first_matches[category]
+            for i in first_rows_with_keywords(batch, keywords, 3 - len(found)):
+                found.append(self.format_example(batch[i]))
+
+        # Alto engagement: top 3 del bloque como candidatos
+        retweets, likes = batch.retweet_counts, batch.like_counts
+        for i in heapq.nlargest(3, range(len(batch)), key=lambda i: retweets[i] + likes[i]):
+            self.high_engagement.offer(retweets[i] + likes[i], lambda i=i: self.format_example(batch[i]), offset + i)
+
+    def state(self) -> Dict[str, Any]:
+        return {'most_critical': self.most_critical.state(),
+                'high_engagement': self.high_engagement.state(),
+                'first_matches': self.first_matches}
+
+    def load_state(self, state: Dict[str, Any]):
+        self.most_critical.load_state(state['most_critical'])
+        self.high_engagement.load_state(state['high_engagement'])
+        self.first_matches = {category: list(state['first_matches'].get(category, []))
+                              for category in EXAMPLE_KEYWORDS}
+
+    def merge(self, other: 'ExamplesAccumulator'):
+        self.most_critical.merge(other.most_critical)
+        self.high_engagement.merge(other.high_engagement)
+        for category, found in self.first_matches.items():
+            found.extend(other.first_matches[category][:3 - len(found)])
+
+    def result(self) -> Dict:
+        return {
+            'most_critical': self.most_critical.items(),
+            'civilian_casualties': self.first_matches['civilian_casualties'],
+            'infrastructure_attacks': self.first_matches['infrastructure_attacks'],
+            'war_crimes': self.first_matches['war_crimes'],
+            'high_engagement': self.high_engagement.items()
+        }
+
+
+class MetricsEngine:
+    """
+    Recorre la entrada una sola vez, en bloques columnares, y entrega cada
+    bloque a todos los acumuladores registrados. Con un TweetBatch completo
+    hay un único bloque; con un iterable (p. ej. un lector en streaming) la
+    memoria queda acotada por `chunk_size`.
+
+    `run` puede llamarse varias veces: cada llamada agrega los tweets nuevos al
+    estado acumulado, que se exporta con `state` y se restaura con `load_state`.
+    `base_index` es el índice global del primer tweet que verá el motor (un
+    shard que empieza a mitad del corpus).
+    """
+
+    def __init__(self, accumulators: List[MetricAccumulator] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 base_index: int = 0):
+        self.accumulators: List[MetricAccumulator] = list(accumulators or [])
+        self.chunk_size = chunk_size
+        self.base_index = base_index
+        self.tweets_processed = 0
+        self.state_store = None  # MetricStateStore con el estado por clave (ver `attach_state`)
+
+    def register(self, accumulator: MetricAccumulator) -> MetricAccumulator:
+        self.accumulators.append(accumulator)
+        return accumulator
+
+    def get(self, name: str) -> MetricAccumulator:
+        """Acumulador registrado con el nombre de sección `name`"""
+        for accumulator in self.accumulators:
+            if accumulator.name == name:
+                return accumulator
+        raise KeyError(name)
+
+    def state(self) -> Dict[str, Any]:
+        """Estado parcial de todos los acumuladores, serializable a JSON"""
+        return {
+            'tweets_processed': self.tweets_processed,
+            'accumulators': {accumulator.name: accumulator.state() for accumulator in self.accumulators}
+        }
+
+    def load_state(self, state: Dict[str, Any]):
+        """Restaura un estado exportado con `state` (KeyError si falta algún acumulador)"""
+        for accumulator in self.accumulators:
+            accumulator.load_state(state['accumulators'][accumulator.name])
+        self.tweets_processed = state['tweets_processed']
+
+    def merge(self, other: 'MetricsEngine'):
+        """Fusiona otro motor con los mismos acumuladores que procesó tweets posteriores"""
+        for accumulator in self.accumulators:
+            accumulator.merge(other.get(accumulator.name))
+        self.tweets_processed += other.tweets_processed
+
+    def compact(self):
+        """Compacta el estado de los acumuladores antes de persistirlo"""
+        for accumulator in self.accumulators:
+            accumulator.compact()
+
+    def attach_state(self, store):
+        """Vincula los acumuladores a un MetricStateStore que refleja su estado acumulado"""
+        for accumulator in self.accumulators:
+            accumulator.attach_state(store)
+        self.state_store = store
+
+    def results(self) -> Dict[str, Any]:
+        """{nombre de sección: resultado} con el estado actual"""
+        return {accumulator.name: accumulator.result() for accumulator in self.accumulators}
+
+    def run(self, tweets: Iterable[Dict]) -> Dict[str, Any]:
+        """Procesa la entrada y devuelve {nombre de sección: resultado}"""
+        for batch in iter_batches(tweets, self.chunk_size):
+            for accumulator in self.accumulators:
+                accumulator.add_batch(batch, self.base_index + self.tweets_processed)
+            self.tweets_processed += len(batch)
+        return self.results()
+
+
+def build_metrics_engine(original_metadata: Dict = None, base_index: int = 0) -> MetricsEngine:
+    """Motor con un acumulador por sección de data.json"""
+    return MetricsEngine([
+        BasicMetricsAccumulator(original_metadata),
+        BotPatternAccumulator(),
+        KeywordAccumulator(),
+        ExamplesAccumulator(format_example_tweet),
+        TemporalAccumulator(),
+        GeographicAccumulator(),
+        WarCrimesAccumulator()
+    ], base_index=base_index)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+🕊️ METRICS HISTORY - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Histórico de métricas procesadas en SQLite: series compactas, retención con downsampling y deltas
+"""
+
+import gzip
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from tweet_io import open_text_reader
+from processing_config import load_processing_config
+
+METRICS_HISTORY_PATH = "data/metrics_history.db"
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Resoluciones en orden: al superar su retención, una fila pasa a la siguiente
+# (la última de cada hora/día/semana sobrevive) y la última resolución se elimina
+RESOLUTIONS = ('raw', 'hourly', 'daily', 'weekly')
+DEFAULT_RETENTION = {'raw': 2 * DAY, 'hourly': 14 * DAY, 'daily': 180 * DAY, 'weekly': 5 * 365 * DAY}
+
+# Claves de `metrics_history` en data_processing de la configuración de la organización
+RETENTION_CONFIG_KEYS = {'raw': ('raw_retention_hours', HOUR), 'hourly': ('hourly_retention_days', DAY),
+                         'daily': ('daily_retention_days', DAY), 'weekly': ('weekly_retention_days', DAY)}
+
+# Secciones con claves variables entre ejecuciones (distribuciones y ejemplos): no son series
+EXCLUDED_PATHS = ('representative_examples', 'dashboard_config', 'bot_analysis.content_similarity_samples',
+                  'temporal_analysis.hourly_distribution', 'temporal_analysis.daily_distribution',
+                  'geographic_analysis.top_locations', 'keywords_analysis.top_keywords')
+
+# Archivos del histórico anterior (uno por ejecución): palestine_metrics_processed_YYYYmmdd_HHMMSS.json[.gz|.zst]
+LEGACY_FILE_RE = re.compile(r'palestine_metrics_processed_(\d{8}_\d{6})\.json')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp INTEGER NOT NULL,
+    resolution TEXT NOT NULL DEFAULT 'raw',
+    samples INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_history_runs_timestamp ON history_runs(timestamp);
+CREATE INDEX IF NOT EXISTS idx_history_runs_resolution ON history_runs(resolution, timestamp);
+
+CREATE TABLE IF NOT EXISTS metric_names (
+    metric_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+-- Una fila por (métrica, ejecución): la serie de una métrica es un rango contiguo de la clave
+CREATE TABLE IF NOT EXISTS metric_values (
+    metric_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    value NUMERIC NOT NULL,
+    PRIMARY KEY (metric_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_metric_values_run ON metric_values(run_id);
+
+-- data.json completo de la ejecución más reciente (gzip)
+CREATE TABLE IF NOT EXISTS latest_snapshot (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    run_id INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    payload BLOB NOT NULL
+);
+"""
+
+
+def load_retention() -> Dict[str, int]:
+    """Retención en segundos por resolución (DEFAULT_RETENTION con lo que defina la configuración)"""
+    config = load_processing_config().get('metrics_history', {})
+    retention = dict(DEFAULT_RETENTION)
+    for resolution, (key, unit) in RETENTION_CONFIG_KEYS.items():
+        if key in config:
+            retention[resolution] = int(config[key] * unit)
+    return retention
+
+
+def flatten_metrics(processed_data: Dict, prefix: str = '') -> Dict[str, Any]:
+    """Valores numéricos de data.json como {'seccion.campo': valor} (sin EXCLUDED_PATHS)"""
+    metrics = {}
+    for key, value in processed_data.items():
+        path = f"{prefix}{key}"
+        if path in EXCLUDED_PATHS:
+            continue
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[path] = value
+    return metrics
+
+
+def bucket_start(timestamp: int, resolution: str) -> int:
+    """Inicio (epoch UTC) de la hora, día o semana (lunes) que contiene `timestamp`"""
+    if resolution == 'hourly':
+        return timestamp - timestamp % HOUR
+    if resolution == 'daily':
+        return timestamp - timestamp % DAY
+    day = timestamp // DAY
+    return (day - (day + 3) % 7) * DAY  # El día 0 (1970-01-01) fue jueves
+
+
+def iso_utc(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+class MetricsHistory:
+    """
+    Histórico de ejecuciones del procesador.
+
+    - Cada ejecución guarda sus métricas numéricas como filas (métrica,
+      ejecución, valor) y reemplaza la instantánea completa más reciente.
+    - `compact` aplica la retención: las ejecuciones más antiguas que la
+      retención de su resolución se reducen a la última de cada hora, día o
+      semana (`samples` cuenta las ejecuciones que representa) y las semanas
+      más antiguas se eliminan, de modo que el tamaño queda acotado.
+    - `series` y `delta` leen rangos indexados, sin cargar archivos JSON.
+    """
+
+    def __init__(self, path: str = METRICS_HISTORY_PATH, retention: Dict[str, int] = None):
+        self.path = path
+        self.retention = retention or load_retention()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._metric_ids: Dict[str, int] = dict(self.conn.execute("SELECT name, metric_id FROM metric_names"))
+
+    @staticmethod
+    def exists(path: str = METRICS_HISTORY_PATH) -> bool:
+        """Indica si ya hay un histórico creado en `path`"""
+        return os.path.exists(path)
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def metric_id(self, name: str) -> int:
+        metric_id = self._metric_ids.get(name)
+        if metric_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO metric_names (name) VALUES (?)", (name,))
+            metric_id = self._metric_ids[name] = self.conn.execute(
+                "SELECT metric_id FROM metric_names WHERE name = ?", (name,)).fetchone()[0]
+        return metric_id
+
+    def record(self, processed_data: Dict, timestamp: int = None, compact: bool = True) -> int:
+        """Agrega una ejecución (data.json procesado); devuelve su run_id"""
+        timestamp = int(time.time()) if timestamp is None else int(timestamp)
+        payload = gzip.compress(json.dumps(processed_data, ensure_ascii=False).encode('utf-8'))
+        with self.conn:
+            run_id = self.conn.execute("INSERT INTO history_runs (timestamp) VALUES (?)", (timestamp,)).lastrowid
+            self.conn.executemany(
+                "INSERT INTO metric_values (metric_id, run_id, value) VALUES (?, ?, ?)",
+                [(self.metric_id(name), run_id, value) for name, value in flatten_metrics(processed_data).items()]
+            )
+            # La instantánea solo se reemplaza por una ejecución igual o más reciente
+            self.conn.execute(
+                """INSERT INTO latest_snapshot (id, run_id, timestamp, payload) VALUES (1, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET run_id = excluded.run_id, timestamp = excluded.timestamp,
+                                                 payload = excluded.payload
+                   WHERE excluded.timestamp >= latest_snapshot.timestamp""",
+                (run_id, timestamp, payload)
+            )
+        if compact:
+            self.compact(timestamp)
+        return run_id
+
+    def import_files(self, paths: Iterable[str]) -> int:
+        """Importa archivos palestine_metrics_processed_* (fecha local del nombre); devuelve cuántos"""
+        dated = []
+        for path in paths:
+            match = LEGACY_FILE_RE.search(os.path.basename(path))
+            if match:
+                dated.append((int(datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").timestamp()), path))
+        imported = 0
+        for timestamp, path in sorted(dated):
+            try:
+                with open_text_reader(path) as f:
+                    self.record(json.load(f), timestamp, compact=False)
+                imported += 1
+            except (OSError, ValueError) as e:
+                print(f"⚠️ No se pudo importar {path}: {e}")
+        if imported:
+            self.compact()
+        return imported
+
+    def compact(self, now: int = None) -> Dict[str, int]:
+        """Aplica la retención; devuelve las ejecuciones eliminadas por resolución de origen"""
+        now = int(time.time()) if now is None else int(now)
+        removed = {}
+        with self.conn:
+            for source, target in zip(RESOLUTIONS, RESOLUTIONS[1:]):
+                removed[source] = self._downsample(source, target, now - self.retention[source])
+            last = RESOLUTIONS[-1]
+            expired = [row[0] for row in self.conn.execute(
+                "SELECT run_id FROM history_runs WHERE resolution = ? AND timestamp < ?",
+                (last, now - self.retention[last]))]
+            self._delete_runs(expired)
+            removed[last] = len(expired)
+        return removed
+
+    def _downsample(self, source: str, target: str, cutoff: int) -> int:
+        """Reduce las ejecuciones `source` anteriores a `cutoff` a la última de cada período `target`"""
+        buckets: Dict[int, List[Tuple[int, int, int]]] = {}
+        for run_id, timestamp, samples in self.conn.execute(
+                "SELECT run_id, timestamp, samples FROM history_runs WHERE resolution = ? AND timestamp < ?",
+                (source, cutoff)):
+            buckets.setdefault(bucket_start(timestamp, target), []).append((timestamp, run_id, samples))
+        if not buckets:
+            return 0
+
+        # Filas ya reducidas de los mismos períodos (de compactaciones anteriores)
+        low, high = min(buckets), max(buckets)
+        for run_id, timestamp, samples in self.conn.execute(
+                "SELECT run_id, timestamp, samples FROM history_runs WHERE resolution = ? AND timestamp >= ?",
+                (target, low)):
+            bucket = bucket_start(timestamp, target)
+            if bucket <= high and bucket in buckets:
+                buckets[bucket].append((timestamp, run_id, samples))
+
+        obsolete = []
+        for members in buckets.values():
+            members.sort()
+            _, keep, _ = members[-1]
+            obsolete.extend(run_id for _, run_id, _ in members[:-1])
+            self.conn.execute("UPDATE history_runs SET resolution = ?, samples = ? WHERE run_id = ?",
+                              (target, sum(samples for _, _, samples in members), keep))
+        self._delete_runs(obsolete)
+        return len(obsolete)
+
+    def _delete_runs(self, run_ids: List[int]):
+        for start in range(0, len(run_ids), 500):
+            chunk = run_ids[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            self.conn.execute(f"DELETE FROM metric_values WHERE run_id IN ({placeholders})", chunk)
+            self.conn.execute(f"DELETE FROM history_runs WHERE run_id IN ({placeholders})", chunk)
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def latest_snapshot(self) -> Optional[Dict]:
+        """data.json de la ejecución más reciente (None si el histórico está vacío)"""
+        row = self.conn.execute("SELECT payload FROM latest_snapshot WHERE id = 1").fetchone()
+        return json.loads(gzip.decompress(row[0]).decode('utf-8')) if row else None
+
+    def runs(self, since: int = None, until: int = None) -> List[Dict]:
+        """Ejecuciones conservadas en [since, until], de la más antigua a la más reciente"""
+        rows = self.conn.execute(
+            "SELECT run_id, timestamp, resolution, samples FROM history_runs "
+            "WHERE timestamp >= ? AND timestamp <= ? ORDER BY timestamp, run_id",
+            (since if since is not None else -(1 << 62), until if until is not None else 1 << 62))
+        return [{'run_id': run_id, 'timestamp': iso_utc(timestamp), 'resolution': resolution, 'samples': samples}
+                for run_id, timestamp, resolution, samples in rows]
+
+    def run_at(self, timestamp: int) -> Optional[int]:
+        """Última ejecución conservada en o antes de `timestamp`"""
+        row = self.conn.execute("SELECT run_id FROM history_runs WHERE timestamp <= ? "
+                                "ORDER BY timestamp DESC, run_id DESC LIMIT 1", (int(timestamp),)).fetchone()
+        return row[0] if row else None
+
+    def latest_runs(self, limit: int = 2) -> List[int]:
+        """run_id de las `limit` ejecuciones más recientes (de la más reciente a la más antigua)"""
+        return [row[0] for row in self.conn.execute(
+            "SELECT run_id FROM history_runs ORDER BY timestamp DESC, run_id DESC LIMIT ?", (limit,))]
+
+    def series(self, metric: str, since: int = None, until: int = None) -> List[Dict]:
+        """Valores de una métrica en [since, until], en orden temporal"""
+        metric_id = self._metric_ids.get(metric)
+        if metric_id is None:
+            return []
+        rows = self.conn.execute(
+            "SELECT r.timestamp, r.resolution, v.value FROM metric_values v "
+            "JOIN history_runs r ON r.run_id = v.run_id "
+            "WHERE v.metric_id = ? AND r.timestamp >= ? AND r.timestamp <= ? ORDER BY r.timestamp, r.run_id",
+            (metric_id, since if since is not None else -(1 << 62), until if until is not None else 1 << 62))
+        return [{'timestamp': iso_utc(timestamp), 'resolution': resolution, 'value': value}
+                for timestamp, resolution, value in rows]
+
+    def metrics_for(self, run_id: int) -> Dict[str, Any]:
+        """{métrica: valor} de una ejecución"""
+        return dict(self.conn.execute(
+            "SELECT n.name, v.value FROM metric_values v JOIN metric_names n ON n.metric_id = v.metric_id "
+            "WHERE v.run_id = ?", (run_id,)))
+
+    def delta(self, from_run: int, to_run: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Cambio de cada métrica entre dos ejecuciones conservadas:
+        {métrica: {'from', 'to', 'delta', 'percent'}} (None donde falta un extremo).
+        """
+        before, after = self.metrics_for(from_run), self.metrics_for(to_run)
+        deltas = {}
+        for name in sorted(set(before) | set(after)):
+            old, new = before.get(name), after.get(name)
+            change = new - old if old is not None and new is not None else None
+            deltas[name] = {
+                'from': old,
+                'to': new,
+                'delta': change,
+                'percent': round(change / old * 100, 2) if change is not None and old else None
+            }
+        return deltas
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+🕊️ MOCK TWITTER API - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Servidor local que imita `GET /2/tweets/search/recent` para pruebas de carga del colector
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.parse as urlparse
+import zlib
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Any, Tuple
+
+from tweet_simulator import render_text
+
+SEARCH_PATH = '/2/tweets/search/recent'
+
+# Cada consulta tiene su propio rango de ids: base + índice del tweet
+ID_OFFSET = 1_700_000_000_000_000_000
+ID_SPAN = 10_000_000
+
+
+def query_members(query: str) -> List[str]:
+    """Queries que componen una consulta OR (sin los paréntesis de agrupación)"""
+    members = []
+    for member in query.split(' OR '):
+        member = member.strip()
+        if member.startswith('(') and member.endswith(')'):
+            member = member[1:-1]
+        if member:
+            members.append(member)
+    return members or [query]
+
+
+class MockTwitterAPI:
+    """
+    Estado y lógica del endpoint simulado (independiente del transporte HTTP).
+
+    - Cada consulta dispone de `initial_tweets` tweets al arrancar y recibe
+      `arrival_rate` tweets nuevos por segundo, con ids crecientes.
+    - Pagina de más reciente a más antiguo con `next_token` y respeta `since_id`.
+    - Cuota de `rate_limit` requests por ventana de `window` segundos,
+      informada con las cabeceras `x-rate-limit-*` (429 al agotarse).
+    - Inyección de fallos: latencia, 429 y 403 aleatorios, y 403 permanente
+      tras `forbid_after` requests servidos (límite de facturación).
+    """
+
+    def __init__(self, initial_tweets: int = 1000, arrival_rate: float = 0.0,
+                 rate_limit: int = 450, window: float = 900.0,
+                 latency: float = 0.0, latency_jitter: float = 0.0,
+                 error_rate_429: float = 0.0, error_rate_403: float = 0.0,
+                 retry_after: float = 1.0, forbid_after: int = None, seed: int = None):
+        self.initial_tweets = initial_tweets
+        self.arrival_rate = arrival_rate
+        self.rate_limit = rate_limit
+        self.window = window
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate_429 = error_rate_429
+        self.error_rate_403 = error_rate_403
+        self.retry_after = retry_after
+        self.forbid_after = forbid_after
+        self.started = time.time()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = self.started
+        self._window_used = 0
+        self.stats = {'requests': 0, 'served': 0, 'tweets_served': 0,
+                      'rate_limited': 0, 'injected_429': 0, 'forbidden': 0, 'bad_requests': 0}
+
+    # ------------------------------------------------------------------
+    # Corpus simulado
+    # ------------------------------------------------------------------
+    @staticmethod
+    def query_base(query: str) -> int:
+        return ID_OFFSET + (zlib.crc32(query.encode('utf-8')) % 100_000) * ID_SPAN
+
+    def newest_index(self, now: float) -> int:
+        """Índice del tweet más reciente disponible en el instante `now`"""
+        arrived = int((now - self.started) * self.arrival_rate)
+        return min(self.initial_tweets + arrived, ID_SPAN - 1)
+
+    def created_at(self, index: int) -> str:
+        """Fecha del tweet `index`: uno por minuto antes del arranque, luego al ritmo de llegada"""
+        interval = 1.0 / self.arrival_rate if self.arrival_rate > 0 else 60.0
+        offset = (index - self.initial_tweets) * (interval if index > self.initial_tweets else 60.0)
+        timestamp = datetime.fromtimestamp(self.started + offset, tz=timezone.utc)
+        return timestamp.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+    def build_tweet(self, members: List[str], base: int, index: int) -> Dict:
+        k = (base // ID_SPAN + index) & 0x3FFFFFFF
+        tweet_id = str(base + index)
+        # El texto incluye una de las queries del grupo para que la atribución funcione
+        text = f"{render_text(k)} {members[index % len(members)]}"
+        return {
+            'id': tweet_id,
+            'text': text,
+            'author_id': str(k % 2000),
+            'created_at': self.created_at(index),
+            'edit_history_tweet_ids': [tweet_id],
+            'public_metrics': {'retweet_count': k % 100, 'reply_count': k % 30,
+                               'like_count': k % 500, 'quote_count': k % 10}
+        }
+
+    # ------------------------------------------------------------------
+    # Endpoint
+    # ------------------------------------------------------------------
+    def rate_limit_headers(self, now: float, remaining: int = None) -> Dict[str, str]:
+        reset = self._window_start + self.window
+        if remaining is None:
+            remaining = max(self.rate_limit - self._window_used, 0)
+        return {'x-rate-limit-limit': str(self.rate_limit),
+                'x-rate-limit-remaining': str(remaining),
+                'x-rate-limit-reset': str(int(reset))}
+
+    def admit(self, now: float) -> Tuple[int, Dict, Dict[str, str]]:
+        """Aplica cuota y fallos inyectados; devuelve (0, ...) si el request debe servirse"""
+        with self._lock:
+            self.stats['requests'] += 1
+            if now >= self._window_start + self.window:
+                self._window_start, self._window_used = now, 0
+
+            if self.forbid_after is not None and self.stats['served'] >= self.forbid_after:
+                self.stats['forbidden'] += 1
+                return 403, {'title': 'Forbidden', 'detail': 'Usage cap exceeded (mock)'}, {}
+            if self._random.random() < self.error_rate_403:
+                self.stats['forbidden'] += 1
+                return 403, {'title': 'Forbidden', 'detail': 'Injected 403 (mock)'}, {}
+            if self._window_used >= self.rate_limit:
+                self.stats['rate_limited'] += 1
+                return 429, {'title': 'Too Many Requests'}, self.rate_limit_headers(now, 0)
+            if self._random.random() < self.error_rate_429:
+                self.stats['injected_429'] += 1
+                headers = self.rate_limit_headers(now, 0)
+                headers['x-rate-limit-reset'] = str(int(now + self.retry_after))
+                return 429, {'title': 'Too Many Requests', 'detail': 'Injected 429 (mock)'}, headers
+
+            self._window_used += 1
+            self.stats['served'] += 1
+            return 0, {}, self.rate_limit_headers(now)
+
+    def search_recent(self, params: Dict[str, str]) -> Tuple[int, Dict, Dict[str, str]]:
+        """Resuelve una búsqueda: (status HTTP, payload JSON, cabeceras)"""
+        query = params.get('query')
+        try:
+            max_results = int(params.get('max_results', 10))
+        except ValueError:
+            max_results = 0
+        if not query or not 10 <= max_results <= 100:
+            with self._lock:
+                self.stats['bad_requests'] += 1
+            return 400, {'title': 'Invalid Request',
+                         'detail': 'query is required and max_results must be between 10 and 100'}, {}
+
+        delay = self.latency + (self._random.uniform(0, self.latency_jitter) if self.latency_jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        now = time.time()
+        status, payload, headers = self.admit(now)
+        if status:
+            return status, payload, headers
+
+        base = self.query_base(query)
+        members = query_members(query)
+        low = 0
+        if params.get('since_id'):
+            low = min(max(int(params['since_id']) - base, 0), ID_SPAN)
+        high = int(params['next_token'], 16) if params.get('next_token') else self.newest_index(now)
+
+        indices = list(range(high, max(low, high - max_results, 0), -1))
+        tweets = [self.build_tweet(members, base, index) for index in indices]
+        meta = {'result_count': len(tweets)}
+        if tweets:
+            meta['newest_id'] = tweets[0]['id']
+            meta['oldest_id'] = tweets[-1]['id']
+            if indices[-1] - 1 > low:
+                meta['next_token'] = format(indices[-1] - 1, 'x')
+
+        with self._lock:
+            self.stats['tweets_served'] += len(tweets)
+        payload = {'meta': meta}
+        if tweets:
+            payload['data'] = tweets
+        return 200, payload, headers
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats['uptime_seconds'] = round(time.time() - self.started, 2)
+        return stats
+
+
+class MockTwitterHandler(BaseHTTPRequestHandler):
+    """Transporte HTTP del mock: delega en el `MockTwitterAPI` del servidor"""
+
+    def do_GET(self):
+        url = urlparse.urlparse(self.path)
+        params = {key: values[0] for key, values in urlparse.parse_qs(url.query).items()}
+
+        if url.path == SEARCH_PATH:
+            status, payload, headers = self.server.api.search_recent(params)
+        elif url.path == '/stats':
+            status, payload, headers = 200, self.server.api.summary(), {}
+        else:
+            status, payload, headers = 404, {'title': 'Not Found Error'}, {}
+
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Silencioso: en pruebas de carga el log por request domina el tiempo
+        pass
+
+
+def start_mock_server(api: MockTwitterAPI, host: str = 'localhost', port: int = 0) -> ThreadingHTTPServer:
+    """
+    Arranca el mock en un hilo de fondo (port=0 elige un puerto libre).
+    La URL base para el colector es `http://{host}:{server.server_port}`;
+    detenerlo con `server.shutdown()`.
+    """
+    server = ThreadingHTTPServer((host, port), MockTwitterHandler)
+    server.daemon_threads = True
+    server.api = api
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_args():
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Mock local de search_recent_tweets")
+    parser.add_argument('--port', type=int, default=8090, help="Puerto (default: 8090)")
+    parser.add_argument('--tweets', type=int, default=1000,
+                        help="Tweets disponibles por consulta al arrancar (default: 1000)")
+    parser.add_argument('--arrival-rate', type=float, default=0.0,
+                        help="Tweets nuevos por segundo y consulta (default: 0)")
+    parser.add_argument('--rate-limit', type=int, default=450,
+                        help="Requests por ventana de cuota (default: 450)")
+    parser.add_argument('--window', type=float, default=900.0,
+                        help="Duración de la ventana de cuota en segundos (default: 900)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Latencia fija por request en segundos")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Latencia aleatoria adicional máxima")
+    parser.add_argument('--rate-429', type=float, default=0.0, help="Probabilidad de 429 inyectado")
+    parser.add_argument('--rate-403', type=float, default=0.0, help="Probabilidad de 403 inyectado")
+    parser.add_argument('--retry-after', type=float, default=1.0,
+                        help="Segundos hasta el reset informado en los 429 inyectados (default: 1)")
+    parser.add_argument('--forbid-after', type=int, default=None,
+                        help="Responder 403 permanente tras N requests servidos")
+    parser.add_argument('--seed', type=int, default=None, help="Semilla de la inyección de fallos")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    api = MockTwitterAPI(initial_tweets=args.tweets, arrival_rate=args.arrival_rate,
+                         rate_limit=args.rate_limit, window=args.window,
+                         latency=args.latency, latency_jitter=args.jitter,
+                         error_rate_429=args.rate_429, error_rate_403=args.rate_403,
+                         retry_after=args.retry_after, forbid_after=args.forbid_after, seed=args.seed)
+    server = ThreadingHTTPServer(('localhost', args.port), MockTwitterHandler)
+    server.daemon_threads = True
+    server.api = api
+
+    print(f"🧪 MOCK TWITTER API activo en http://localhost:{args.port}{SEARCH_PATH}")
+    print(f"   📊 Estadísticas: http://localhost:{args.port}/stats")
+    print(f"   🔗 Colector: python src/centinela_gamma_maximized.py --api-base-url http://localhost:{args.port}")
+    print("   Presiona Ctrl+C para detener el servidor")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🧪 Mock detenido")
+        print(json.dumps(api.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+🕊️ NEAR DUPLICATES - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Índice MinHash/LSH de contenido casi duplicado entre cuentas (copy-paste coordinado)
+"""
+
+import base64
+import re
+import zlib
+from array import array
+from typing import Dict, List, Any, Iterable, Optional, Sequence
+
+from sketches import DistinctCounter, stable_hash64
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin el paquete las firmas se calculan texto a texto
+    np = None
+
+URL_RE = re.compile(r'https?://\S+')
+MENTION_RE = re.compile(r'@\w+')
+WORD_RE = re.compile(r'\w+')
+
+SHINGLE_SIZE = 5       # Shingles de 5 caracteres del texto normalizado
+NUM_PERM = 48          # Componentes de la firma MinHash
+BANDS = 8              # Bandas LSH de NUM_PERM // BANDS filas: umbral de Jaccard ~0.7
+SAMPLE_LENGTH = 100    # Caracteres del texto de ejemplo por documento
+SIGNATURE_CHUNK_TEXTS = 8192  # Textos por pasada vectorizada (memoria acotada)
+MAX_ACTIVE_DOCUMENTS = 20000  # Documentos recientes que conserva el estado persistido (ver `compact`)
+LARGEST_CLUSTERS = 5   # Clusters de ejemplo en el resumen
+
+_EMPTY_BIN = 1 << 40
+_ROWS = NUM_PERM // BANDS
+_MULTIPLIER = 0x9E3779B97F4A7C15  # Constante impar de 64 bits para mezclar las filas de una banda
+_MASK64 = (1 << 64) - 1
+# Orden pseudoaleatorio fijo en que cada bin vacío busca un bin lleno ("optimal densification")
+_PROBES = [sorted((j for j in range(NUM_PERM) if j != i), key=lambda j, i=i: stable_hash64((i, j)))
+           for i in range(NUM_PERM)]
+
+
+def _crc32_tables() -> List[List[int]]:
+    """
+    El CRC-32 es afín sobre GF(2): para mensajes de SHINGLE_SIZE bytes,
+    crc32(m) = crc32(ceros) ^ T_0[m_0] ^ ... ^ T_4[m_4]. Estas tablas permiten
+    calcularlo vectorizado sobre todos los shingles de un bloque.
+    """
+    zero = zlib.crc32(bytes(SHINGLE_SIZE))
+    return [[zlib.crc32(bytes(SHINGLE_SIZE - 1 - position) + bytes((value,)) + bytes(position)) ^ zero
+             for value in range(256)]
+            for position in reversed(range(SHINGLE_SIZE))]
+
+
+if np is not None:
+    _CRC32_ZERO = zlib.crc32(bytes(SHINGLE_SIZE))
+    _CRC32_TABLES = np.array(_crc32_tables(), dtype=np.uint32)
+    _PROBE_TABLE = np.array(_PROBES, dtype=np.int64)
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sin URLs, menciones ni puntuación: lo que se copia y pega"""
+    text = text.lower()
+    if 'http' in text:
+        text = URL_RE.sub(' ', text)
+    if '@' in text:
+        text = MENTION_RE.sub(' ', text)
+    return ' '.join(WORD_RE.findall(text))
+
+
+def minhash_signature(normalized: str) -> List[int]:
+    """
+    Firma MinHash por "one permutation hashing": cada shingle se hashea una
+    sola vez (crc32) y cae en uno de NUM_PERM bins, donde se guarda el
+    mínimo. Cada bin vacío copia el valor del primer bin lleno en su propio
+    orden de sondeo (independiente por bin: un shingle compartido no llena una
+    banda entera). El coste es O(shingles) y no O(shingles * NUM_PERM).
+    """
+    data = normalized.encode('utf-8')
+    if len(data) <= SHINGLE_SIZE:
+        hashes = {zlib.crc32(data)}
+    else:
+        hashes = set(map(zlib.crc32, [data[i:i + SHINGLE_SIZE] for i in range(len(data) - SHINGLE_SIZE + 1)]))
+
+    bins = [_EMPTY_BIN] * NUM_PERM
+    for h in hashes:
+        value, b = divmod(h, NUM_PERM)
+        if value < bins[b]:
+            bins[b] = value
+    if _EMPTY_BIN not in bins:
+        return bins
+
+    signature = list(bins)
+    for i in range(NUM_PERM):
+        if bins[i] != _EMPTY_BIN:
+            continue
+        for j in _PROBES[i]:
+            if bins[j] != _EMPTY_BIN:
+                signature[i] = bins[j]
+                break
+    return signature
+
+
+def band_keys(signature: Sequence[int]) -> List[int]:
+    """Una clave de 64 bits por banda (mezcla multiply-xor del índice de banda y sus filas)"""
+    keys = []
+    for band in range(BANDS):
+        key = band + 1
+        for value in signature[band * _ROWS:(band + 1) * _ROWS]:
+            key = ((key ^ value) * _MULTIPLIER) & _MASK64
+        keys.append(key)
+    return keys
+
+
+def _numpy_band_keys(encoded: List[bytes]) -> List[List[int]]:
+    """
+    `band_keys(minhash_signature(...))` de varios textos de más de
+    SHINGLE_SIZE bytes en una pasada: crc32 de todos los shingles del bloque
+    por tablas, mínimo por (texto, bin) con `np.minimum.at`, densificación
+    por profundidad de sondeo y mezcla de bandas en uint64.
+    """
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    positions = len(data) - SHINGLE_SIZE + 1
+    hashes = np.full(positions, _CRC32_ZERO, dtype=np.uint32)
+    for offset in range(SHINGLE_SIZE):
+        hashes ^= _CRC32_TABLES[offset][data[offset:offset + positions]]
+
+    # Solo los shingles que no cruzan el final de su texto
+    docs = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)[:positions]
+    valid = np.ones(positions, dtype=bool)
+    crossing = (np.cumsum(lengths)[:, None] - np.arange(1, SHINGLE_SIZE, dtype=np.int64)).ravel()
+    valid[crossing[crossing < positions]] = False
+    docs = docs[valid]
+    hashes = hashes[valid].astype(np.int64)
+
+    bins = np.full(len(encoded) * NUM_PERM, _EMPTY_BIN, dtype=np.int64)
+    np.minimum.at(bins, docs * NUM_PERM + hashes % NUM_PERM, hashes // NUM_PERM)
+    bins = bins.reshape(len(encoded), NUM_PERM)
+
+    signatures = bins.copy()
+    rows, columns = np.nonzero(bins == _EMPTY_BIN)
+    for depth in range(NUM_PERM - 1):
+        if not len(rows):
+            break
+        candidates = bins[rows, _PROBE_TABLE[columns, depth]]
+        found = candidates != _EMPTY_BIN
+        signatures[rows[found], columns[found]] = candidates[found]
+        rows, columns = rows[~found], columns[~found]
+
+    values = signatures.astype(np.uint64).reshape(len(encoded), BANDS, _ROWS)
+    keys = np.broadcast_to(np.arange(1, BANDS + 1, dtype=np.uint64), (len(encoded), BANDS)).copy()
+    for row in range(_ROWS):
+        keys = (keys ^ values[:, :, row]) * np.uint64(_MULTIPLIER)
+    return keys.tolist()
+
+
+def signature_band_keys(texts: Sequence[str]) -> List[List[int]]:
+    """
+    Claves de banda LSH de varios textos normalizados. Con numpy se calculan
+    por bloques de SIGNATURE_CHUNK_TEXTS textos en una pasada vectorizada,
+    con el mismo resultado que texto a texto.
+    """
+    if np is None:
+        return [band_keys(minhash_signature(text)) for text in texts]
+    encoded = [text.encode('utf-8') for text in texts]
+    keys: List[Optional[List[int]]] = [None] * len(texts)
+    long_texts = []
+    for index, data in enumerate(encoded):
+        if len(data) > SHINGLE_SIZE:
+            long_texts.append(index)
+        else:
+            keys[index] = band_keys(minhash_signature(texts[index]))
+    for start in range(0, len(long_texts), SIGNATURE_CHUNK_TEXTS):
+        chunk = long_texts[start:start + SIGNATURE_CHUNK_TEXTS]
+        for index, band in zip(chunk, _numpy_band_keys([encoded[i] for i in chunk])):
+            keys[index] = band
+    return keys
+
+
+class NearDuplicateIndex:
+    """
+    Agrupa tweets casi duplicados de todo el corpus en tiempo ~lineal.
+
+    - Los textos idénticos tras normalizar forman un mismo documento (la firma
+      se calcula una vez por texto distinto).
+    - Cada documento se inserta en una tabla por banda LSH; dos documentos
+      que comparten alguna banda quedan unidos (union-find). Los clusters son
+      las componentes conexas, que no dependen del orden de inserción: dos
+      índices se fusionan uniendo sus tablas (`merge`).
+    - Cada cluster acumula tweets y autores distintos; su raíz es el documento
+      más antiguo, cuyo texto se usa como ejemplo.
+
+    `compact` (antes de persistir el estado) retira los clusters sin
+    actividad entre los `max_documents` documentos vistos más recientemente:
+    los que cumplen los criterios del resumen quedan como totales y entre
+    los más grandes, y sus bandas se descartan. Un texto posterior parecido a
+    un cluster retirado empieza un cluster nuevo.
+    """
+
+    def __init__(self):
+        self.documents: Dict[int, int] = {}   # huella del texto normalizado -> documento
+        self.parent: List[int] = []
+        self.counts: List[int] = []           # tweets por documento
+        self.samples: List[str] = []
+        self.last_seen: List[int] = []        # índice global del último tweet de cada documento
+        self.buckets: Dict[int, int] = {}     # clave de banda -> primer documento
+        self.authors: Dict[int, set] = {}     # raíz -> autores del cluster
+        # Clusters retirados por `compact` que entran en el resumen
+        self.closed_clusters = 0
+        self.closed_tweets = 0
+        self.closed_authors = DistinctCounter()
+        self.closed_largest: List[Dict[str, Any]] = []
+
+    def find(self, doc: int) -> int:
+        parent = self.parent
+        root = doc
+        while parent[root] != root:
+            root = parent[root]
+        while parent[doc] != root:
+            parent[doc], doc = root, parent[doc]
+        return root
+
+    def union(self, a: int, b: int):
+        """Une dos clusters; la raíz es siempre el documento más antiguo"""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if b < a:
+            a, b = b, a
+        self.parent[b] = a
+        authors_a, authors_b = self.authors.pop(a), self.authors.pop(b)
+        if len(authors_a) < len(authors_b):
+            authors_a, authors_b = authors_b, authors_a
+        authors_a |= authors_b
+        self.authors[a] = authors_a
+
+    def _new_document(self, fingerprint: int, count: int, sample: str) -> int:
+        doc = len(self.parent)
+        self.documents[fingerprint] = doc
+        self.parent.append(doc)
+        self.counts.append(count)
+        self.samples.append(sample)
+        self.last_seen.append(-1)
+        self.authors[doc] = set()
+        return doc
+
+    def _insert_bands(self, docs: Sequence[int], keys: Sequence[List[int]]):
+        """Inserta las bandas de documentos nuevos, uniendo los que comparten alguna"""
+        setdefault = self.buckets.setdefault
+        for doc, doc_keys in zip(docs, keys):
+            for key in doc_keys:
+                first = setdefault(key, doc)
+                if first != doc:
+                    self.union(first, doc)
+
+    def add(self, text: str, author: Any, position: int = 0) -> Optional[int]:
+        """
+        Registra un tweet (`position`: su índice global); devuelve la huella de
+        su texto normalizado (None si queda vacío)
+        """
+        normalized = normalize_text(text)
+        if not normalized:
+            return None
+        fingerprint = stable_hash64(normalized)
+        doc = self.documents.get(fingerprint)
+        if doc is None:
+            doc = self._new_document(fingerprint, 0, text[:SAMPLE_LENGTH])
+            self._insert_bands((doc,), (band_keys(minhash_signature(normalized)),))
+        self.counts[doc] += 1
+        self.last_seen[doc] = max(self.last_seen[doc], position)
+        self.authors[self.find(doc)].add(author)
+        return fingerprint
+
+    def add_batch(self, texts: Sequence[str], counts: Sequence[int], authors: Sequence[set],
+                  positions: Sequence[int]) -> List[Optional[int]]:
+        """
+        Registra varios textos distintos de una vez: `counts[i]` tweets con el
+        texto `texts[i]`, publicados por las cuentas `authors[i]`, el último
+        con índice global `positions[i]`. Las firmas de los documentos nuevos
+        se calculan juntas (`signature_band_keys`). Mismo resultado que `add`
+        tweet a tweet; devuelve la huella de cada texto.
+        """
+        fingerprints: List[Optional[int]] = []
+        new_docs, new_texts = [], []
+        for text, count, text_authors, position in zip(texts, counts, authors, positions):
+            normalized = normalize_text(text)
+            if not normalized:
+                fingerprints.append(None)
+                continue
+            fingerprint = stable_hash64(normalized)
+            doc = self.documents.get(fingerprint)
+            if doc is None:
+                doc = self._new_document(fingerprint, 0, text[:SAMPLE_LENGTH])
+                new_docs.append(doc)
+                new_texts.append(normalized)
+            self.counts[doc] += count
+            self.last_seen[doc] = max(self.last_seen[doc], position)
+            self.authors[self.find(doc)].update(text_authors)
+            fingerprints.append(fingerprint)
+        self._insert_bands(new_docs, signature_band_keys(new_texts))
+        return fingerprints
+
+    def sample(self, fingerprint: int) -> str:
+        """Texto de ejemplo del documento con esa huella"""
+        doc = self.documents.get(fingerprint)
+        return self.samples[doc] if doc is not None else ''
+
+    def merge(self, other: 'NearDuplicateIndex'):
+        """Fusiona un índice de tweets posteriores (sus documentos nuevos van detrás)"""
+        remap = []
+        for fingerprint, doc in other.documents.items():
+            existing = self.documents.get(fingerprint)
+            if existing is None:
+                existing = self._new_document(fingerprint, 0, other.samples[doc])
+            self.counts[existing] += other.counts[doc]
+            self.last_seen[existing] = max(self.last_seen[existing], other.last_seen[doc])
+            remap.append(existing)
+        for key, doc in other.buckets.items():
+            first = self.buckets.get(key)
+            if first is None:
+                self.buckets[key] = remap[doc]
+            else:
+                self.union(first, remap[doc])
+        for doc in range(len(other.parent)):
+            root = other.find(doc)
+            if root != doc:
+                self.union(remap[root], remap[doc])
+        for root, authors in other.authors.items():
+            self.authors[self.find(remap[root])].update(authors)
+        self.closed_clusters += other.closed_clusters
+        self.closed_tweets += other.closed_tweets
+        self.closed_authors.merge(other.closed_authors)
+        self.closed_largest = self._largest(self.closed_largest + other.closed_largest)
+
+    def _cluster_sizes(self):
+        """({raíz: tweets}, {raíz: textos distintos}) de todos los clusters"""
+        sizes: Dict[int, int] = {}
+        unique_texts: Dict[int, int] = {}
+        for doc in range(len(self.parent)):
+            root = self.find(doc)
+            sizes[root] = sizes.get(root, 0) + self.counts[doc]
+            unique_texts[root] = unique_texts.get(root, 0) + 1
+        return sizes, unique_texts
+
+    def _cluster_entry(self, root: int, size: int, unique_texts: int) -> Dict[str, Any]:
+        return {
+            'size': size,
+            'unique_texts': unique_texts,
+            'authors': len(self.authors[root]),
+            'sample_authors': sorted(map(str, self.authors[root]))[:5],
+            'sample_text': self.samples[root]
+        }
+
+    @staticmethod
+    def _largest(clusters: List[Dict[str, Any]], limit: int = LARGEST_CLUSTERS) -> List[Dict[str, Any]]:
+        """Los clusters con más tweets (a igual tamaño, el retirado antes); orden estable"""
+        return sorted(clusters, key=lambda cluster: -cluster['size'])[:limit]
+
+    def compact(self, max_documents: int = MAX_ACTIVE_DOCUMENTS, min_authors: int = 2):
+        """
+        Retira los clusters cuyo documento más reciente no está entre los
+        `max_documents` vistos por última vez más recientemente. Los que tienen
+        al menos 2 tweets y `min_authors` autores se suman a los totales del
+        resumen; el resto de su estado se descarta.
+        """
+        if len(self.parent) <= max_documents:
+            return
+        threshold = sorted(self.last_seen, reverse=True)[max_documents - 1]
+        roots = [self.find(doc) for doc in range(len(self.parent))]
+        newest: Dict[int, int] = {}
+        for doc, root in enumerate(roots):
+            newest[root] = max(newest.get(root, -1), self.last_seen[doc])
+        retired = {root for root, seen in newest.items() if seen < threshold}
+        if not retired:
+            return
+
+        sizes, unique_texts = self._cluster_sizes()
+        closed = list(self.closed_largest)
+        for root in sorted(retired):
+            authors = self.authors[root]
+            if sizes[root] > 1 and len(authors) >= min_authors:
+                self.closed_clusters += 1
+                self.closed_tweets += sizes[root]
+                self.closed_authors.update(authors)
+                closed.append(self._cluster_entry(root, sizes[root], unique_texts[root]))
+        self.closed_largest = self._largest(closed)
+
+        # Renumerar los documentos que quedan (en orden, así la raíz sigue siendo el más antiguo)
+        kept = [doc for doc, root in enumerate(roots) if root not in retired]
+        new_id = {doc: index for index, doc in enumerate(kept)}
+        self.parent = [new_id[roots[doc]] for doc in kept]
+        self.counts = [self.counts[doc] for doc in kept]
+        self.samples = [self.samples[doc] for doc in kept]
+        self.last_seen = [self.last_seen[doc] for doc in kept]
+        self.documents = {fingerprint: new_id[doc] for fingerprint, doc in self.documents.items() if doc in new_id}
+        self.buckets = {key: new_id[doc] for key, doc in self.buckets.items() if doc in new_id}
+        self.authors = {new_id[root]: authors for root, authors in self.authors.items() if root in new_id}
+
+    def clusters(self, min_authors: int = 2, limit: Optional[int] = LARGEST_CLUSTERS) -> Dict[str, Any]:
+        """
+        Resumen de clusters con al menos 2 tweets y `min_authors` autores
+        distintos (los retirados por `compact` incluidos)
+        """
+        sizes, unique_texts = self._cluster_sizes()
+        coordinated = sorted((root for root, size in sizes.items()
+                              if size > 1 and len(self.authors[root]) >= min_authors),
+                             key=lambda root: (-sizes[root], root))
+        largest = self.closed_largest + [self._cluster_entry(root, sizes[root], unique_texts[root])
+                                         for root in coordinated[:limit]]
+        return {
+            'clusters': self.closed_clusters + len(coordinated),
+            'tweets_in_clusters': self.closed_tweets + sum(sizes[root] for root in coordinated),
+            'authors_in_clusters': self.closed_authors.union_count(
+                set().union(*(self.authors[root] for root in coordinated))),
+            'largest_clusters': self._largest(largest, limit),
+            'method': f"MinHash/LSH ({NUM_PERM} permutaciones, {BANDS} bandas, shingles de {SHINGLE_SIZE} caracteres)"
+        }
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            'documents': _encode_array('Q', sorted(self.documents, key=self.documents.__getitem__)),
+            'parent': _encode_array('q', self.parent),
+            'counts': _encode_array('q', self.counts),
+            'samples': self.samples,
+            'last_seen': _encode_array('q', self.last_seen),
+            'bucket_keys': _encode_array('Q', self.buckets),
+            'bucket_docs': _encode_array('q', self.buckets.values()),
+            'authors': [[root, list(authors)] for root, authors in self.authors.items()],
+            'closed': {
+                'clusters': self.closed_clusters,
+                'tweets': self.closed_tweets,
+                'authors': self.closed_authors.state(),
+                'largest': self.closed_largest
+            }
+        }
+
+    def load_state(self, state: Dict[str, Any]):
+        self.parent = _decode_array('q', state['parent'])
+        self.documents = dict(zip(_decode_array('Q', state['documents']), range(len(self.parent))))
+        self.counts = _decode_array('q', state['counts'])
+        self.samples = list(state['samples'])
+        self.last_seen = _decode_array('q', state['last_seen'])
+        self.buckets = dict(zip(_decode_array('Q', state['bucket_keys']), _decode_array('q', state['bucket_docs'])))
+        self.authors = {root: set(authors) for root, authors in state['authors']}
+        closed = state['closed']
+        self.closed_clusters = closed['clusters']
+        self.closed_tweets = closed['tweets']
+        self.closed_authors = DistinctCounter.from_state(closed['authors'])
+        self.closed_largest = list(closed['largest'])
+
+
+def _encode_array(typecode: str, values: Iterable[int]) -> str:
+    """Lista de enteros como base64 de un array tipado (estado compacto y rápido de cargar)"""
+    return base64.b64encode(array(typecode, values).tobytes()).decode('ascii')
+
+
+def _decode_array(typecode: str, encoded: str) -> List[int]:
+    values = array(typecode)
+    values.frombytes(base64.b64decode(encoded))
+    return values.tolist()
@@ -6,20 +6,45 @@ API especializada para documentación de crímenes de guerra en Palestina/Israel
 """
 
 import json
+import math
 import sqlite3
 import os
 from datetime import datetime, timedelta
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 import urllib.parse as urlparse
 import re
-from typing import Dict, List, Any
+from typing import Dict, List
 import glob
 
+from tweet_store import TweetStore, DATABASE_PATH
+from tweet_batch import TweetBatch, as_batch, to_dicts
+from tweet_io import open_text_reader, detect_compression, iter_json_tweets, read_json_metadata
+from top_k import TopK, top_k, relevance_key, SEVERITY_RANK
+from timestamps import hour_day_counts
+from metrics_history import MetricsHistory, METRICS_HISTORY_PATH, DAY
+
 class PalestineWarCrimesAPI(SimpleHTTPRequestHandler):
+    database_path = DATABASE_PATH
+    history_path = METRICS_HISTORY_PATH
+
     def __init__(self, *args, **kwargs):
         self.base_path = os.getcwd()
         super().__init__(*args, **kwargs)
 
+    def open_store(self) -> TweetStore:
+        """Abre la base de datos de tweets si existe (None en caso contrario)"""
+        path = os.path.join(self.base_path, self.database_path)
+        if not TweetStore.exists(path):
+            return None
+        return TweetStore(path)
+
+    def open_history(self) -> MetricsHistory:
+        """Abre el histórico de métricas procesadas si existe (None en caso contrario)"""
+        path = os.path.join(self.base_path, self.history_path)
+        if not MetricsHistory.exists(path):
+            return None
+        return MetricsHistory(path)
+
     def do_GET(self):
         if self.path.startswith('/api/'):
             self.handle_api_request()
@@ -29,24 +54,30 @@ class PalestineWarCrimesAPI(SimpleHTTPRequestHandler):
 
     def handle_api_request(self):
         try:
-            if self.path == '/api/palestine/overview':
+            parsed = urlparse.urlparse(self.path)
+            path, query = parsed.path, urlparse.parse_qs(parsed.query)
+            if path == '/api/palestine/overview':
                 self.send_palestine_overview()
-            elif self.path == '/api/palestine/war-crimes-analysis':
+            elif path == '/api/palestine/war-crimes-analysis':
                 self.send_war_crimes_analysis()
-            elif self.path == '/api/palestine/critical-incidents':
+            elif path == '/api/palestine/critical-incidents':
                 self.send_critical_incidents()
-            elif self.path == '/api/palestine/location-hotspots':
+            elif path == '/api/palestine/location-hotspots':
                 self.send_location_hotspots()
-            elif self.path == '/api/palestine/timeline':
+            elif path == '/api/palestine/timeline':
                 self.send_timeline()
-            elif self.path == '/api/palestine/humanitarian-crisis':
+            elif path == '/api/palestine/humanitarian-crisis':
                 self.send_humanitarian_crisis()
-            elif self.path == '/api/palestine/media-coverage':
+            elif path == '/api/palestine/media-coverage':
                 self.send_media_coverage()
-            elif self.path == '/api/palestine/latest-data':
+            elif path == '/api/palestine/latest-data':
                 self.send_latest_data()
-            elif self.path == '/api/palestine/victim-statistics':
+            elif path == '/api/palestine/victim-statistics':
                 self.send_victim_statistics()
+            elif path == '/api/palestine/metrics-history':
+                self.send_metrics_history(query)
+            elif path == '/api/palestine/metrics-delta':
+                self.send_metrics_delta(query)
             else:
                 self.send_404()
         except Exception as e:
@@ -265,22 +296,9 @@ class PalestineWarCrimesAPI(SimpleHTTPRequestHandler):
         return violations
 
     def analyze_temporal_patterns(self, tweets: List[Dict]) -> Dict:
-        """Analiza patrones temporales de los incidentes"""
-        hours = {}
-        days = {}
-        
-        for tweet in tweets:
-            created_at = tweet.get('created_at', '')
-            if created_at:
-                try:
-                    dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    hour = dt.hour
-                    day = dt.strftime('%Y-%m-%d')
-                    
-                    hours[hour] = hours.get(hour, 0) + 1
-                    days[day] = days.get(day, 0) + 1
-                except:
-                    continue
+        """Analiza patrones temporales de los incidentes (horas y días UTC)"""
+        # Histogramas sobre la columna de epochs: las fechas ya vienen parseadas
+        hours, days = hour_day_counts(as_batch(tweets).epochs)
         
         # Identificar picos de actividad
         peak_hours = sorted(hours.items(), key=lambda x: x[1], reverse=True)[:3]
@@ -350,33 +368,39 @@ class PalestineWarCrimesAPI(SimpleHTTPRequestHandler):
     def send_critical_incidents(self):
         """Envía incidentes críticos más recientes"""
         try:
-            latest_data = self.get_latest_palestine_data()
-            
             incidents = []
             
-            if latest_data:
-                tweets = latest_data.get('tweets', [])
-                # Filtrar tweets más críticos (score > 80 y keywords específicos)
-                critical_tweets = [
-                    t for t in tweets[:500] 
-                    if t.get('is_critical', False) and t.get('relevance_score', 0) > 80
-                ]
+            store = self.open_store()
+            if store is not None:
+                # Top 20 por severidad sobre todos los tweets críticos de la base de datos
+                try:
+                    critical_tweets = top_k(store.iter_critical_tweets(min_relevance=80), 20, self.incident_rank)
+                finally:
+                    store.close()
+            else:
+                latest_data = self.get_latest_palestine_data()
+                tweets = latest_data.get('tweets', []) if latest_data else []
+                # Filtrar tweets más críticos (score > 80) sobre el corpus completo
+                critical_tweets = top_k(
+                    (t for t in tweets if t.get('is_critical', False) and t.get('relevance_score', 0) > 80),
+                    20, self.incident_rank
+                )
+            
+            for tweet in critical_tweets:  # Top 20 incidentes
+                incident_type = self.classify_incident_type(tweet)
+                severity = self.calculate_incident_severity(tweet)
                 
-                for tweet in critical_tweets[:20]:  # Top 20 incidentes
-                    incident_type = self.classify_incident_type(tweet)
-                    severity = self.calculate_incident_severity(tweet)
-                    
-                    incidents.append({
-                        'id': tweet.get('id', ''),
-                        'type': incident_type,
-                        'severity': severity,
-                        'description': tweet.get('text', '')[:200] + '...' if len(tweet.get('text', '')) > 200 else tweet.get('text', ''),
-                        'location': tweet.get('location', 'Unknown'),
-                        'timestamp': tweet.get('created_at', ''),
-                        'keywords': tweet.get('keywords_detected', []),
-                        'relevance_score': tweet.get('relevance_score', 0),
-                        'verified': tweet.get('relevance_score', 0) > 85
-                    })
+                incidents.append({
+                    'id': tweet.get('id', ''),
+                    'type': incident_type,
+                    'severity': severity,
+                    'description': tweet.get('text', '')[:200] + '...' if len(tweet.get('text', '')) > 200 else tweet.get('text', ''),
+                    'location': tweet.get('location', 'Unknown'),
+                    'timestamp': tweet.get('created_at', ''),
+                    'keywords': tweet.get('keywords_detected', []),
+                    'relevance_score': tweet.get('relevance_score', 0),
+                    'verified': tweet.get('relevance_score', 0) > 85
+                })
             
             if len(incidents) < 10:
                 incidents.extend(self.get_simulated_critical_incidents())
@@ -417,6 +441,10 @@ class PalestineWarCrimesAPI(SimpleHTTPRequestHandler):
         else:
             return 'OTHER_VIOLATION'
 
+    def incident_rank(self, tweet: Dict) -> tuple:
+        """Clave de ordenación de incidentes: severidad y, a igual severidad, relevancia"""
+        return (SEVERITY_RANK[self.calculate_incident_severity(tweet)], tweet.get('relevance_score', 0))
+
     def calculate_incident_severity(self, tweet: Dict) -> str:
         """Calcula severidad del incidente"""
         score = tweet.get('relevance_score', 0)
@@ -432,19 +460,24 @@ class PalestineWarCrimesAPI(SimpleHTTPRequestHandler):
     def get_latest_palestine_data(self) -> Dict:
         """Obtiene los datos más recientes de Palestina (priorizando archivos procesados)"""
         try:
-            # 🎯 PRIORIDAD 1: Buscar archivos procesados (métricas)
-            processed_files = glob.glob(os.path.join(self.base_path, "palestine_metrics_processed_*.json"))
+            # 🎯 PRIORIDAD 1: Última ejecución del histórico de métricas procesadas
+            history = self.open_history()
+            if history is not None:
+                try:
+                    processed = history.latest_snapshot()
+                finally:
+                    history.close()
+                if processed is not None:
+                    print(f"📊 Cargando métricas procesadas desde {self.history_path}")
+                    return processed
             
-            if processed_files:
-                latest_processed = max(processed_files, key=os.path.getmtime)
-                file_size = os.path.getsize(latest_processed) / (1024 * 1024)
-                print(f"📊 Cargando métricas procesadas: {latest_processed} ({file_size:.2f} MB)")
-                
-                with open(latest_processed, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            # 🎯 PRIORIDAD 2: Base de datos SQLite (consultas indexadas, sin parsear JSON)
+            store_data = self.get_store_sample()
+            if store_data is not None:
+                return store_data
             
-            # 🎯 PRIORIDAD 2: Archivos originales (con optimización)
-            json_files = glob.glob(os.path.join(self.base_path, "centinela_gamma_tweets_maximized_*.json"))
+            # 🎯 PRIORIDAD 3: Archivos originales (con optimización)
+            json_files = glob.glob(os.path.join(self.base_path, "centinela_gamma_tweets_maximized_*.json*"))
             
             if not json_files:
                 print("No se encontraron archivos de CENTINELA-GAMMA")
@@ -458,46 +491,52 @@ class PalestineWarCrimesAPI(SimpleHTTPRequestHandler):
             print(f"⚠️ Cargando archivo original: {latest_file} ({file_size:.1f} MB)")
             print("💡 Recomendación: Ejecute palestine_tweets_processor.py para optimización")
             
-            if file_size > 25:  # Archivo grande - muestreo inteligente
+            # Los archivos comprimidos ocupan ~10x más al descomprimirse: siempre se muestrean
+            compressed = detect_compression(latest_file) != 'none'
+            if file_size > 25 or compressed:  # Archivo grande - muestreo inteligente
                 print("📊 Archivo grande detectado, aplicando muestreo inteligente...")
-                with open(latest_file, 'r', encoding='utf-8') as f:
-                    full_data = json.load(f)
-                
-                # Muestreo inteligente de tweets
-                all_tweets = full_data.get('tweets', [])
                 
-                # Priorizar tweets críticos y de alta relevancia
-                critical_tweets = [t for t in all_tweets if t.get('is_critical')]
-                high_relevance = [t for t in all_tweets if t.get('relevance_score', 0) > 80 and not t.get('is_critical')]
-                regular_tweets = [t for t in all_tweets if t.get('relevance_score', 0) <= 80 and not t.get('is_critical')]
+                # Muestreo inteligente en streaming: top-k por relevancia de cada grupo
+                # (mismos criterios que TweetStore.sample_tweets)
+                critical_tweets = TopK(80, relevance_key)     # Tweets críticos (máx 80)
+                high_relevance = TopK(15, relevance_key)      # Alta relevancia (15)
+                regular_tweets = TopK(5, relevance_key)       # Tweets regulares (5)
+                original_count = 0
+                for tweet in iter_json_tweets(latest_file):
+                    original_count += 1
+                    # Priorizar tweets críticos y de alta relevancia
+                    if tweet.get('is_critical'):
+                        critical_tweets.push(tweet)
+                    elif tweet.get('relevance_score', 0) > 80:
+                        high_relevance.push(tweet)
+                    else:
+                        regular_tweets.push(tweet)
                 
                 # Crear muestra optimizada
-                sampled_tweets = (
-                    critical_tweets[:80] +    # Tweets críticos (máx 80)
-                    high_relevance[:15] +     # Alta relevancia (15)
-                    regular_tweets[:5]        # Tweets regulares (5)
+                sampled_tweets = TweetBatch.from_dicts(
+                    critical_tweets.items() + high_relevance.items() + regular_tweets.items()
                 )
                 
                 optimized_data = {
-                    'metadata': full_data.get('metadata', {}),
+                    'metadata': read_json_metadata(latest_file),
                     'tweets': sampled_tweets
                 }
                 
                 # Actualizar estadísticas
                 optimized_data['metadata']['sampling_applied'] = {
-                    'original_count': len(all_tweets),
+                    'original_count': original_count,
                     'sampled_count': len(sampled_tweets),
-                    'critical_included': len(critical_tweets[:80]),
-                    'high_relevance_included': len(high_relevance[:15]),
-                    'regular_included': len(regular_tweets[:5])
+                    'critical_included': len(critical_tweets),
+                    'high_relevance_included': len(high_relevance),
+                    'regular_included': len(regular_tweets)
                 }
                 
-                print(f"🎯 Optimización aplicada: {len(sampled_tweets):,} tweets de {len(all_tweets):,}")
+                print(f"🎯 Optimización aplicada: {len(sampled_tweets):,} tweets de {original_count:,}")
                 return optimized_data
                 
             elif file_size > 50:  # Archivo extremadamente grande - solo metadata
                 print("Archivo extremo, cargando solo metadata...")
-                with open(latest_file, 'r', encoding='utf-8') as f:
+                with open_text_reader(latest_file) as f:
                     # Leer línea por línea hasta encontrar el final de metadata
                     content = ""
                     brace_count = 0
@@ -524,13 +563,41 @@ class PalestineWarCrimesAPI(SimpleHTTPRequestHandler):
                         return None
             else:
                 # Archivo pequeño, cargar completo
-                with open(latest_file, 'r', encoding='utf-8') as f:
+                with open_text_reader(latest_file) as f:
                     return json.load(f)
                 
         except Exception as e:
             print(f"Error cargando datos de Palestina: {e}")
             return None
 
+    def get_store_sample(self) -> Dict:
+        """Metadata + muestra priorizada de tweets leída directamente de la base de datos"""
+        store = self.open_store()
+        if store is None:
+            return None
+        
+        try:
+            total = store.count()
+            if total == 0:
+                return None
+            
+            sample = store.sample_tweets(critical=80, high_relevance=15, regular=5)
+            sampled_tweets = sample['critical'] + sample['high_relevance'] + sample['regular']
+            
+            metadata = store.latest_run_metadata()
+            metadata['sampling_applied'] = {
+                'original_count': total,
+                'sampled_count': len(sampled_tweets),
+                'critical_included': len(sample['critical']),
+                'high_relevance_included': len(sample['high_relevance']),
+                'regular_included': len(sample['regular'])
+            }
+            
+            print(f"🗄️ Muestra desde base de datos: {len(sampled_tweets):,} tweets de {total:,}")
+            return {'metadata': metadata, 'tweets': TweetBatch.from_dicts(sampled_tweets)}
+        finally:
+            store.close()
+
     def calculate_alert_level(self, stats: Dict, war_crimes: Dict) -> str:
         """Calcula nivel de alerta basado en estadísticas"""
         critical_percentage = (stats.get('critical_tweets', 0) / max(stats.get('total_tweets', 1), 1)) * 100
@@ -725,7 +792,7 @@ class PalestineWarCrimesAPI(SimpleHTTPRequestHandler):
             
             if latest_data:
                 # Limitar datos para evitar sobrecarga
-                tweets_sample = latest_data.get('tweets', [])[:100]  # Solo 100 tweets como muestra
+                tweets_sample = to_dicts(latest_data.get('tweets', [])[:100])  # Solo 100 tweets como muestra
                 
                 limited_data = {
                     'metadata': latest_data.get('metadata'),
@@ -766,6 +833,75 @@ class PalestineWarCrimesAPI(SimpleHTTPRequestHandler):
             }
             self.send_json_response(fallback_data)
 
+    @staticmethod
+    def query_number(query: Dict[str, List[str]], name: str, parse, default=None):
+        """
+        Parámetro numérico `name` de la query string convertido con `parse`
+        (`default` si no viene). ValueError con el nombre si no es un número finito.
+        """
+        if name not in query:
+            return default
+        raw = query[name][0]
+        try:
+            value = parse(raw)
+        except ValueError:
+            value = None
+        if value is None or not math.isfinite(value):
+            raise ValueError(f"Parámetro '{name}' inválido: {raw!r}")
+        return value
+
+    def send_metrics_history(self, query: Dict[str, List[str]]):
+        """Serie de una métrica (?metric=seccion.campo&days=N) y ejecuciones conservadas"""
+        try:
+            days = self.query_number(query, 'days', float, 30.0)
+            if days < 0:
+                raise ValueError(f"Parámetro 'days' inválido: {query['days'][0]!r}")
+        except ValueError as e:
+            self.send_400(str(e))
+            return
+        try:
+            history = self.open_history()
+            if history is None:
+                self.send_json_response({'metric': None, 'series': [], 'runs': []})
+                return
+            try:
+                metric = query.get('metric', ['basic_metrics.total_tweets'])[0]
+                since = int(datetime.now().timestamp() - days * DAY)
+                self.send_json_response({
+                    'metric': metric,
+                    'days': days,
+                    'series': history.series(metric, since=since),
+                    'runs': history.runs(since=since)
+                })
+            finally:
+                history.close()
+        except Exception as e:
+            self.send_error_response(f"Error en histórico de métricas: {str(e)}")
+
+    def send_metrics_delta(self, query: Dict[str, List[str]]):
+        """Cambio de las métricas entre dos ejecuciones (?from=run_id&to=run_id; por defecto las dos últimas)"""
+        try:
+            requested_to = self.query_number(query, 'to', int)
+            requested_from = self.query_number(query, 'from', int)
+        except ValueError as e:
+            self.send_400(str(e))
+            return
+        try:
+            history = self.open_history()
+            if history is None:
+                self.send_json_response({'from_run': None, 'to_run': None, 'deltas': {}})
+                return
+            try:
+                latest = history.latest_runs(2)
+                to_run = requested_to if requested_to is not None else (latest[0] if latest else None)
+                from_run = requested_from if requested_from is not None else (latest[-1] if latest else None)
+                deltas = history.delta(from_run, to_run) if from_run is not None else {}
+                self.send_json_response({'from_run': from_run, 'to_run': to_run, 'deltas': deltas})
+            finally:
+                history.close()
+        except Exception as e:
+            self.send_error_response(f"Error en deltas de métricas: {str(e)}")
+
     def send_json_response(self, data):
         """Envía respuesta JSON"""
         self.send_response(200)
@@ -785,6 +921,15 @@ class PalestineWarCrimesAPI(SimpleHTTPRequestHandler):
         error = {'error': 'Endpoint no encontrado'}
         self.wfile.write(json.dumps(error).encode('utf-8'))
 
+    def send_400(self, error_message):
+        """Envía respuesta 400 (parámetros inválidos)"""
+        self.send_response(400)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        
+        error = {'error': error_message}
+        self.wfile.write(json.dumps(error).encode('utf-8'))
+
     def send_error_response(self, error_message):
         """Envía respuesta de error"""
         self.send_response(500)
@@ -811,6 +956,8 @@ def run_palestine_api(port=8081):
     print("🕊️   /api/palestine/media-coverage")
     print("🕊️   /api/palestine/victim-statistics")
     print("🕊️   /api/palestine/latest-data")
+    print("🕊️   /api/palestine/metrics-history?metric=basic_metrics.total_tweets&days=30")
+    print("🕊️   /api/palestine/metrics-delta?from=<run_id>&to=<run_id>")
     print("🕊️" + "="*75)
     
     try:
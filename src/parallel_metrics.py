@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+🕊️ PARALLEL METRICS - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Map-reduce del motor de métricas: shards procesados en un pool de procesos y fusión determinista
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Dict, Any, Iterable, Iterator, Tuple
+
+from tweet_batch import TweetBatch
+from tweet_store import TweetRange
+from metrics_engine import MetricsEngine, build_metrics_engine
+from processing_config import default_workers
+
+# Tweets por shard: suficientes para amortizar el arranque de la tarea y la fusión
+DEFAULT_SHARD_SIZE = 50000
+
+
+def run_shard(shard: Iterable[Dict], base_index: int) -> Dict[str, Any]:
+    """
+    Tarea de un proceso: analiza un shard (TweetBatch o TweetRange, que se lee
+    directamente de la base de datos) y devuelve el estado parcial de sus acumuladores.
+    """
+    engine = build_metrics_engine(base_index=base_index)
+    engine.run(shard)
+    return engine.state()
+
+
+class ShardedMetricsRunner:
+    """
+    Divide la entrada en shards consecutivos de `shard_size` tweets, los
+    analiza en `workers` procesos y fusiona los estados parciales en el motor
+    principal en orden de shard. Cada shard conoce el índice global de su
+    primer tweet, así que el resultado es idéntico al de una pasada secuencial
+    con independencia del número de procesos.
+
+    - `TweetRange` (base de datos): cada proceso lee su sub-rango de rowid,
+      sin pasar los tweets por el proceso principal.
+    - Cualquier otro iterable: el proceso principal arma los shards como
+      TweetBatch y como máximo hay `2 * workers` en vuelo.
+    - Con un solo shard no se arranca el pool (ver `run`).
+    """
+
+    def __init__(self, workers: int = None, shard_size: int = DEFAULT_SHARD_SIZE):
+        self.workers = workers or default_workers()
+        self.shard_size = shard_size
+
+    def iter_shards(self, tweets: Iterable[Dict]) -> Iterator[Tuple[Iterable[Dict], int]]:
+        """(shard, cantidad de tweets o None si se desconoce hasta procesarlo)"""
+        if isinstance(tweets, TweetRange):
+            for shard in tweets.split(self.shard_size):
+                yield shard, None
+            return
+        if isinstance(tweets, TweetBatch):
+            for start in range(0, len(tweets), self.shard_size):
+                shard = tweets[start:start + self.shard_size]
+                yield shard, len(shard)
+            return
+        iterator = iter(tweets)
+        while True:
+            shard = TweetBatch.from_dicts(islice(iterator, self.shard_size))
+            if not len(shard):
+                return
+            yield shard, len(shard)
+
+    def run(self, engine: MetricsEngine, tweets: Iterable[Dict]) -> Dict[str, Any]:
+        """
+        Agrega los tweets al estado de `engine` y devuelve {sección: resultado}.
+        Si la entrada cabe en un solo shard se analiza en el proceso principal:
+        arrancar el pool y serializar el estado costaría más que el análisis.
+        """
+        shards = self.iter_shards(tweets)
+        first = list(islice(shards, 2))
+        if len(first) < 2:
+            if not first:
+                return engine.results()
+            print("🧩 Un solo shard: análisis en el proceso principal")
+            return engine.run(first[0][0])
+
+        executor = ProcessPoolExecutor(max_workers=self.workers)
+        in_flight = deque()
+        # Índice global del siguiente shard; los TweetRange se parten en shards
+        # de exactamente `shard_size` filas, salvo el último
+        next_index = engine.base_index + engine.tweets_processed
+        try:
+            for shard, size in chain(first, shards):
+                in_flight.append(executor.submit(run_shard, shard, next_index))
+                next_index += self.shard_size if size is None else size
+                if len(in_flight) >= 2 * self.workers:
+                    self.merge_state(engine, in_flight.popleft().result())
+            while in_flight:
+                self.merge_state(engine, in_flight.popleft().result())
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+        return engine.results()
+
+    @staticmethod
+    def merge_state(engine: MetricsEngine, state: Dict[str, Any]):
+        """Fusiona el estado parcial de un shard (siempre en orden de shard)"""
+        shard_engine = build_metrics_engine()
+        shard_engine.load_state(state)
+        engine.merge(shard_engine)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+🕊️ PROCESSING CONFIG - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Sección `data_processing` de la configuración de la organización (sin dependencias del motor)
+"""
+
+import json
+import os
+from typing import Dict, Any
+
+ORGANIZATION_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                        'examples', 'organization_config.json')
+
+
+def load_processing_config(path: str = ORGANIZATION_CONFIG_PATH) -> Dict[str, Any]:
+    """Sección `data_processing` de la configuración de la organización ({} si no existe)"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return config['organization_config']['api_configuration']['data_processing']
+    except (OSError, KeyError, TypeError, json.JSONDecodeError) as e:
+        print(f"⚠️ No se pudo leer la configuración de procesamiento de {path}: {e}")
+        return {}
+
+
+def default_workers() -> int:
+    """
+    Procesos por defecto: `processing_threads` de la configuración de la
+    organización, sin superar los núcleos disponibles.
+    """
+    threads = max(int(load_processing_config().get('processing_threads', 1)), 1)
+    return min(threads, os.cpu_count() or 1)
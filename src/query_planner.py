@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+🕊️ QUERY PLANNER - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Agrupa queries en consultas OR bajo el límite de longitud y atribuye cada tweet a sus queries
+"""
+
+import re
+from typing import List, Dict, Set
+
+# Longitud máxima de query en search/recent (acceso Basic; Pro admite 4096)
+MAX_QUERY_LENGTH = 512
+
+# Tokens como los indexa la búsqueda: palabras, #hashtags y @menciones
+TOKEN_RE = re.compile(r"[#@]?\w+")
+
+
+def tokenize(text: str) -> Set[str]:
+    """Tokens en minúsculas; los hashtags cuentan también como palabra sin '#'"""
+    tokens = set()
+    for token in TOKEN_RE.findall(text.lower()):
+        tokens.add(token)
+        if token[0] in '#@':
+            tokens.add(token[1:])
+    return tokens
+
+
+class QueryPlan:
+    """Consulta enviada a la API y queries configuradas que la componen"""
+
+    __slots__ = ('api_query', 'members')
+
+    def __init__(self, members: List[str]):
+        self.members = list(members)
+        self.api_query = ' OR '.join(self.format_member(query) for query in self.members)
+
+    @staticmethod
+    def format_member(query: str) -> str:
+        """Las queries de varios términos van entre paréntesis para conservar su AND implícito"""
+        return f"({query})" if ' ' in query.strip() else query.strip()
+
+    def __repr__(self) -> str:
+        return f"QueryPlan({self.api_query!r})"
+
+
+class QueryPlanner:
+    """
+    Empaqueta las queries configuradas en el menor número de consultas OR
+    que respetan `max_length` (first-fit, conservando el orden original) y
+    atribuye cada tweet devuelto a todas las queries del grupo que coinciden.
+    """
+
+    def __init__(self, queries: List[str], max_length: int = MAX_QUERY_LENGTH):
+        self.queries = list(queries)
+        self.max_length = max_length
+        self.plans = self._pack()
+        self._terms: Dict[str, List[Set[str]]] = {
+            query: [tokenize(term) for term in query.split()] for query in self.queries
+        }
+
+    def _pack(self) -> List[QueryPlan]:
+        groups: List[List[str]] = []
+        lengths: List[int] = []
+        for query in self.queries:
+            length = len(QueryPlan.format_member(query))
+            for index, group_length in enumerate(lengths):
+                if group_length + len(' OR ') + length <= self.max_length:
+                    groups[index].append(query)
+                    lengths[index] = group_length + len(' OR ') + length
+                    break
+            else:
+                groups.append([query])
+                lengths.append(length)
+        return [QueryPlan(group) for group in groups]
+
+    def matches(self, query: str, tokens: Set[str]) -> bool:
+        """Indica si el texto tokenizado cumple la query (todos sus términos presentes)"""
+        return all(term <= tokens for term in self._terms[query])
+
+    def attribute(self, plan: QueryPlan, text: str) -> List[str]:
+        """
+        Queries del plan que coinciden con el texto del tweet. Si ninguna
+        coincide localmente (p. ej. por una URL expandida), se atribuye a la
+        primera query del plan para no perder el tweet.
+        """
+        if len(plan.members) == 1:
+            return list(plan.members)
+        tokens = tokenize(text)
+        matched = [query for query in plan.members if self.matches(query, tokens)]
+        return matched or plan.members[:1]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+🕊️ QUERY SCHEDULER - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Reparto adaptativo de requests entre consultas según su rendimiento (bandit multi-brazo)
+"""
+
+import json
+import os
+import random
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+# Media a priori de "tweets críticos nuevos por tweet solicitado" según la prioridad
+PRIORITY_PRIOR_MEAN = {'CRITICAL': 0.6, 'HIGH': 0.4, 'MEDIUM': 0.25, 'LOW': 0.1}
+DEFAULT_PRIOR_MEAN = 0.3
+PRIORITY_RANK = {'CRITICAL': 3, 'HIGH': 2, 'MEDIUM': 1, 'LOW': 0}
+
+# Peso del prior en requests equivalentes: pocos requests reales lo superan
+PRIOR_WEIGHT = 2.0
+
+SAMPLE_QUERIES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   'examples', 'sample_queries.json')
+
+TERM_RE = re.compile(r"\w+")
+STOPWORDS = {'or', 'and', 'the', 'of', 'in', 'against'}
+
+
+def load_category_terms(path: str = SAMPLE_QUERIES_PATH) -> List[Tuple[str, Set[str]]]:
+    """
+    Lee las categorías de `sample_queries.json` como (prioridad, términos
+    distintivos). Los términos geográficos se descartan: aparecen en todas.
+    """
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)['centinela_gamma_queries']
+    except (OSError, KeyError, json.JSONDecodeError) as e:
+        print(f"⚠️ No se pudieron leer las prioridades de {path}: {e}")
+        return []
+
+    generic = set(STOPWORDS) | {'israel', 'palestinian', 'palestinians'}
+    for places in config.get('geographic_filters', {}).values():
+        for place in places:
+            generic.update(TERM_RE.findall(place.lower()))
+
+    categories = []
+    for category in config.get('query_categories', {}).values():
+        terms = set()
+        for query in category.get('queries', []):
+            terms.update(term for term in TERM_RE.findall(query.lower())
+                         if len(term) >= 4 and term not in generic)
+        categories.append((category.get('priority', 'MEDIUM'), terms))
+    return categories
+
+
+def query_prior_mean(query: str, categories: List[Tuple[str, Set[str]]]) -> float:
+    """
+    Prior de una query: prioridad de la categoría con más términos contenidos
+    en ella (como subcadena, para cubrir hashtags como #GazaGenocide).
+    """
+    query_lower = query.lower()
+    best: Optional[Tuple[int, int]] = None
+    best_priority = None
+    for priority, terms in categories:
+        score = sum(1 for term in terms if term in query_lower)
+        if score == 0:
+            continue
+        key = (score, PRIORITY_RANK.get(priority, 0))
+        if best is None or key > best:
+            best, best_priority = key, priority
+    return PRIORITY_PRIOR_MEAN.get(best_priority, DEFAULT_PRIOR_MEAN)
+
+
+class QueryScheduler:
+    """
+    Thompson sampling con un brazo por query configurada. Las queries viajan
+    agrupadas en consultas OR (ver QueryPlanner): cada request se acredita a
+    todas las queries de su consulta con los tweets que coinciden con cada una
+    (`attribute`), y una consulta vale lo que la mejor muestra de sus queries.
+    La recompensa es la fracción de tweets críticos *nuevos* sobre los tweets
+    solicitados, de modo que los duplicados también penalizan. Las
+    estadísticas se guardan en disco por query (sobreviven a cambios en el
+    agrupamiento) y se atenúan con `decay` en cada ejecución para seguir
+    cambios de tendencia; las prioridades de `sample_queries.json` actúan
+    como prior.
+    """
+
+    def __init__(self, priors: Dict[str, float], path: str = "data/query_yield.json",
+                 tweets_per_request: int = 100, decay: float = 0.8, seed: Optional[int] = None):
+        self.priors = dict(priors)
+        self.path = path
+        self.tweets_per_request = tweets_per_request
+        self.decay = decay
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.arms: Dict[str, Dict[str, float]] = self._load()
+
+    @staticmethod
+    def _empty_arm() -> Dict[str, float]:
+        return {'requests': 0, 'tweets': 0, 'new_tweets': 0, 'critical_tweets': 0, 'reward': 0.0}
+
+    def _load(self) -> Dict[str, Dict[str, float]]:
+        arms = {arm: self._empty_arm() for arm in self.priors}
+        if not os.path.exists(self.path):
+            return arms
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f).get('arms', {})
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Estadísticas de rendimiento ilegibles ({self.path}): {e}")
+            return arms
+        for arm in arms:
+            if arm in saved:
+                arms[arm] = {key: value * self.decay for key, value in saved[arm].items() if key in arms[arm]}
+        return arms
+
+    def save(self):
+        """Persiste las estadísticas de rendimiento de todos los brazos"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with self._lock:
+            state = {'updated_at': datetime.now().isoformat(), 'arms': self.arms}
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def posterior(self, arm: str) -> Tuple[float, float]:
+        """Parámetros (alpha, beta) de la Beta posterior de un brazo"""
+        stats = self.arms[arm]
+        prior = self.priors.get(arm, DEFAULT_PRIOR_MEAN)
+        alpha = prior * PRIOR_WEIGHT + stats['reward']
+        beta = (1 - prior) * PRIOR_WEIGHT + max(stats['requests'] - stats['reward'], 0)
+        return alpha, beta
+
+    def choose(self, candidates: Dict[str, List[str]]) -> Optional[str]:
+        """
+        Elige entre {consulta: queries que la componen} la consulta cuya query
+        tiene la mayor muestra de su posterior (None si no hay candidatas)
+        """
+        if not candidates:
+            return None
+        with self._lock:
+            samples = [(max(self._random.betavariate(*self.posterior(arm)) for arm in members), key)
+                       for key, members in candidates.items()]
+        return max(samples)[1]
+
+    def record(self, results: Dict[str, Tuple[int, int, int]]):
+        """
+        Registra un request servido: (tweets, nuevos, críticos nuevos)
+        atribuidos a cada query de la consulta, incluidas las que no sumaron nada
+        """
+        with self._lock:
+            for arm, (tweets, new_tweets, critical_tweets) in results.items():
+                stats = self.arms.setdefault(arm, self._empty_arm())
+                stats['requests'] += 1
+                stats['tweets'] += tweets
+                stats['new_tweets'] += new_tweets
+                stats['critical_tweets'] += critical_tweets
+                stats['reward'] += min(critical_tweets / max(self.tweets_per_request, 1), 1.0)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Rendimiento por query: críticos por request y tasa de duplicados"""
+        rows = []
+        with self._lock:
+            for arm, stats in self.arms.items():
+                requests = stats['requests']
+                rows.append({
+                    'query': arm,
+                    'requests': round(requests, 2),
+                    'critical_per_request': round(stats['critical_tweets'] / requests, 2) if requests else 0.0,
+                    'duplicate_rate': round(1 - stats['new_tweets'] / stats['tweets'], 3) if stats['tweets'] else 0.0,
+                    'prior': self.priors.get(arm, DEFAULT_PRIOR_MEAN)
+                })
+        return sorted(rows, key=lambda row: row['critical_per_request'], reverse=True)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+🕊️ RATE LIMITER - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Token bucket compartido y backoff por endpoint para la API de Twitter
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Any, Optional
+
+
+def parse_rate_limit_headers(headers: Any) -> Dict[str, Optional[int]]:
+    """Extrae x-rate-limit-limit/remaining/reset de las cabeceras de respuesta"""
+    values = {}
+    for name in ('limit', 'remaining', 'reset'):
+        raw = headers.get(f'x-rate-limit-{name}') if headers is not None else None
+        try:
+            values[name] = int(raw) if raw is not None else None
+        except (TypeError, ValueError):
+            values[name] = None
+    return values
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe compartido por todos los workers.
+
+    Arranca con una tasa conservadora y se reajusta con las cabeceras
+    `x-rate-limit-*` de cada respuesta: los tokens restantes se reparten
+    uniformemente hasta el instante de reset de la ventana.
+    """
+
+    def __init__(self, rate: float = 1.0, capacity: float = 5.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible y lo consume"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def update_from_headers(self, headers: Any):
+        """Ajusta tasa y tokens disponibles según la cuota real informada por la API"""
+        limits = parse_rate_limit_headers(headers)
+        remaining, reset = limits['remaining'], limits['reset']
+        if remaining is None or reset is None:
+            return
+
+        window = max(reset - time.time(), 1.0)
+        with self._lock:
+            self._refill(time.monotonic())
+            # Con la cuota agotada se libera un único token al reiniciarse la ventana
+            self.rate = remaining / window if remaining > 0 else 1.0 / window
+            self.tokens = min(self.tokens, remaining)
+            if limits['limit']:
+                self.capacity = min(self.capacity, limits['limit'])
+
+
+class EndpointBackoff:
+    """
+    Backoff exponencial independiente por endpoint ante HTTP 429.
+    Respeta `x-rate-limit-reset` cuando la API lo informa.
+    """
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 900.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._state: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, endpoint: str):
+        """Espera si el endpoint está en periodo de backoff"""
+        with self._lock:
+            until = self._state.get(endpoint, {}).get('until', 0)
+        delay = until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def record_rate_limited(self, endpoint: str, headers: Any = None) -> float:
+        """Registra un 429 y devuelve los segundos de espera asignados"""
+        reset = parse_rate_limit_headers(headers)['reset']
+        with self._lock:
+            state = self._state.setdefault(endpoint, {'attempts': 0, 'until': 0})
+            state['attempts'] += 1
+            delay = self.base_delay * (2 ** (state['attempts'] - 1)) + random.uniform(0, self.base_delay)
+            if reset is not None:
+                delay = max(delay, reset - time.time())
+            delay = min(delay, self.max_delay)
+            state['until'] = max(state['until'], time.monotonic() + delay)
+            return delay
+
+    def record_success(self, endpoint: str):
+        """Reinicia el contador de intentos tras una respuesta correcta"""
+        with self._lock:
+            if endpoint in self._state:
+                self._state[endpoint]['attempts'] = 0
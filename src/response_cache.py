@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+🕊️ RESPONSE CACHE - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Caché en disco de respuestas crudas de la API, direccionada por contenido, con TTL y límite de tamaño
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from tweet_io import open_text_writer, open_text_reader
+
+CACHE_SUFFIX = '.json.gz'
+
+
+class ResponseCache:
+    """
+    Cada respuesta se guarda en `directory/ab/<sha256>.json.gz`, donde el hash
+    se calcula sobre el endpoint y todos los parámetros de la petición
+    (query, since_id, next_token, campos...). Así una misma página solo se
+    paga una vez: las repeticiones dentro del TTL se sirven desde disco.
+
+    Las páginas de continuación (con next_token) son una instantánea fija de
+    la búsqueda y valen todo el TTL. La página inicial de una query (sin
+    next_token) cambia en cuanto se publican tweets nuevos, así que su clave
+    incluye la ventana de tiempo actual (ver `request_key`).
+
+    - `ttl`: segundos de validez de una entrada (las caducadas se borran al leerlas).
+    - `head_window`: segundos durante los que se reutiliza una página inicial
+      (0 = no cachear páginas iniciales).
+    - `max_bytes`: tamaño máximo en disco; al superarlo se expulsan las
+      entradas más antiguas.
+    """
+
+    def __init__(self, directory: str = "data/response_cache", ttl: float = 3600.0,
+                 max_bytes: int = 512 * 1024 * 1024, head_window: float = 60.0):
+        self.directory = directory
+        self.ttl = ttl
+        self.head_window = head_window
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[float, int]] = {}  # clave -> (guardado, bytes)
+        self.total_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stores': 0, 'evictions': 0}
+        self._scan()
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any]) -> str:
+        """Clave de contenido: hash de endpoint + parámetros canónicos"""
+        canonical = json.dumps({'endpoint': endpoint, 'params': params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def request_key(self, endpoint: str, params: Dict[str, Any]) -> Optional[str]:
+        """Clave de una petición de búsqueda, o None si no debe cachearse"""
+        if params.get('next_token'):
+            return self.make_key(endpoint, params)
+        if not self.head_window:
+            return None
+        window = int(time.time() // self.head_window)
+        return self.make_key(endpoint, dict(params, cache_window=window))
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + CACHE_SUFFIX)
+
+    def _scan(self):
+        """Reconstruye el índice en memoria a partir de los archivos existentes"""
+        if not os.path.isdir(self.directory):
+            return
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(CACHE_SUFFIX):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                self._index[name[:-len(CACHE_SUFFIX)]] = (stat.st_mtime, stat.st_size)
+                self.total_bytes += stat.st_size
+
+    def _remove(self, key: str):
+        """Quita una entrada del índice y del disco (con el lock tomado)"""
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry[1]
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Payload JSON guardado para `key`, o None si no existe o caducó"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            if time.time() - entry[0] > self.ttl:
+                self._remove(key)
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+        try:
+            with open_text_reader(self.path_for(key)) as f:
+                payload = json.load(f)
+        except (OSError, EOFError, ValueError):
+            # Entrada corrupta o borrada externamente: se trata como fallo
+            with self._lock:
+                self._remove(key)
+                self.stats['misses'] += 1
+            return None
+
+        with self._lock:
+            self.stats['hits'] += 1
+        return payload
+
+    def put(self, key: str, payload: Dict):
+        """Guarda una respuesta de forma atómica y aplica el límite de tamaño"""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open_text_writer(tmp_path, 'gzip') as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar la respuesta en caché: {e}")
+            return
+
+        with self._lock:
+            previous = self._index.get(key)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+            self._index[key] = (time.time(), size)
+            self.total_bytes += size
+            self.stats['stores'] += 1
+            self._evict()
+
+    def _evict(self):
+        """Expulsa las entradas más antiguas hasta volver bajo `max_bytes` (con el lock tomado)"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][0]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            self.stats['evictions'] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Estadísticas de aciertos/fallos y ocupación"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(self.stats,
+                        entries=len(self._index),
+                        size_mb=round(self.total_bytes / (1024 * 1024), 2),
+                        hit_rate=round(self.stats['hits'] / lookups, 3) if lookups else 0.0)
+
+    def __len__(self) -> int:
+        return len(self._index)
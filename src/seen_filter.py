@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+🕊️ SEEN FILTER - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Conjunto persistente y compacto de ids de tweets ya ingeridos (deduplicación)
+"""
+
+import hashlib
+import heapq
+import os
+from array import array
+from bisect import bisect_left
+from typing import Iterator, List, Set
+
+
+def id_hash(tweet_id) -> int:
+    """Huella de 64 bits de un id de tweet (colisiones despreciables a nuestra escala)"""
+    digest = hashlib.blake2b(str(tweet_id).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class SeenIdFilter:
+    """
+    Conjunto de ids vistos, persistido como array ordenado de huellas de 64 bits
+    (8 bytes por tweet) más un log de altas recientes.
+
+    - `add()` consulta primero las altas recientes y luego hace búsqueda binaria
+      sobre el array ordenado.
+    - `sync()` agrega las altas pendientes al log (barato, se llama por página).
+    - `compact()` fusiona el log en el array ordenado (al terminar la extracción).
+    """
+
+    def __init__(self, path: str = "data/seen_tweet_ids.bin"):
+        self.path = path
+        self.log_path = f"{path}.log"
+        self._sorted = self._read_array(self.path)
+        self._recent: Set[int] = set(self._read_array(self.log_path))
+        self._unlogged = array('Q')
+
+    @staticmethod
+    def _read_array(path: str) -> array:
+        values = array('Q')
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Ignorar un último registro incompleto (escritura interrumpida)
+            usable = len(data) - (len(data) % values.itemsize)
+            values.frombytes(data[:usable])
+        return values
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._recent)
+
+    def _in_sorted(self, value: int) -> bool:
+        index = bisect_left(self._sorted, value)
+        return index < len(self._sorted) and self._sorted[index] == value
+
+    def __contains__(self, tweet_id) -> bool:
+        value = id_hash(tweet_id)
+        return value in self._recent or self._in_sorted(value)
+
+    def add(self, tweet_id) -> bool:
+        """Registra el id; devuelve True si no se había visto antes"""
+        value = id_hash(tweet_id)
+        if value in self._recent or self._in_sorted(value):
+            return False
+        self._recent.add(value)
+        self._unlogged.append(value)
+        return True
+
+    def sync(self):
+        """Agrega al log en disco las altas todavía no persistidas"""
+        if not self._unlogged:
+            return
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.log_path, 'ab') as f:
+            self._unlogged.tofile(f)
+        self._unlogged = array('Q')
+
+    def discard_unsynced(self):
+        """Olvida las altas no persistidas (p. ej. de una página que no llegó a confirmarse)"""
+        self._recent.difference_update(self._unlogged)
+        self._unlogged = array('Q')
+
+    @staticmethod
+    def _merge_sorted(existing: array, recent: List[int]) -> Iterator[int]:
+        """Fusión lineal de dos secuencias ordenadas, sin repetir valores"""
+        previous = None
+        for value in heapq.merge(existing, recent):
+            if value != previous:
+                yield value
+                previous = value
+
+    def compact(self):
+        """Fusiona las altas recientes en el array ordenado y vacía el log"""
+        self.sync()
+        if not self._recent:
+            return
+        merged = array('Q', self._merge_sorted(self._sorted, sorted(self._recent)))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            merged.tofile(f)
+        os.replace(tmp_path, self.path)
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self._sorted = merged
+        self._recent = set()
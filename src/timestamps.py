@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+🕊️ TIMESTAMPS - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Timestamps parseados una sola vez (epoch en segundos) e histogramas por hora y día
+"""
+
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin el paquete los histogramas se cuentan en Python
+    np = None
+
+# Marca de timestamp ausente o inválido en las columnas array('q') de epochs
+NO_EPOCH = -(1 << 63)
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+MAX_DAY_BINS = 1 << 16   # Días contados con bincount directo sobre el rango (~180 años)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=65536)
+def epoch_seconds(created_at: str) -> Optional[int]:
+    """Segundos desde epoch de un timestamp ISO (sin zona horaria = UTC), o None si no es válido"""
+    try:
+        dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def to_epoch(created_at: Any) -> int:
+    """Valor de la columna de epochs para un `created_at` (NO_EPOCH si falta o no es válido)"""
+    if not created_at:
+        return NO_EPOCH
+    epoch = epoch_seconds(created_at)
+    return NO_EPOCH if epoch is None else epoch
+
+
+def day_iso(day: int) -> str:
+    """Fecha ISO (UTC) del día `day` contado desde epoch"""
+    return date.fromordinal(_EPOCH_ORDINAL + day).isoformat()
+
+
+def _ordered_counts(codes, size: int) -> List[Tuple[int, int]]:
+    """(código, cantidad) de los códigos presentes, en orden de primera aparición (numpy)"""
+    counts = np.bincount(codes, minlength=size)
+    first = np.full(size, len(codes), dtype=np.int64)
+    np.minimum.at(first, codes, np.arange(len(codes), dtype=np.int64))
+    present = np.flatnonzero(counts)
+    present = present[np.argsort(first[present], kind='stable')]
+    return list(zip(present.tolist(), counts[present].tolist()))
+
+
+def hour_day_counts(epochs: Iterable[int]) -> Tuple[Dict[int, int], Dict[str, int]]:
+    """
+    Histogramas {hora UTC: tweets} y {fecha ISO: tweets} de una columna de
+    epochs, ignorando NO_EPOCH. Las claves quedan en orden de primera
+    aparición. Con numpy se cuentan con `bincount` sobre la columna completa.
+    """
+    if np is not None:
+        values = np.asarray(epochs, dtype=np.int64)
+        values = values[values != NO_EPOCH]
+        if not len(values):
+            return {}, {}
+        hourly = dict(_ordered_counts((values % SECONDS_PER_DAY) // SECONDS_PER_HOUR, 24))
+        days = values // SECONDS_PER_DAY
+        first_day = int(days.min())
+        span = int(days.max()) - first_day + 1
+        if span <= MAX_DAY_BINS:
+            day_values, codes = None, days - first_day
+        else:  # Fechas muy dispersas (timestamps erróneos): se compactan antes de contar
+            day_values, codes = np.unique(days, return_inverse=True)
+            span = len(day_values)
+        daily = {day_iso(first_day + code if day_values is None else int(day_values[code])): count
+                 for code, count in _ordered_counts(codes, span)}
+        return hourly, daily
+
+    hourly: Dict[int, int] = {}
+    day_counts: Dict[int, int] = {}
+    for epoch in epochs:
+        if epoch == NO_EPOCH:
+            continue
+        day, seconds = divmod(epoch, SECONDS_PER_DAY)
+        hour = seconds // SECONDS_PER_HOUR
+        hourly[hour] = hourly.get(hour, 0) + 1
+        day_counts[day] = day_counts.get(day, 0) + 1
+    return hourly, {day_iso(day): count for day, count in day_counts.items()}
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+🕊️ TIMING CLUSTERS - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Ráfagas temporales por autor y entre cuentas con el mismo contenido (ventana deslizante)
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Callable, Iterable, Optional, Sequence, Tuple
+
+from sketches import DistinctCounter
+from timestamps import NO_EPOCH
+
+try:
+    from config import BOT_INDICATORS
+except ImportError:
+    from sample_config import BOT_INDICATORS
+
+TIMING_CLUSTER_WINDOW = BOT_INDICATORS.get('timing_cluster_window', 300)
+MIN_BURST_TWEETS = 5     # Tweets de un mismo autor dentro de la ventana
+MIN_BURST_AUTHORS = 3    # Cuentas distintas con el mismo texto dentro de la ventana
+LARGEST_BURSTS = 5       # Ráfagas coordinadas de ejemplo en el resumen
+
+
+def sort_by_time(times: array, keys: list = None) -> Tuple[array, Optional[list]]:
+    """
+    Ordena por timestamp de forma estable (a igual timestamp se conserva el
+    orden de llegada). Timsort aprovecha los tramos ya ordenados: casi lineal
+    si los tweets llegaron en orden, O(n log n) en el peor caso.
+    """
+    if keys is None:
+        return array('q', sorted(times)), None
+    order = sorted(range(len(times)), key=times.__getitem__)
+    return array('q', [times[i] for i in order]), [keys[i] for i in order]
+
+
+def find_bursts(times: array, window: int, threshold: int, keys: list = None) -> List[Tuple[int, int]]:
+    """
+    Ráfagas disjuntas sobre timestamps ordenados, como (inicio, fin exclusivo):
+    ventanas de `window` segundos con al menos `threshold` tweets o, si se
+    pasan `keys`, con al menos `threshold` claves distintas. Dos punteros, O(n).
+    Cada ráfaga incluye todos los tweets de la ventana que empieza en su primer tweet.
+    """
+    bursts = []
+    in_window = Counter()
+    n = len(times)
+    start = end = 0
+    while end < n:
+        if keys is not None:
+            in_window[keys[end]] += 1
+        while times[end] - times[start] > window:
+            if keys is not None:
+                key = keys[start]
+                in_window[key] -= 1
+                if not in_window[key]:
+                    del in_window[key]
+            start += 1
+
+        size = len(in_window) if keys is not None else end - start + 1
+        if size >= threshold:
+            stop = end + 1
+            while stop < n and times[stop] - times[start] <= window:
+                stop += 1
+            bursts.append((start, stop))
+            in_window.clear()
+            start = end = stop
+            continue
+        end += 1
+    return bursts
+
+
+def open_start(times: array, window: int, bursts: List[Tuple[int, int]], latest: int) -> int:
+    """
+    Primer índice que una ráfaga futura todavía puede usar si los tweets
+    siguientes llegan con timestamp >= `latest`: lo anterior ya no cambia.
+    Una ráfaga que llega al final sigue abierta (puede crecer); si la clave
+    lleva más de una ventana sin actividad, todo queda cerrado.
+    """
+    n = len(times)
+    if not n or latest - times[-1] > window:
+        return n
+    if bursts and bursts[-1][1] == n:
+        return bursts[-1][0]
+    return bisect_left(times, times[-1] - window, bursts[-1][1] if bursts else 0)
+
+
+class TimingClusterIndex:
+    """
+    Timestamps por autor y por texto normalizado (huella del índice de casi
+    duplicados). Las ráfagas se detectan al pedir el resumen:
+
+    - Por autor: `min_burst_tweets` tweets en `window` segundos.
+    - Entre cuentas: el mismo texto publicado por `min_burst_authors` cuentas
+      distintas en `window` segundos.
+
+    `add` y `merge` solo agregan al final; cada clave se ordena una vez al
+    barrerla, así que el coste total es O(n log n) con independencia del
+    orden de llegada (la API entrega las páginas de más nuevo a más antiguo).
+
+    `compact` (antes de persistir el estado) cierra las ráfagas que ya no
+    pueden crecer y conserva solo los timestamps que la ventana deslizante
+    todavía necesita: el estado queda acotado por la actividad de la última
+    ventana y no por el corpus. Tweets posteriores con timestamps anteriores
+    a lo descartado solo se comparan con lo retenido.
+    """
+
+    def __init__(self, window: int = TIMING_CLUSTER_WINDOW, min_burst_tweets: int = MIN_BURST_TWEETS,
+                 min_burst_authors: int = MIN_BURST_AUTHORS):
+        self.window = window
+        self.min_burst_tweets = min_burst_tweets
+        self.min_burst_authors = min_burst_authors
+        self.author_times: Dict[Any, array] = {}
+        self.content_times: Dict[int, Tuple[array, list]] = {}  # huella -> (timestamps, autores)
+        # Ráfagas ya cerradas por `compact`
+        self.closed_author_bursts = 0
+        self.closed_burst_authors = DistinctCounter()
+        self.closed_coordinated = 0
+        self.closed_coordinated_tweets = 0
+        self.closed_largest: List[list] = []  # [autores, tweets, inicio, huella, texto]
+
+    def add(self, author: Any, timestamp: int, fingerprint: Optional[int]):
+        times = self.author_times.get(author)
+        if times is None:
+            times = self.author_times[author] = array('q')
+        times.append(timestamp)
+
+        if fingerprint is not None:
+            entry = self.content_times.get(fingerprint)
+            if entry is None:
+                entry = self.content_times[fingerprint] = (array('q'), [])
+            entry[0].append(timestamp)
+            entry[1].append(author)
+
+    def add_batch(self, authors: List[Any], author_codes: Sequence[int], timestamps: Sequence[int],
+                  fingerprints: List[Optional[int]], text_codes: Sequence[int]):
+        """
+        Registra las filas de un batch con autor y texto codificados por
+        diccionario (`fingerprints`: huella de cada texto distinto). Agrupa por
+        clave antes de tocar el índice; mismo resultado que `add` fila a fila.
+        Las filas sin timestamp (NO_EPOCH) se ignoran.
+        """
+        slots: Dict[int, int] = {}
+        text_slots = [None if fingerprint is None else slots.setdefault(fingerprint, len(slots))
+                      for fingerprint in fingerprints]
+        author_times = [array('q') for _ in authors]
+        content_times = [array('q') for _ in slots]
+        content_authors = [[] for _ in slots]
+        for code, text_code, timestamp in zip(author_codes, text_codes, timestamps):
+            if timestamp == NO_EPOCH:
+                continue
+            author_times[code].append(timestamp)
+            slot = text_slots[text_code]
+            if slot is not None:
+                content_times[slot].append(timestamp)
+                content_authors[slot].append(authors[code])
+
+        for author, times in zip(authors, author_times):
+            if not times:
+                continue
+            mine = self.author_times.get(author)
+            if mine is None:
+                self.author_times[author] = times
+            else:
+                mine.extend(times)
+        for fingerprint, times, tweet_authors in zip(slots, content_times, content_authors):
+            if not times:
+                continue
+            mine = self.content_times.get(fingerprint)
+            if mine is None:
+                self.content_times[fingerprint] = (times, tweet_authors)
+            else:
+                mine[0].extend(times)
+                mine[1].extend(tweet_authors)
+
+    def merge(self, other: 'TimingClusterIndex'):
+        """Fusiona un índice de tweets posteriores (a igual timestamp, los suyos van detrás)"""
+        for author, times in other.author_times.items():
+            mine = self.author_times.get(author)
+            if mine is None:
+                self.author_times[author] = array('q', times)
+            else:
+                mine.extend(times)
+        for fingerprint, (times, authors) in other.content_times.items():
+            mine = self.content_times.get(fingerprint)
+            if mine is None:
+                self.content_times[fingerprint] = (array('q', times), list(authors))
+            else:
+                mine[0].extend(times)
+                mine[1].extend(authors)
+        self.closed_author_bursts += other.closed_author_bursts
+        self.closed_burst_authors.merge(other.closed_burst_authors)
+        self.closed_coordinated += other.closed_coordinated
+        self.closed_coordinated_tweets += other.closed_coordinated_tweets
+        self.closed_largest = self._largest(self.closed_largest + other.closed_largest)
+
+    def _sort(self):
+        """Ordena cada clave por timestamp (barato si ya estaba ordenada)"""
+        for author, times in self.author_times.items():
+            if len(times) > 1:
+                self.author_times[author] = sort_by_time(times)[0]
+        for fingerprint, (times, authors) in self.content_times.items():
+            if len(times) > 1:
+                self.content_times[fingerprint] = sort_by_time(times, authors)
+
+    @staticmethod
+    def _largest(bursts: Iterable[list]) -> List[list]:
+        """Las LARGEST_BURSTS ráfagas con más cuentas, luego más tweets, luego más antiguas"""
+        return sorted(bursts, key=lambda burst: (-burst[0], -burst[1], burst[2], burst[3]))[:LARGEST_BURSTS]
+
+    @staticmethod
+    def _burst_entry(fingerprint: int, times: array, authors: list, start: int, stop: int,
+                     sample_for: Callable[[int], str] = None) -> list:
+        return [len(set(authors[start:stop])), stop - start, times[start], fingerprint,
+                sample_for(fingerprint) if sample_for else '']
+
+    def compact(self, sample_for: Callable[[int], str] = None):
+        """
+        Cierra las ráfagas que ya no pueden crecer (los tweets siguientes son
+        posteriores al más reciente visto) y descarta los timestamps que
+        quedaron fuera de la ventana. `sample_for` da el texto de ejemplo de
+        las ráfagas coordinadas que se cierran.
+        """
+        self._sort()
+        latest = max((times[-1] for times in self.author_times.values() if times), default=None)
+        if latest is None:
+            return
+
+        for author in list(self.author_times):
+            times = self.author_times[author]
+            bursts = find_bursts(times, self.window, self.min_burst_tweets)
+            keep = open_start(times, self.window, bursts, latest)
+            closed = sum(1 for _, stop in bursts if stop <= keep)
+            if closed:
+                self.closed_author_bursts += closed
+                self.closed_burst_authors.update((author,))
+            if keep == len(times):
+                del self.author_times[author]
+            elif keep:
+                self.author_times[author] = times[keep:]
+
+        closed_bursts = list(self.closed_largest)
+        for fingerprint in list(self.content_times):
+            times, authors = self.content_times[fingerprint]
+            bursts = find_bursts(times, self.window, self.min_burst_authors, authors)
+            keep = open_start(times, self.window, bursts, latest)
+            for start, stop in bursts:
+                if stop <= keep:
+                    self.closed_coordinated += 1
+                    self.closed_coordinated_tweets += stop - start
+                    closed_bursts.append(self._burst_entry(fingerprint, times, authors, start, stop, sample_for))
+            if keep == len(times):
+                del self.content_times[fingerprint]
+            elif keep:
+                self.content_times[fingerprint] = (times[keep:], authors[keep:])
+        self.closed_largest = self._largest(closed_bursts)
+
+    def summary(self, sample_for: Callable[[int], str] = None) -> Dict[str, Any]:
+        """Autores con ráfagas y ráfagas coordinadas entre cuentas (cerradas + abiertas)"""
+        self._sort()
+        burst_authors = []
+        author_bursts = self.closed_author_bursts
+        for author, times in self.author_times.items():
+            if len(times) < self.min_burst_tweets:
+                continue
+            bursts = len(find_bursts(times, self.window, self.min_burst_tweets))
+            if bursts:
+                burst_authors.append(author)
+                author_bursts += bursts
+
+        coordinated = []
+        for fingerprint, (times, authors) in self.content_times.items():
+            if len(times) < self.min_burst_authors:
+                continue
+            for start, stop in find_bursts(times, self.window, self.min_burst_authors, authors):
+                coordinated.append(self._burst_entry(fingerprint, times, authors, start, stop, sample_for))
+
+        return {
+            'window_seconds': self.window,
+            'authors_with_bursts': self.closed_burst_authors.union_count(burst_authors),
+            'author_bursts': author_bursts,
+            'coordinated_bursts': self.closed_coordinated + len(coordinated),
+            'tweets_in_coordinated_bursts': self.closed_coordinated_tweets + sum(burst[1] for burst in coordinated),
+            'largest_coordinated_bursts': [
+                {
+                    'authors': authors,
+                    'tweets': tweets,
+                    'start': datetime.fromtimestamp(start, tz=timezone.utc).isoformat(),
+                    'sample_text': sample
+                }
+                for authors, tweets, start, _, sample in self._largest(self.closed_largest + coordinated)
+            ]
+        }
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            'author_times': [[author, times.tolist()] for author, times in self.author_times.items()],
+            'content_times': [[fingerprint, times.tolist(), authors]
+                              for fingerprint, (times, authors) in self.content_times.items()],
+            'closed': {
+                'author_bursts': self.closed_author_bursts,
+                'burst_authors': self.closed_burst_authors.state(),
+                'coordinated': self.closed_coordinated,
+                'coordinated_tweets': self.closed_coordinated_tweets,
+                'largest': self.closed_largest
+            }
+        }
+
+    def load_state(self, state: Dict[str, Any]):
+        self.author_times = {author: array('q', times) for author, times in state['author_times']}
+        self.content_times = {fingerprint: (array('q', times), list(authors))
+                              for fingerprint, times, authors in state['content_times']}
+        closed = state['closed']
+        self.closed_author_bursts = closed['author_bursts']
+        self.closed_burst_authors = DistinctCounter.from_state(closed['burst_authors'])
+        self.closed_coordinated = closed['coordinated']
+        self.closed_coordinated_tweets = closed['coordinated_tweets']
+        self.closed_largest = [list(burst) for burst in closed['largest']]
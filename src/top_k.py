@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+🕊️ TOP-K - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Selección acotada de los k mejores elementos de un stream (heap mínimo de tamaño k)
+"""
+
+import heapq
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+# Rango de las severidades de incidentes (mayor = más grave)
+SEVERITY_RANK = {'MEDIUM': 0, 'HIGH': 1, 'CRITICAL': 2}
+
+
+def relevance_key(tweet: Dict) -> int:
+    return tweet.get('relevance_score', 0)
+
+
+def engagement_key(tweet: Dict) -> int:
+    metrics = tweet.get('metrics', {})
+    return metrics.get('retweet_count', 0) + metrics.get('like_count', 0)
+
+
+class TopK:
+    """
+    Mantiene los `k` elementos de mayor clave vistos hasta ahora en
+    O(n log k) y memoria O(k), sin ordenar ni materializar la entrada.
+
+    A igual clave gana el que apareció antes. El orden de aparición es un
+    contador interno o, si se pasa `index`, un índice global (p. ej. la
+    posición del tweet en el corpus), de modo que dos selecciones parciales
+    se fusionan (`merge`) con el mismo resultado que una sola pasada.
+    """
+
+    def __init__(self, k: int, key: Callable[[Any], Any] = None):
+        self.k = k
+        self.key = key
+        self.heap: List[tuple] = []  # (clave, -índice, elemento); heap[0] es el peor retenido
+        self.seen = 0
+
+    def offer(self, key: Any, make_item: Callable[[], Any], index: int = None) -> bool:
+        """
+        Ofrece un candidato por su clave; `make_item` solo se llama si entra
+        (p. ej. para formatear únicamente los tweets seleccionados).
+        """
+        if index is None:
+            index = self.seen
+        self.seen += 1
+        if self.k <= 0:
+            return False
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, (key, -index, make_item()))
+            return True
+        if (key, -index) > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, (key, -index, make_item()))
+            return True
+        return False
+
+    def push(self, item: Any, key: Any = None, index: int = None) -> bool:
+        return self.offer(self.key(item) if key is None else key, lambda: item, index)
+
+    def extend(self, items: Iterable[Any]) -> 'TopK':
+        for item in items:
+            self.push(item)
+        return self
+
+    @property
+    def threshold(self) -> Optional[Any]:
+        """Clave mínima para entrar (None mientras no esté lleno)"""
+        return self.heap[0][0] if len(self.heap) >= self.k else None
+
+    def items(self) -> List[Any]:
+        """Elementos retenidos, de mayor a menor clave (empates: primero el más antiguo)"""
+        return [item for _, _, item in sorted(self.heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def merge(self, other: 'TopK'):
+        """Agrega los candidatos de otra selección (con índices globales coherentes)"""
+        seen = self.seen + other.seen
+        for key, neg_index, item in other.heap:
+            self.offer(key, lambda item=item: item, -neg_index)
+        self.seen = seen
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def state(self) -> List[list]:
+        return [list(entry) for entry in self.heap]
+
+    def load_state(self, state: List[list]):
+        # El orden de las listas JSON ya cumple el invariante del heap
+        self.heap = [tuple(entry) for entry in state]
+
+
+def top_k(items: Iterable[Any], k: int, key: Callable[[Any], Any]) -> List[Any]:
+    """Los `k` elementos de mayor `key`, en orden descendente (estable ante empates)"""
+    return TopK(k, key).extend(items).items()
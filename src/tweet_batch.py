@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+🕊️ TWEET BATCH - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Representación columnar compacta de colecciones de tweets
+"""
+
+from array import array
+from collections.abc import Mapping
+from itertools import islice
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+from timestamps import to_epoch
+from vectorized import code_counts, present_codes
+
+# Orden canónico de los campos de un tweet procesado
+FIELDS = ('id', 'text', 'author', 'author_id', 'created_at', 'location', 'coordinates',
+          'metrics', 'relevance_score', 'is_critical', 'keywords_detected',
+          'query_source', 'query_sources')
+EXTEND_CHUNK_SIZE = 10_000  # Tweets convertidos por columna de una vez en `from_dicts`
+
+class _Missing:
+    """Marca de campo ausente; pickle la conserva como singleton (shards entre procesos)"""
+
+    def __reduce__(self):
+        return '_MISSING'
+
+    def __repr__(self) -> str:
+        return '<MISSING>'
+
+
+# Marca de campo ausente en las columnas codificadas por diccionario
+_MISSING = _Missing()
+
+
+class DictColumn:
+    """Columna codificada por diccionario: un código entero por fila + tabla de valores únicos"""
+
+    __slots__ = ('values', 'codes', '_index')
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.codes = array('I')
+        self._index: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: Any):
+        self.codes.append(self.encode(value))
+
+    def extend(self, values: List[Any]):
+        """Agrega varias filas con un `encode` por valor distinto, no por fila"""
+        for value in dict.fromkeys(values):
+            self.encode(value)
+        self.codes.extend(map(self._index.__getitem__, values))
+
+    def __getitem__(self, index: int) -> Any:
+        return self.values[self.codes[index]]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def counts(self) -> List[int]:
+        """Número de filas por código"""
+        return code_counts(self.codes, len(self.values))
+
+
+class TweetRow(Mapping):
+    """Vista de solo lectura de una fila: se usa como el dict del tweet (`get`, `[]`, `in`)"""
+
+    __slots__ = ('_batch', '_index')
+
+    def __init__(self, batch: 'TweetBatch', index: int):
+        self._batch = batch
+        self._index = index
+
+    def _keys(self) -> Tuple[str, ...]:
+        return self._batch.shapes[self._index]
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys():
+            raise KeyError(key)
+        return self._batch.value(self._index, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self._keys():
+            return default
+        return self._batch.value(self._index, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def to_dict(self) -> Dict:
+        """Copia como dict con la misma estructura que el JSON de extracción"""
+        return {key: self._batch.value(self._index, key) for key in self._keys()}
+
+
+class TweetBatch:
+    """
+    Colección de tweets almacenada por columnas.
+
+    - Campos numéricos en arrays tipados (`relevance_scores`, `retweet_counts`,
+      `like_counts`, `critical_flags`).
+    - `created_at` también como epoch en segundos (`epochs`, NO_EPOCH si falta
+      o no es válido), parseado una sola vez al construir el batch o leído
+      de la base de datos.
+    - `author`, `author_id`, `location` y `query_source` codificados por
+      diccionario; `keywords_detected` y `query_sources` también, como tuplas.
+    - La forma de cada fila (qué campos tiene y en qué orden) es otra columna
+      codificada, de modo que `TweetRow.to_dict()` reproduce el tweet original.
+
+    Los campos conocidos se normalizan a su tipo de columna; los desconocidos
+    se guardan tal cual en `extras`.
+    """
+
+    def __init__(self):
+        self.ids: List[Any] = []
+        self.texts: List[str] = []
+        self.authors = DictColumn()
+        self.author_ids = DictColumn()
+        self.created_at: List[Any] = []
+        self.epochs = array('q')
+        self.locations = DictColumn()
+        self.coordinates: Dict[int, Any] = {}
+        self.retweet_counts = array('q')
+        self.like_counts = array('q')
+        self.relevance_scores = array('q')
+        self.critical_flags = bytearray()
+        self.keywords = DictColumn()
+        self.query_sources = DictColumn()
+        self.query_source_lists = DictColumn()
+        self.shapes = DictColumn()
+        self.extras: Dict[int, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_dicts(cls, tweets: Iterable[Dict]) -> 'TweetBatch':
+        """Construye un batch consumiendo un iterable de tweets (dicts o filas)"""
+        batch = cls()
+        iterator = iter(tweets)
+        for chunk in iter(lambda: list(islice(iterator, EXTEND_CHUNK_SIZE)), []):
+            batch.extend(chunk)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, tweet: Dict, epoch: Optional[int] = None):
+        """
+        Agrega un tweet con la estructura del JSON de extracción. `epoch` es su
+        `created_at` ya convertido (p. ej. la columna de la base de datos); si
+        no se pasa, se parsea aquí.
+        """
+        index = len(self.ids)
+        metrics = tweet.get('metrics') or {}
+
+        self.ids.append(tweet.get('id'))
+        self.texts.append(tweet.get('text', ''))
+        self.authors.append(tweet.get('author', _MISSING))
+        self.author_ids.append(tweet.get('author_id', _MISSING))
+        self.created_at.append(tweet.get('created_at'))
+        self.epochs.append(to_epoch(tweet.get('created_at')) if epoch is None else epoch)
+        self.locations.append(tweet.get('location', _MISSING))
+        if tweet.get('coordinates') is not None:
+            self.coordinates[index] = tweet['coordinates']
+        self.retweet_counts.append(int(metrics.get('retweet_count', 0) or 0))
+        self.like_counts.append(int(metrics.get('like_count', 0) or 0))
+        self.relevance_scores.append(int(tweet.get('relevance_score', 0) or 0))
+        self.critical_flags.append(1 if tweet.get('is_critical') else 0)
+        self.keywords.append(tuple(tweet.get('keywords_detected') or ()))
+        self.query_sources.append(tweet.get('query_source', _MISSING))
+        self.query_source_lists.append(tuple(tweet.get('query_sources') or ()))
+        self.shapes.append(tuple(tweet.keys()))
+
+        extra = {key: tweet[key] for key in tweet.keys() if key not in FIELDS}
+        if extra:
+            self.extras[index] = extra
+
+    def extend(self, tweets: List[Dict], epochs: Optional[Iterable[int]] = None):
+        """
+        Agrega varios tweets columna por columna; mismo resultado que `append`
+        uno a uno (`epochs` como su `epoch`). Los campos extra se buscan una vez
+        por forma de fila distinta.
+        """
+        start = len(self.ids)
+        metrics = [tweet.get('metrics') or {} for tweet in tweets]
+        created_at = [tweet.get('created_at') for tweet in tweets]
+
+        self.ids.extend([tweet.get('id') for tweet in tweets])
+        self.texts.extend([tweet.get('text', '') for tweet in tweets])
+        self.authors.extend([tweet.get('author', _MISSING) for tweet in tweets])
+        self.author_ids.extend([tweet.get('author_id', _MISSING) for tweet in tweets])
+        self.created_at.extend(created_at)
+        self.epochs.extend(map(to_epoch, created_at) if epochs is None else epochs)
+        self.locations.extend([tweet.get('location', _MISSING) for tweet in tweets])
+        for index, tweet in enumerate(tweets, start):
+            coordinates = tweet.get('coordinates')
+            if coordinates is not None:
+                self.coordinates[index] = coordinates
+        self.retweet_counts.extend([int(values.get('retweet_count', 0) or 0) for values in metrics])
+        self.like_counts.extend([int(values.get('like_count', 0) or 0) for values in metrics])
+        self.relevance_scores.extend([int(tweet.get('relevance_score', 0) or 0) for tweet in tweets])
+        self.critical_flags.extend([1 if tweet.get('is_critical') else 0 for tweet in tweets])
+        self.keywords.extend([tuple(tweet.get('keywords_detected') or ()) for tweet in tweets])
+        self.query_sources.extend([tweet.get('query_source', _MISSING) for tweet in tweets])
+        self.query_source_lists.extend([tuple(tweet.get('query_sources') or ()) for tweet in tweets])
+        self.shapes.extend([tuple(tweet.keys()) for tweet in tweets])
+
+        extra_keys: Dict[int, List[str]] = {}
+        for index, code in enumerate(self.shapes.codes[start:], start):
+            keys = extra_keys.get(code)
+            if keys is None:
+                keys = extra_keys[code] = [key for key in self.shapes.values[code] if key not in FIELDS]
+            if keys:
+                tweet = tweets[index - start]
+                self.extras[index] = {key: tweet[key] for key in keys}
+
+    def value(self, index: int, key: str) -> Any:
+        """Valor del campo `key` en la fila `index` (el campo debe existir en la fila)"""
+        if key == 'id':
+            return self.ids[index]
+        if key == 'text':
+            return self.texts[index]
+        if key == 'author':
+            return self.authors[index]
+        if key == 'author_id':
+            return self.author_ids[index]
+        if key == 'created_at':
+            return self.created_at[index]
+        if key == 'location':
+            return self.locations[index]
+        if key == 'coordinates':
+            return self.coordinates.get(index)
+        if key == 'metrics':
+            return {'retweet_count': self.retweet_counts[index], 'like_count': self.like_counts[index]}
+        if key == 'relevance_score':
+            return self.relevance_scores[index]
+        if key == 'is_critical':
+            return bool(self.critical_flags[index])
+        if key == 'keywords_detected':
+            return list(self.keywords[index])
+        if key == 'query_source':
+            return self.query_sources[index]
+        if key == 'query_sources':
+            return list(self.query_source_lists[index])
+        return self.extras[index][key]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.take(range(*item.indices(len(self))))
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+        return TweetRow(self, item)
+
+    def __iter__(self) -> Iterator[TweetRow]:
+        for index in range(len(self)):
+            yield TweetRow(self, index)
+
+    def take(self, indices: Iterable[int]) -> 'TweetBatch':
+        """Nuevo batch con las filas indicadas, en ese orden"""
+        batch = TweetBatch()
+        for index in indices:
+            batch.append(TweetRow(self, index), self.epochs[index])
+        return batch
+
+    def to_dicts(self) -> List[Dict]:
+        """Lista de dicts (para serializar a JSON)"""
+        return [row.to_dict() for row in self]
+
+    # ------------------------------------------------------------------
+    # Acceso columnar para agregaciones
+    # ------------------------------------------------------------------
+    def author_keys(self) -> Tuple[List[Any], array]:
+        """
+        Autor de cada fila con la semántica `author` → `author_id` → 'unknown',
+        codificado por diccionario: (valores únicos, códigos por fila).
+        """
+        resolved = DictColumn()
+        pair_codes: Dict[Tuple[int, int], int] = {}
+        for author_code, author_id_code in zip(self.authors.codes, self.author_ids.codes):
+            code = pair_codes.get((author_code, author_id_code))
+            if code is None:
+                author = self._resolve_author(author_code, author_id_code)
+                code = pair_codes[(author_code, author_id_code)] = resolved.encode(author)
+            resolved.codes.append(code)
+        return resolved.values, resolved.codes
+
+    def distinct_authors(self) -> set:
+        """Autores distintos con la semántica de `author_keys`, sin recorrer fila por fila"""
+        authors = {self.authors.values[code] for code in present_codes(self.authors.codes, len(self.authors.values))}
+        if _MISSING in authors:
+            # Filas sin `author`: cuenta su `author_id` (o 'unknown')
+            authors.discard(_MISSING)
+            missing_code = self.authors.encode(_MISSING)
+            for code in present_codes(self.author_ids.codes, len(self.author_ids.values),
+                                      (self.authors.codes, missing_code)):
+                author_id = self.author_ids.values[code]
+                authors.add('unknown' if author_id is _MISSING else author_id)
+        return authors
+
+    def _resolve_author(self, author_code: int, author_id_code: int) -> Any:
+        author = self.authors.values[author_code]
+        if author is _MISSING:
+            author = self.author_ids.values[author_id_code]
+            if author is _MISSING:
+                author = 'unknown'
+        return author
+
+    def location_values(self) -> List[Any]:
+        """Valores únicos de `location` (None si el campo no existe)"""
+        return [None if value is _MISSING else value for value in self.locations.values]
+
+
+def as_batch(tweets: Iterable[Dict]) -> TweetBatch:
+    """Devuelve `tweets` como TweetBatch, convirtiéndolos solo si hace falta"""
+    if isinstance(tweets, TweetBatch):
+        return tweets
+    return TweetBatch.from_dicts(tweets)
+
+
+def to_dicts(tweets: Iterable[Dict]) -> List[Dict]:
+    """Tweets (lista de dicts, filas o TweetBatch) como lista de dicts serializable"""
+    return [tweet.to_dict() if isinstance(tweet, TweetRow) else tweet for tweet in tweets]
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+🕊️ TWEET I/O - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Escritura en streaming (NDJSON / JSON, opcionalmente comprimidos) y lectura de archivos de extracción
+"""
+
+import gzip
+import io
+import json
+import os
+import re
+from typing import Dict, Any, Iterator, Tuple, TextIO
+
+try:
+    import zstandard
+except ImportError:  # zstd es opcional: sin el paquete se usa gzip
+    zstandard = None
+
+# Registro final con el metadata de la extracción
+METADATA_RECORD = 'metadata'
+
+# Compresión de archivos de salida: sufijo de cada formato
+COMPRESSION_SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def resolve_compression(compression: str) -> str:
+    """Formato de compresión efectivo ('zstd' cae a 'gzip' si zstandard no está instalado)"""
+    compression = compression or 'none'
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Compresión desconocida: {compression}")
+    if compression == 'zstd' and zstandard is None:
+        print("⚠️ Paquete 'zstandard' no instalado, usando gzip")
+        return 'gzip'
+    return compression
+
+
+def strip_compression_suffix(path: str) -> str:
+    """Nombre del archivo sin el sufijo de compresión (.gz / .zst)"""
+    for suffix in ('.gz', '.zst'):
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def is_ndjson(path: str) -> bool:
+    """Indica si el archivo (comprimido o no) es NDJSON"""
+    return strip_compression_suffix(path).endswith('.ndjson')
+
+
+def detect_compression(path: str) -> str:
+    """Detecta la compresión de un archivo por sus bytes mágicos"""
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if magic == ZSTD_MAGIC:
+        return 'zstd'
+    return 'none'
+
+
+def open_text_writer(path: str, compression: str = 'none') -> TextIO:
+    """Abre `path` para escribir texto UTF-8 con la compresión indicada"""
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    if compression == 'zstd':
+        writer = zstandard.ZstdCompressor(level=3).stream_writer(open(path, 'wb'), closefd=True)
+        return io.TextIOWrapper(writer, encoding='utf-8')
+    return open(path, 'w', encoding='utf-8')
+
+
+def open_text_reader(path: str) -> TextIO:
+    """Abre `path` para leer texto, descomprimiendo en streaming si hace falta"""
+    compression = detect_compression(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError(f"{path} está comprimido con zstd: instale el paquete 'zstandard'")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(io.BufferedReader(reader), encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def write_json_document(f: TextIO, metadata: Dict, tweets: Iterator[Dict]) -> int:
+    """
+    Escribe {"metadata": ..., "tweets": [...]} tweet a tweet (una línea por tweet,
+    sin indentación) y devuelve el número de tweets escritos.
+    """
+    f.write('{"metadata": ')
+    f.write(json.dumps(metadata, ensure_ascii=False))
+    f.write(',\n"tweets": [')
+    count = 0
+    for tweet in tweets:
+        f.write(',\n' if count else '\n')
+        f.write(json.dumps(tweet, ensure_ascii=False))
+        count += 1
+    f.write('\n]}\n')
+    return count
+
+
+# Espacios en blanco JSON entre tokens
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+_DELIMITERS = ' \t\n\r,:]}'
+
+
+class JSONStreamScanner:
+    """
+    Lector incremental de un documento JSON: mantiene solo un búfer de texto
+    y decodifica un valor completo cada vez con `raw_decode` (en C).
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = 1 << 20):
+        self._file = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _read_more(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Siguiente carácter significativo sin consumirlo ('' al final del archivo)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                return ''
+
+    def expect(self, char: str):
+        """Consume `char` o falla si el documento no sigue esa estructura"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON inválido: se esperaba {char!r} y se encontró {found or 'fin de archivo'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decodifica el siguiente valor JSON completo"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+                # Un número cortado por el búfer ("3" de "3.5") parece completo:
+                # solo se acepta si le sigue un delimitador
+                if self.eof or (end < len(self.buffer) and self.buffer[end] in _DELIMITERS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read_more()
+
+
+def iter_json_document(path: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Recorre un documento {"metadata": ..., "tweets": [...]} (comprimido o no)
+    sin cargarlo entero: produce (clave, valor) por cada campo de primer nivel
+    y ('tweets', tweet) por cada elemento del array de tweets.
+    """
+    with open_text_reader(path) as f:
+        scanner = JSONStreamScanner(f)
+        scanner.expect('{')
+        if scanner.peek() == '}':
+            return
+        while True:
+            key = scanner.value()
+            scanner.expect(':')
+            if key == 'tweets' and scanner.peek() == '[':
+                scanner.expect('[')
+                if scanner.peek() == ']':
+                    scanner.expect(']')
+                else:
+                    while True:
+                        yield key, scanner.value()
+                        if scanner.peek() == ']':
+                            scanner.expect(']')
+                            break
+                        scanner.expect(',')
+            else:
+                yield key, scanner.value()
+            if scanner.peek() == '}':
+                return
+            scanner.expect(',')
+
+
+def iter_json_tweets(path: str) -> Iterator[Dict]:
+    """Produce los tweets de un archivo JSON clásico uno a uno"""
+    for key, value in iter_json_document(path):
+        if key == 'tweets':
+            yield value
+
+
+def read_json_metadata(path: str) -> Dict:
+    """
+    Metadata de un archivo JSON clásico. Se detiene al encontrarlo: si va
+    antes de los tweets (como lo escribe `write_json_document`) no los lee.
+    """
+    for key, value in iter_json_document(path):
+        if key == METADATA_RECORD:
+            return value
+    return {}
+
+
+class NDJSONTweetWriter:
+    """
+    Escribe cada tweet como una línea JSON mientras la extracción avanza.
+
+    La memoria se mantiene constante sin importar el volumen. El metadata se
+    agrega al final como registro `{"_record": "metadata", ...}`; si el proceso
+    se interrumpe, todas las líneas completas siguen siendo legibles.
+    """
+
+    def __init__(self, filename: str, flush_every: int = 1000, compression: str = 'none'):
+        self.filename = filename
+        self.flush_every = flush_every
+        self.tweets_written = 0
+        self._file = open_text_writer(filename, compression)
+
+    def write(self, tweet: Dict):
+        """Agrega un tweet al archivo"""
+        self._file.write(json.dumps(tweet, ensure_ascii=False))
+        self._file.write('\n')
+        self.tweets_written += 1
+        if self.tweets_written % self.flush_every == 0:
+            self._file.flush()
+
+    def flush(self):
+        """Vuelca a disco lo escrito hasta ahora"""
+        self._file.flush()
+        try:
+            os.fsync(self._file.fileno())
+        except (OSError, AttributeError, io.UnsupportedOperation):
+            pass  # Flujo comprimido sin descriptor propio
+
+    def close(self, metadata: Dict = None):
+        """Escribe el registro de metadata (si existe) y cierra el archivo"""
+        if self._file.closed:
+            return
+        if metadata is not None:
+            self._file.write(json.dumps({'_record': METADATA_RECORD, 'metadata': metadata}, ensure_ascii=False))
+            self._file.write('\n')
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def iter_ndjson_records(path: str) -> Iterator[Dict]:
+    """
+    Recorre un archivo NDJSON (comprimido o no) línea a línea. Una última
+    línea incompleta (extracción interrumpida) se ignora.
+    """
+    with open_text_reader(path) as f:
+        try:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+        except EOFError:
+            return  # Flujo comprimido truncado
+
+
+def iter_ndjson_tweets(path: str) -> Iterator[Dict]:
+    """Produce solo los tweets de un archivo NDJSON"""
+    for record in iter_ndjson_records(path):
+        if '_record' not in record:
+            yield record
+
+
+class NDJSONTweetReader:
+    """
+    Recorre los tweets de un archivo NDJSON y, en la misma pasada, recoge el
+    registro de metadata del final: un archivo comprimido se descomprime una
+    sola vez en lugar de recorrerlo antes solo para llegar al metadata.
+
+    `metadata` es siempre el mismo dict; queda vacío hasta que el recorrido
+    alcanza el registro final (o si la extracción no llegó a cerrarse).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.metadata: Dict = {}
+
+    def __iter__(self) -> Iterator[Dict]:
+        self.metadata.clear()
+        for record in iter_ndjson_records(self.path):
+            if '_record' not in record:
+                yield record
+            elif record['_record'] == METADATA_RECORD:
+                self.metadata.clear()
+                self.metadata.update(record.get('metadata', {}))
+
+
+def read_ndjson_metadata(path: str) -> Dict:
+    """
+    Lee el registro de metadata del final del archivo sin recorrerlo entero
+    (los archivos comprimidos sí se recorren: para leer también los tweets
+    use `NDJSONTweetReader`). Devuelve {} si la extracción no llegó a cerrarse.
+    """
+    if detect_compression(path) != 'none':
+        reader = NDJSONTweetReader(path)
+        for _ in reader:
+            pass
+        return reader.metadata
+
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        block = b''
+        # Retroceder por bloques hasta tener la última línea completa
+        while position > 0 and block.count(b'\n') < 2:
+            step = min(65536, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step) + block
+
+    for line in reversed(block.splitlines()):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return {}
+        if record.get('_record') == METADATA_RECORD:
+            return record.get('metadata', {})
+        return {}
+    return {}
+
+
+def load_ndjson(path: str) -> Dict[str, Any]:
+    """Carga un archivo NDJSON con la misma estructura que el JSON clásico"""
+    reader = NDJSONTweetReader(path)
+    tweets = list(reader)
+    return {'metadata': reader.metadata, 'tweets': tweets}
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+🕊️ TWEET SIMULATOR - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Generación de tweets simulados por bloques, en paralelo y con semillas deterministas
+"""
+
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Iterator, Optional, Tuple
+
+from keyword_automaton import KeywordAutomaton
+
+# Templates específicos para crímenes de guerra
+TEMPLATES = [
+    # Gaza
+    "BREAKING: Israeli forces bomb {location} in Gaza. {casualties} civilians killed including {children} children.",
+    "Gaza UPDATE: {facility} destroyed by Israeli airstrike. Medical staff treating wounded in corridors.",
+    "URGENT: Residential building in {gaza_area} hit by Israeli missile. Search for survivors ongoing.",
+    "Gaza medics report {number} killed, {wounded} wounded in latest Israeli bombardment of {area}.",
+
+    # West Bank
+    "West Bank: Israeli settlers attack Palestinian village {village}. Homes set on fire.",
+    "IDF raids {wb_city}, arrests {arrests} Palestinians including {minors} minors during night operation.",
+    "BREAKING: Israeli bulldozers demolish Palestinian home in {location} despite court order.",
+    "Checkpoint violence: Israeli soldiers shoot Palestinian youth at {checkpoint}.",
+
+    # Crímenes específicos
+    "War crime alert: Israel targets {civilian_target} in violation of international law.",
+    "Human Rights Watch documents systematic home demolitions in {area}.",
+    "B'Tselem: Israeli forces use excessive force against {target} protesters.",
+    "Amnesty International calls for investigation into Israeli {crime_type}.",
+
+    # Situación humanitaria
+    "Gaza hospitals overwhelmed. Only {hours} hours of electricity per day. Fuel running out.",
+    "OCHA: {percentage}% of Gaza water unfit for human consumption due to Israeli siege.",
+    "Palestinian families in {area} without clean water for {days} days after Israeli operation.",
+    "Medical supplies blocked at Israeli checkpoints while patients die in Gaza hospitals."
+]
+
+LOCATIONS = [
+    "Gaza City", "Khan Younis", "Rafah", "Jabalia", "Beit Hanoun",
+    "Ramallah", "Jenin", "Nablus", "Hebron", "Bethlehem",
+    "Sheikh Jarrah", "Silwan", "East Jerusalem"
+]
+
+GAZA_AREAS = ["Shati", "Jabalia", "Gaza City", "Khan Younis", "Rafah"]
+WB_CITIES = ["Jenin", "Nablus", "Ramallah", "Hebron", "Tulkarem"]
+VILLAGES = ["Beita", "Kafr Qaddum", "Bil'in", "Ni'lin", "Al-Walaja"]
+FACILITIES = ["Al-Shifa Hospital", "Indonesian Hospital", "Gaza clinic", "school", "mosque"]
+CIVILIAN_TARGETS = ["hospital", "school", "residential building", "mosque"]
+CRIME_TYPES = ["home demolitions", "settlement expansion", "collective punishment"]
+
+# Automata por proceso: se compila una vez por lista de keywords
+_automata: Dict[Tuple[str, ...], KeywordAutomaton] = {}
+
+
+def _automaton_for(keywords: Tuple[str, ...]) -> KeywordAutomaton:
+    automaton = _automata.get(keywords)
+    if automaton is None:
+        automaton = _automata[keywords] = KeywordAutomaton(list(keywords))
+    return automaton
+
+
+def shard_seed(seed: int, shard: int) -> str:
+    """Semilla de un bloque: depende solo de la semilla global y del índice del bloque"""
+    return f"{seed}:{shard}"
+
+
+def render_text(k: int) -> str:
+    """Texto del tweet simulado de clave `k` (template y variables derivados de `k`)"""
+    return TEMPLATES[k % len(TEMPLATES)].format(
+        location=LOCATIONS[k % len(LOCATIONS)],
+        casualties=str((k % 15) + 1),
+        children=str((k % 8) + 1),
+        facility=FACILITIES[k % len(FACILITIES)],
+        gaza_area=GAZA_AREAS[k % len(GAZA_AREAS)],
+        number=str((k % 25) + 1),
+        wounded=str((k % 50) + 5),
+        area=LOCATIONS[k % len(LOCATIONS)],
+        village=VILLAGES[k % len(VILLAGES)],
+        wb_city=WB_CITIES[k % len(WB_CITIES)],
+        arrests=str((k % 20) + 1),
+        minors=str((k % 5) + 1),
+        checkpoint=f"Checkpoint {(k % 10) + 1}",
+        civilian_target=CIVILIAN_TARGETS[k % 4],
+        crime_type=CRIME_TYPES[k % 3],
+        target="peaceful" if k % 2 == 0 else "unarmed",
+        hours=str((k % 8) + 4),
+        percentage=str((k % 30) + 70),
+        days=str((k % 10) + 1)
+    )
+
+
+def generate_chunk(start: int, count: int, queries: Tuple[str, ...], keywords: Tuple[str, ...],
+                   base_time: datetime, seed: Optional[int] = None, shard: int = 0) -> List[Dict]:
+    """
+    Genera los tweets simulados `start` .. `start + count - 1`.
+
+    Sin `seed` cada variable del template se deriva del índice del tweet (la
+    simulación clásica). Con `seed` se derivan de un generador propio del
+    bloque, de modo que el resultado no depende del número de procesos.
+    """
+    automaton = _automaton_for(keywords)
+    rng = random.Random(shard_seed(seed, shard)) if seed is not None else None
+    tweets = []
+
+    for i in range(start, start + count):
+        k = rng.randrange(1 << 30) if rng is not None else i
+        tweet_text = render_text(k)
+
+        # Detectar keywords críticos
+        keywords_found = automaton.detect(tweet_text)
+
+        tweets.append({
+            'id': f'SIM_GAMMA_{i:05d}',
+            'text': tweet_text,
+            'author': f'user_{k % 2000}',  # 2000 usuarios únicos
+            'author_id': f'id_{k % 2000}',
+            'created_at': (base_time - timedelta(hours=k % 72)).isoformat(),
+            'location': LOCATIONS[k % len(LOCATIONS)],
+            'coordinates': None,
+            'metrics': {
+                'retweet_count': k % 100,
+                'like_count': k % 500
+            },
+            'relevance_score': (k % 40) + 60,  # 60-100 relevancia
+            'is_critical': len(keywords_found) > 0,
+            'keywords_detected': keywords_found[:3],  # Máximo 3 keywords
+            'query_source': queries[k % len(queries)]
+        })
+
+    return tweets
+
+
+def iter_simulated_chunks(total: int, queries: List[str], keywords: List[str], chunk_size: int = 10000,
+                          workers: int = 1, seed: Optional[int] = None) -> Iterator[List[Dict]]:
+    """
+    Produce los tweets simulados en bloques de `chunk_size`, en orden.
+
+    Con `workers` > 1 los bloques se generan en un pool de procesos; como
+    máximo hay `2 * workers` bloques en vuelo, así que la memoria depende del
+    tamaño de bloque y no del total.
+    """
+    base_time = datetime.now()
+    queries, keywords = tuple(queries), tuple(keywords)
+    chunk_args = (
+        (start, min(chunk_size, total - start), queries, keywords, base_time, seed, shard)
+        for shard, start in enumerate(range(0, total, chunk_size))
+    )
+
+    if workers <= 1:
+        for args in chunk_args:
+            yield generate_chunk(*args)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    in_flight = deque()
+    try:
+        for args in chunk_args:
+            in_flight.append(executor.submit(generate_chunk, *args))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+    finally:
+        # Si el consumidor se detiene antes de tiempo, no seguir generando
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=True)
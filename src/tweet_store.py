@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+🕊️ TWEET STORE - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Almacenamiento persistente de tweets en SQLite (WAL, inserciones por lotes e índices)
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from timestamps import NO_EPOCH, epoch_seconds
+from tweet_batch import TweetBatch
+
+DATABASE_PATH = "data/centinela_gamma.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    author TEXT,
+    author_id TEXT,
+    created_at TEXT,
+    location TEXT,
+    coordinates TEXT,
+    retweet_count INTEGER NOT NULL DEFAULT 0,
+    like_count INTEGER NOT NULL DEFAULT 0,
+    relevance_score INTEGER NOT NULL DEFAULT 0,
+    is_critical INTEGER NOT NULL DEFAULT 0,
+    keywords_detected TEXT,
+    query_source TEXT,
+    ingested_at TEXT NOT NULL,
+    created_epoch INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tweets_created_at ON tweets(created_at);
+CREATE INDEX IF NOT EXISTS idx_tweets_author_id ON tweets(author_id);
+CREATE INDEX IF NOT EXISTS idx_tweets_query_source ON tweets(query_source);
+CREATE INDEX IF NOT EXISTS idx_tweets_is_critical ON tweets(is_critical, relevance_score);
+
+-- Todas las queries que devolvieron cada tweet (sin duplicar filas en tweets)
+CREATE TABLE IF NOT EXISTS tweet_queries (
+    tweet_id TEXT NOT NULL,
+    query TEXT NOT NULL,
+    PRIMARY KEY (tweet_id, query)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO tweets (id, text, author, author_id, created_at, location, coordinates,
+                    retweet_count, like_count, relevance_score, is_critical,
+                    keywords_detected, query_source, ingested_at, created_epoch)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    retweet_count = excluded.retweet_count,
+    like_count = excluded.like_count
+"""
+
+QUERY_MATCH_SQL = "INSERT OR IGNORE INTO tweet_queries (tweet_id, query) VALUES (?, ?)"
+
+COLUMNS = ('id', 'text', 'author', 'author_id', 'created_at', 'location', 'coordinates',
+           'retweet_count', 'like_count', 'relevance_score', 'is_critical',
+           'keywords_detected', 'query_source')
+
+# Tweets por bloque al leer la base de datos como TweetBatch
+DEFAULT_BATCH_ROWS = 10000
+
+
+class TweetStore:
+    """
+    Capa de almacenamiento de tweets.
+
+    Los tweets se acumulan en memoria y se insertan con `executemany` en lotes
+    de `batch_size`. La clave primaria es el id del tweet: volver a insertar un
+    tweet existente solo actualiza sus métricas de engagement. `created_at` se
+    parsea una única vez al insertar y se guarda como epoch en `created_epoch`.
+    """
+
+    def __init__(self, path: str = DATABASE_PATH, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: List[tuple] = []
+        self._pending_matches: List[tuple] = []
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Actualiza bases de datos creadas con un esquema anterior"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tweets)")}
+        if 'created_epoch' not in columns:
+            print(f"🔧 Migrando {self.path}: agregando created_epoch (timestamps parseados)")
+            self.conn.create_function('epoch_seconds', 1, epoch_seconds, deterministic=True)
+            with self.conn:
+                self.conn.execute("ALTER TABLE tweets ADD COLUMN created_epoch INTEGER")
+                self.conn.execute("UPDATE tweets SET created_epoch = epoch_seconds(created_at) "
+                                  "WHERE created_at IS NOT NULL")
+
+    @staticmethod
+    def exists(path: str = DATABASE_PATH) -> bool:
+        """Indica si ya hay una base de datos creada en `path`"""
+        return os.path.exists(path)
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def _to_row(self, tweet: Dict, ingested_at: str) -> tuple:
+        metrics = tweet.get('metrics') or {}
+        coordinates = tweet.get('coordinates')
+        created_at = tweet.get('created_at')
+        return (
+            str(tweet.get('id')),
+            tweet.get('text', ''),
+            tweet.get('author'),
+            None if tweet.get('author_id') is None else str(tweet.get('author_id')),
+            created_at,
+            tweet.get('location'),
+            json.dumps(coordinates) if coordinates is not None else None,
+            metrics.get('retweet_count', 0),
+            metrics.get('like_count', 0),
+            tweet.get('relevance_score', 0),
+            1 if tweet.get('is_critical') else 0,
+            json.dumps(tweet.get('keywords_detected', []), ensure_ascii=False),
+            tweet.get('query_source'),
+            ingested_at,
+            epoch_seconds(created_at) if created_at else None
+        )
+
+    def add(self, tweet: Dict):
+        """Encola un tweet; se inserta al completar el lote"""
+        self._pending.append(self._to_row(tweet, datetime.now().isoformat()))
+        for query in tweet.get('query_sources') or [tweet.get('query_source')]:
+            if query is not None:
+                self._pending_matches.append((str(tweet.get('id')), query))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def add_query_match(self, tweet_id: Any, query: str):
+        """Registra que `query` también devolvió un tweet ya almacenado"""
+        self._pending_matches.append((str(tweet_id), query))
+        if len(self._pending_matches) >= self.batch_size:
+            self.flush()
+
+    def insert_many(self, tweets: List[Dict]) -> int:
+        """Inserta una colección de tweets en una sola transacción"""
+        ingested_at = datetime.now().isoformat()
+        rows = [self._to_row(tweet, ingested_at) for tweet in tweets]
+        matches = [(row[0], query) for row, tweet in zip(rows, tweets)
+                   for query in tweet.get('query_sources') or [tweet.get('query_source')] if query is not None]
+        with self.conn:
+            self.conn.executemany(UPSERT_SQL, rows)
+            self.conn.executemany(QUERY_MATCH_SQL, matches)
+        return len(rows)
+
+    def flush(self):
+        """Inserta los tweets y coincidencias de queries pendientes"""
+        if not self._pending and not self._pending_matches:
+            return
+        with self.conn:
+            self.conn.executemany(UPSERT_SQL, self._pending)
+            self.conn.executemany(QUERY_MATCH_SQL, self._pending_matches)
+        self._pending = []
+        self._pending_matches = []
+
+    def record_run(self, metadata: Dict) -> int:
+        """Guarda el metadata de una extracción"""
+        self.flush()
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (timestamp, metadata) VALUES (?, ?)",
+                (datetime.now().isoformat(), json.dumps(metadata, ensure_ascii=False))
+            )
+        return cursor.lastrowid
+
+    def close(self):
+        """Vuelca lo pendiente y cierra la conexión"""
+        self.flush()
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _to_tweet(row: tuple) -> Dict:
+        """Reconstruye el tweet con la misma estructura que el JSON de extracción"""
+        (tweet_id, text, author, author_id, created_at, location, coordinates,
+         retweet_count, like_count, relevance_score, is_critical, keywords, query_source) = row[:len(COLUMNS)]
+        tweet = {'id': tweet_id, 'text': text}
+        if author is not None:
+            tweet['author'] = author
+        tweet['author_id'] = author_id
+        tweet['created_at'] = created_at
+        if location is not None:
+            tweet['location'] = location
+            tweet['coordinates'] = json.loads(coordinates) if coordinates else None
+        tweet['metrics'] = {'retweet_count': retweet_count, 'like_count': like_count}
+        tweet['relevance_score'] = relevance_score
+        tweet['is_critical'] = bool(is_critical)
+        tweet['keywords_detected'] = json.loads(keywords) if keywords else []
+        tweet['query_source'] = query_source
+        return tweet
+
+    def _select_rows(self, where: str = "", params: tuple = (), order: str = "rowid",
+                     limit: Optional[int] = None) -> Iterator[tuple]:
+        """Filas con las columnas de COLUMNS + created_epoch"""
+        sql = f"SELECT {', '.join(COLUMNS)}, created_epoch FROM tweets"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self.conn.execute(sql, params)
+
+    def _select(self, where: str = "", params: tuple = (), order: str = "rowid", limit: Optional[int] = None) -> Iterator[Dict]:
+        for row in self._select_rows(where, params, order, limit):
+            yield self._to_tweet(row)
+
+    @staticmethod
+    def _range_filter(after_rowid: int = 0, until_rowid: Optional[int] = None) -> Tuple[str, tuple]:
+        """Condición SQL del rango (after, until] de rowid"""
+        if not after_rowid and until_rowid is None:
+            return "", ()
+        if until_rowid is None:
+            return "rowid > ?", (after_rowid,)
+        return "rowid > ? AND rowid <= ?", (after_rowid, until_rowid)
+
+    def iter_tweets(self, after_rowid: int = 0, until_rowid: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Recorre los tweets en orden de inserción. Con `after_rowid` /
+        `until_rowid` solo los del rango (after, until] de rowid, que es
+        creciente con cada tweet nuevo (marca de agua del procesamiento incremental).
+        """
+        self.flush()
+        return self._select(*self._range_filter(after_rowid, until_rowid))
+
+    def iter_batches(self, after_rowid: int = 0, until_rowid: Optional[int] = None,
+                     batch_rows: Optional[int] = DEFAULT_BATCH_ROWS) -> Iterator[TweetBatch]:
+        """
+        Como `iter_tweets`, pero en bloques columnares de `batch_rows` tweets
+        (None: un único bloque) con la columna de epochs leída de created_epoch,
+        sin volver a parsear fechas.
+        """
+        self.flush()
+        rows = self._select_rows(*self._range_filter(after_rowid, until_rowid))
+        while True:
+            chunk = list(islice(rows, batch_rows))
+            if not chunk:
+                return
+            batch = TweetBatch()
+            batch.extend([self._to_tweet(row) for row in chunk],
+                         [NO_EPOCH if row[-1] is None else row[-1] for row in chunk])
+            yield batch
+            if batch_rows is None:
+                return
+
+    def max_rowid(self) -> int:
+        """rowid del último tweet insertado (0 si no hay tweets)"""
+        self.flush()
+        return self.conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM tweets").fetchone()[0]
+
+    def count(self) -> int:
+        """Total de tweets almacenados"""
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM tweets").fetchone()[0]
+
+    def critical_tweets(self, min_relevance: int = 80, limit: int = 20) -> List[Dict]:
+        """Tweets críticos con relevancia > `min_relevance` (usa idx_tweets_is_critical)"""
+        self.flush()
+        return list(self._select("is_critical = 1 AND relevance_score > ?", (min_relevance,),
+                                 order="relevance_score DESC", limit=limit))
+
+    def iter_critical_tweets(self, min_relevance: int = 80) -> Iterator[Dict]:
+        """Todos los tweets críticos con relevancia > `min_relevance`, en orden de inserción"""
+        self.flush()
+        return self._select("is_critical = 1 AND relevance_score > ?", (min_relevance,))
+
+    def sample_tweets(self, critical: int = 80, high_relevance: int = 15, regular: int = 5) -> Dict[str, List[Dict]]:
+        """Muestra priorizada (críticos, alta relevancia, regulares) mediante consultas indexadas"""
+        self.flush()
+        return {
+            'critical': list(self._select("is_critical = 1", order="relevance_score DESC", limit=critical)),
+            'high_relevance': list(self._select("is_critical = 0 AND relevance_score > 80",
+                                                order="relevance_score DESC", limit=high_relevance)),
+            'regular': list(self._select("is_critical = 0 AND relevance_score <= 80",
+                                         order="relevance_score DESC", limit=regular))
+        }
+
+    def queries_for(self, tweet_id: Any) -> List[str]:
+        """Queries que devolvieron el tweet `tweet_id`"""
+        self.flush()
+        rows = self.conn.execute("SELECT query FROM tweet_queries WHERE tweet_id = ?", (str(tweet_id),))
+        return [row[0] for row in rows]
+
+    def latest_run_metadata(self) -> Dict:
+        """Metadata de la extracción más reciente ({} si no hay ninguna)"""
+        row = self.conn.execute("SELECT metadata FROM runs ORDER BY run_id DESC LIMIT 1").fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def load_all(self) -> Dict[str, Any]:
+        """Carga metadata + tweets con la estructura del JSON de extracción"""
+        return {
+            'metadata': self.latest_run_metadata(),
+            'tweets': list(self.iter_tweets())
+        }
+
+
+class TweetRange:
+    """
+    Tweets con rowid en (after_rowid, until_rowid], como iterable que abre su
+    propia conexión. Se puede partir en sub-rangos de igual número de filas
+    (`split`) para que cada proceso lea su parte directamente de la base de datos.
+    """
+
+    def __init__(self, path: str, after_rowid: int = 0, until_rowid: Optional[int] = None):
+        self.path = path
+        self.after_rowid = after_rowid
+        self.until_rowid = until_rowid
+
+    def __iter__(self) -> Iterator[Dict]:
+        store = TweetStore(self.path)
+        try:
+            yield from store.iter_tweets(self.after_rowid, self.until_rowid)
+        finally:
+            store.close()
+
+    def iter_batches(self, batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[TweetBatch]:
+        """El rango en bloques columnares (ver TweetStore.iter_batches)"""
+        store = TweetStore(self.path)
+        try:
+            yield from store.iter_batches(self.after_rowid, self.until_rowid, batch_rows)
+        finally:
+            store.close()
+
+    def split(self, rows_per_range: int) -> List['TweetRange']:
+        """Sub-rangos consecutivos de `rows_per_range` filas (el último, el resto)"""
+        store = TweetStore(self.path)
+        try:
+            until_sql, until_params = ("", ()) if self.until_rowid is None else (" AND rowid <= ?", (self.until_rowid,))
+            ranges = []
+            start = self.after_rowid
+            while True:
+                # rowid de la última fila del sub-rango (o None si quedan menos filas)
+                row = store.conn.execute(
+                    f"SELECT rowid FROM tweets WHERE rowid > ?{until_sql} ORDER BY rowid LIMIT 1 OFFSET ?",
+                    (start,) + until_params + (rows_per_range - 1,)
+                ).fetchone()
+                if row is None:
+                    break
+                ranges.append(TweetRange(self.path, start, row[0]))
+                start = row[0]
+            if store.conn.execute(f"SELECT 1 FROM tweets WHERE rowid > ?{until_sql} LIMIT 1",
+                                  (start,) + until_params).fetchone():
+                ranges.append(TweetRange(self.path, start, self.until_rowid))
+            return ranges
+        finally:
+            store.close()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+🕊️ VECTORIZED - DOOM SYSTEM v1.0
+Arquitecto: VIGIL | Soberano: DOOM
+Reducciones columnares con NumPy (opcional) y equivalente en Python puro
+"""
+
+from array import array
+from typing import Dict, List, Any, Iterable, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin el paquete se usan los bucles en Python
+    np = None
+
+# Tipo de NumPy de cada columna tipada de TweetBatch (vistas sin copia del buffer)
+_DTYPES = {'q': 'int64', 'I': 'uint32'}
+
+
+def as_numpy(column):
+    """Vista NumPy de un array('q'/'I') o bytearray (uint8), sin copiar los datos"""
+    if isinstance(column, array):
+        return np.frombuffer(column, dtype=_DTYPES[column.typecode])
+    return np.frombuffer(column, dtype=np.uint8)
+
+
+def column_sum(column: Sequence[int]) -> int:
+    """Suma de una columna numérica"""
+    if np is not None:
+        return int(as_numpy(column).sum())
+    return sum(column)
+
+
+def count_above(column: Sequence[int], threshold: int) -> int:
+    """Filas con valor > `threshold`"""
+    if np is not None:
+        return int(np.count_nonzero(as_numpy(column) > threshold))
+    return sum(1 for value in column if value > threshold)
+
+
+def code_counts(codes: Sequence[int], size: int) -> List[int]:
+    """Filas por código de una columna codificada por diccionario (`bincount`)"""
+    if np is not None:
+        return np.bincount(as_numpy(codes), minlength=size).tolist()
+    counts = [0] * size
+    for code in codes:
+        counts[code] += 1
+    return counts
+
+
+def last_rows(codes: Sequence[int], size: int) -> List[int]:
+    """Última fila en que aparece cada código (-1 si no aparece)"""
+    if np is not None:
+        rows = np.full(size, -1, dtype=np.int64)
+        np.maximum.at(rows, as_numpy(codes), np.arange(len(codes), dtype=np.int64))
+        return rows.tolist()
+    rows = [-1] * size
+    for row, code in enumerate(codes):
+        rows[code] = row
+    return rows
+
+
+def code_sums(codes: Sequence[int], values: Sequence[int], size: int) -> List[int]:
+    """Suma de una columna numérica por código de una columna codificada"""
+    if np is not None:
+        sums = np.zeros(size, dtype=np.int64)
+        np.add.at(sums, as_numpy(codes), as_numpy(values))
+        return sums.tolist()
+    sums = [0] * size
+    for code, value in zip(codes, values):
+        sums[code] += value
+    return sums
+
+
+def masked_total(counts: Sequence[int], mask: Sequence[bool]) -> int:
+    """Suma de `counts` donde `mask` es verdadero (conteos por valor distinto)"""
+    if np is not None:
+        return int(np.asarray(counts, dtype=np.int64)[np.asarray(mask, dtype=bool)].sum())
+    return sum(count for count, flag in zip(counts, mask) if flag)
+
+
+def present_codes(codes: array, size: int, rows_with: Tuple[array, int] = None) -> List[int]:
+    """
+    Códigos presentes en una columna codificada. Con `rows_with=(otra, código)`
+    solo cuentan las filas en que la otra columna tiene ese código.
+    """
+    if np is not None:
+        values = as_numpy(codes)
+        if rows_with is not None:
+            values = values[as_numpy(rows_with[0]) == rows_with[1]]
+        return np.flatnonzero(np.bincount(values, minlength=size)).tolist()
+    if rows_with is None:
+        return sorted(set(codes))
+    other, wanted = rows_with
+    return sorted({code for code, other_code in zip(codes, other) if other_code == wanted})
+
+
+def encode(values: Iterable[Any]) -> Tuple[List[Any], array]:
+    """Codificación por diccionario: (valores únicos en orden de aparición, código por fila)"""
+    values = values if isinstance(values, (list, tuple)) else list(values)
+    uniques = list(dict.fromkeys(values))
+    position: Dict[Any, int] = {value: code for code, value in enumerate(uniques)}
+    return uniques, array('I', map(position.__getitem__, values))